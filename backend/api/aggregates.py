@@ -0,0 +1,77 @@
+"""
+Aggregate Cache - Payload JSON dựng sẵn cho các endpoint KPI / chart
+Mỗi aggregate được tính một lần cho mỗi version dataset và lưu dạng bytes
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from api.http_cache import MIN_COMPRESS_SIZE, compress
+from api.serialization import encode_json
+
+# Số version dataset giữ payload cùng lúc (version mới + version cũ của các
+# request còn đang chạy lúc hot reload)
+MAX_VERSIONS = 2
+
+
+class AggregateCache:
+    """
+    Cache payload JSON theo (version dataset, key)
+
+    - get(): lần đầu gọi build() rồi encode, các lần sau trả bytes có sẵn
+    - get_encoded(): như get() nhưng trả bản nén sẵn (nén một lần ở mức cao nhất)
+    - Dataset mới được load -> version mới; payload của version cũ nhất bị bỏ
+      khi vượt MAX_VERSIONS, không cần invalidate thủ công
+    """
+
+    def __init__(self, encode: Callable[[object], bytes] = encode_json):
+        self.encode = encode
+        self._versions: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self._compressed: Dict[Tuple[str, str, str], bytes] = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: str, key: str, build: Callable[[], object]) -> bytes:
+        """Payload của key cho dataset `version` (tính nếu chưa có)"""
+        with self._lock:
+            payload = self._versions.get(version, {}).get(key)
+
+        if payload is None:
+            # Tính ngoài lock: hai request đầu tiên có thể cùng tính, kết quả như nhau
+            payload = self.encode(build())
+            with self._lock:
+                if version not in self._versions:
+                    self._versions[version] = {}
+                    while len(self._versions) > MAX_VERSIONS:
+                        self._versions.popitem(last=False)
+                self._versions[version][key] = payload
+
+        return payload
+
+    def get_encoded(self, version: str, key: str, build: Callable[[], object],
+                    encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """
+        Payload của key đã nén bằng `encoding` (None = không nén)
+
+        Returns:
+            (bytes, encoding thực tế - None nếu payload quá nhỏ để nén)
+        """
+        payload = self.get(version, key, build)
+        if encoding is None or len(payload) < MIN_COMPRESS_SIZE:
+            return payload, None
+
+        cache_key = (version, key, encoding)
+        with self._lock:
+            compressed = self._compressed.get(cache_key)
+        if compressed is None:
+            compressed = compress(payload, encoding, cached=True)
+            with self._lock:
+                # Chỉ giữ bản nén của các version còn trong cache
+                if version in self._versions:
+                    self._compressed[cache_key] = compressed
+                for stale in [k for k in self._compressed if k[0] not in self._versions]:
+                    del self._compressed[stale]
+        return compressed, encoding
+
+    def __len__(self):
+        return sum(len(payloads) for payloads in self._versions.values())
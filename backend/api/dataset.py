@@ -0,0 +1,256 @@
+"""
+Dataset - Load dataset thành snapshot có version và hot reload khi ETL ghi file mới
+Request đang chạy giữ snapshot cũ; snapshot mới được dựng ở background rồi thay thế một lần
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # Không có pyarrow -> fallback đọc CSV
+    pa = None
+
+from api.query_engine import JobQueryEngine
+from api.salary_stats import SalaryCube
+from api.skill_matrix import SkillMatrix
+from api.text_store import TextStore, string_categories
+from api.trends import TrendStore
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+DATA_FILE = Path(__file__).parent.parent / 'data' / 'clean_jobs.csv'
+ARROW_FILE = Path(__file__).parent.parent / 'data' / 'clean_jobs.arrow'
+
+# Cột id ổn định của job (transform_jobs gán; dataset cũ dùng số thứ tự dòng)
+ID_COLUMN = 'job_id'
+
+# Cột thời gian (CSV lưu dạng chuỗi ISO -> parse lại thành timestamp UTC)
+DATETIME_COLUMNS = ['date_posted']
+
+# Layout gọn trong RAM:
+# - cột lặp lại nhiều giá trị -> category (mã int8/int16 + bảng giá trị)
+# - lương giữ float64: float32 chỉ có ~7 chữ số -> lương theo INR / quy đổi USD bị làm tròn,
+#   filter / sort theo lương lệch với giá trị trong file
+# - text lớn -> TextStore riêng (buffer liên tục + offsets), không nằm trong DataFrame
+CATEGORY_COLUMNS = [
+    'job_title', 'company', 'country', 'city', 'region', 'category', 'role', 'seniority',
+    'salary_currency', 'salary_period', 'source'
+]
+TEXT_COLUMNS = ['job_description']
+
+# Chu kỳ (giây) kiểm tra output của transform; 0 = tắt hot reload
+RELOAD_INTERVAL = float(os.getenv('DATASET_RELOAD_INTERVAL', '5'))
+
+
+# ============================================================================
+# LOAD
+# ============================================================================
+
+def load_arrow(path):
+    """
+    Mở Arrow IPC file bằng memory-map
+
+    Buffer của cột số và cột string được dùng trực tiếp từ page cache
+    (zero-copy), nên nhiều uvicorn worker cùng đọc một bản trong RAM.
+    Cột dictionary được chuyển thành pandas Categorical.
+    Cột skill_bits được tách thành SkillMatrix (không đưa vào DataFrame).
+
+    Returns:
+        (DataFrame, SkillMatrix hoặc None)
+    """
+    source = pa.memory_map(str(path), 'r')
+    table = pa.ipc.open_file(source).read_all()
+    skills, table = SkillMatrix.from_arrow(table)
+
+    string_dtype = pd.StringDtype('pyarrow')
+    types_mapper = {
+        pa.string(): string_dtype,
+        pa.large_string(): string_dtype,
+    }.get
+
+    return table.to_pandas(types_mapper=types_mapper, split_blocks=True), skills
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Đổi dtype sang layout gọn cho các cột có trong df
+
+    Bảng giá trị của category và các cột chuỗi còn lại dùng string[pyarrow]
+    (kể cả khi đọc CSV / dictionary Arrow ra categories object) -> không có
+    chuỗi Python nào phải pickle vào shared bundle.
+    """
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = string_categories(df[column])
+    if pa is not None:
+        string_dtype = pd.StringDtype('pyarrow')
+        for column in df.columns[df.dtypes == object]:
+            if pd.api.types.infer_dtype(df[column], skipna=True) == 'string':
+                df[column] = df[column].astype(string_dtype)
+    return df
+
+
+def split_texts(df: pd.DataFrame):
+    """Tách các cột text lớn khỏi df thành TextStore ({cột: TextStore})"""
+    return {column: TextStore.from_series(df.pop(column)) for column in TEXT_COLUMNS if column in df.columns}
+
+
+def source_file() -> Optional[Path]:
+    """File dataset sẽ được load (ưu tiên Arrow, fallback CSV), None nếu chưa có"""
+    if pa is not None and ARROW_FILE.exists():
+        return ARROW_FILE
+    if DATA_FILE.exists():
+        return DATA_FILE
+    return None
+
+
+def dataset_version(path) -> str:
+    """Version id của dataset: hash ngắn của tên file + size + mtime"""
+    stat = Path(path).stat()
+    key = f"{Path(path).name}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+class DatasetSnapshot:
+    """
+    Một version bất biến của dataset và mọi thứ dựng từ nó
+
+    - df: DataFrame jobs (không chứa cột skill và cột text lớn)
+    - skills: SkillMatrix hoặc None
+    - texts: {cột: TextStore} (job_description)
+    - query_engine: index cho /api/jobs
+    - salary_cube: percentile lương theo country × category × role
+    - trends: rollup theo ngày của các snapshot (TrendStore) cho /api/trends
+    - version: id của file nguồn (đổi khi transform ghi file mới)
+    - bundle: file snapshot dùng chung đang gắn vào (chế độ nhiều worker,
+      xem api/shared_snapshot.py), None = process tự load và dựng index
+    """
+
+    def __init__(self, df, skills, version, source, trends=None):
+        df = compact_frame(df)
+        # Text index đọc job_description trước, sau đó cột được chuyển sang TextStore
+        self.query_engine = JobQueryEngine(df)
+        self.salary_cube = SalaryCube(df)
+        self.texts = split_texts(df)
+        self.df = df
+        self.skills = skills
+        self.trends = trends if trends is not None else TrendStore([])
+        self.version = version
+        self.source = source
+        self.bundle = None
+        self.loaded_at = time.time()
+
+
+def load_snapshot(path) -> DatasetSnapshot:
+    """Load file dataset và dựng index (có thể mất vài giây với dataset lớn)"""
+    # Lấy version trước khi đọc: nếu file bị thay giữa chừng, lần kiểm tra sau sẽ load lại
+    version = dataset_version(path)
+
+    if Path(path).suffix == '.arrow':
+        df, skills = load_arrow(path)
+        print(f"✅ Đã load {len(df)} jobs từ {Path(path).name} (memory-mapped, version {version})")
+    else:
+        df = pd.read_csv(path, dtype={ID_COLUMN: str})
+        for column in DATETIME_COLUMNS:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], utc=True, errors='coerce')
+        skills, df = SkillMatrix.from_dataframe(df)
+        print(f"✅ Đã load {len(df)} jobs từ {Path(path).name} (version {version})")
+
+    if ID_COLUMN not in df.columns:
+        df.insert(0, ID_COLUMN, pd.RangeIndex(len(df)).astype(str))
+
+    # ETL ghi rollup trend trước file dataset -> load cùng lúc là đã có rollup mới nhất
+    trends = TrendStore.load()
+
+    return DatasetSnapshot(df, skills, version, Path(path), trends)
+
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class DatasetStore:
+    """
+    Giữ snapshot hiện tại và thay bằng snapshot mới khi output của ETL đổi
+
+    - current: đọc một tham chiếu (atomic) -> request lấy snapshot một lần ở
+      đầu và dùng đến hết, không bị lẫn dữ liệu cũ/mới
+    - Snapshot mới được load + dựng index ở background thread, xong mới swap;
+      load lỗi (file hỏng, đang ghi dở) thì giữ snapshot cũ và thử lại lần sau
+    - locate / is_current / load quyết định nguồn dữ liệu; lớp con đổi nguồn
+      (ví dụ gắn snapshot dùng chung thay vì tự load file dataset)
+    """
+
+    def __init__(self, interval: float = RELOAD_INTERVAL):
+        self.interval = interval
+        self.current: Optional[DatasetSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def locate(self) -> Optional[Path]:
+        """File sẽ được load, None nếu chưa có"""
+        return source_file()
+
+    def is_current(self, snapshot: DatasetSnapshot, path: Path) -> bool:
+        """snapshot đã là nội dung hiện tại của path?"""
+        return snapshot.source == path and snapshot.version == dataset_version(path)
+
+    def load(self, path: Path) -> DatasetSnapshot:
+        return load_snapshot(path)
+
+    def report_missing(self):
+        print(f"❌ Không tìm thấy file: {DATA_FILE}")
+        print("⚠️  Vui lòng chạy transform_jobs.py trước!")
+
+    def reload_if_changed(self) -> bool:
+        """Load lại nếu file nguồn đổi so với snapshot hiện tại; True nếu đã swap"""
+        with self._reload_lock:
+            path = self.locate()
+            if path is None:
+                if self.current is None:
+                    self.report_missing()
+                return False
+
+            current = self.current
+            try:
+                if current is not None and self.is_current(current, path):
+                    return False
+                snapshot = self.load(path)
+            except Exception as e:
+                print(f"❌ Lỗi khi load data: {e}")
+                return False
+
+            self.current = snapshot
+            if current is not None:
+                print(f"🔄 Đã chuyển dataset: {current.version} -> {snapshot.version}")
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.reload_if_changed()
+
+    def start(self):
+        """Bắt đầu theo dõi file dataset ở background (nếu interval > 0)"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='dataset-reload', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Dừng thread theo dõi"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
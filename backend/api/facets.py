@@ -0,0 +1,160 @@
+"""
+Facets - Đếm nhóm theo 1-2 chiều trên toàn bộ dataset (hoặc tập row id đã filter)
+Dùng cho /api/facets thay cho việc tải /api/jobs?limit=500 rồi đếm ở browser
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+# Các chiều được hỗ trợ ('skill' lấy từ SkillMatrix, còn lại là cột của DataFrame)
+FACET_DIMENSIONS = [
+    'country', 'category', 'region', 'role', 'seniority', 'has_salary', 'company', 'city', 'skill'
+]
+SKILL_DIMENSION = 'skill'
+MAX_DIMENSIONS = 2
+
+
+def parse_dimensions(by: str) -> List[str]:
+    """'category,skill' -> ['category', 'skill'] (ValueError nếu không hợp lệ)"""
+    dimensions = [part.strip().lower() for part in by.split(',') if part.strip()]
+
+    if not dimensions or len(dimensions) > MAX_DIMENSIONS:
+        raise ValueError(f"`by` cần 1-{MAX_DIMENSIONS} chiều, ví dụ by=category,skill")
+    if len(set(dimensions)) != len(dimensions):
+        raise ValueError("`by` không được lặp lại cùng một chiều")
+    for dimension in dimensions:
+        if dimension not in FACET_DIMENSIONS:
+            raise ValueError(f"Chiều không hỗ trợ: {dimension} (chọn trong {', '.join(FACET_DIMENSIONS)})")
+
+    return dimensions
+
+
+def _factorize(df: pd.DataFrame, column: str, row_ids: np.ndarray):
+    """Mã nhóm (-1 = missing) và danh sách giá trị của cột trên các row id"""
+    if column not in df.columns:
+        return np.full(len(row_ids), -1, dtype=np.int64), []
+
+    codes, uniques = pd.factorize(df[column].take(row_ids), sort=True)
+    labels = [value.item() if isinstance(value, np.generic) else value for value in uniques]
+    return codes.astype(np.int64), labels
+
+
+def _group_sum(codes: np.ndarray, num_groups: int, bits: np.ndarray) -> np.ndarray:
+    """Tổng các dòng của `bits` theo nhóm (shape (num_groups, num_cols)), bỏ dòng code -1"""
+    result = np.zeros((num_groups, bits.shape[1]), dtype=np.int64)
+    valid = codes >= 0
+    codes, bits = codes[valid], bits[valid]
+    if len(codes) == 0:
+        return result
+
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    result[sorted_codes[starts]] = np.add.reduceat(bits[order].astype(np.int64), starts, axis=0)
+    return result
+
+
+def _skill_bits(skill_matrix, row_ids: np.ndarray):
+    """Ma trận 0/1 (len(row_ids), số skill) và tên skill"""
+    if skill_matrix is None:
+        return np.zeros((len(row_ids), 0), dtype=np.uint8), []
+    bits = np.unpackbits(skill_matrix.bits[row_ids], axis=1, count=len(skill_matrix.names))
+    return bits, skill_matrix.names
+
+
+def _dimension(df, skill_matrix, dimension, row_ids):
+    """
+    Một chiều dưới dạng ma trận membership
+    Returns: (labels, codes hoặc None, bits hoặc None) - skill là nhiều-nhiều nên dùng bits
+    """
+    if dimension == SKILL_DIMENSION:
+        bits, labels = _skill_bits(skill_matrix, row_ids)
+        return labels, None, bits
+    codes, labels = _factorize(df, dimension, row_ids)
+    return labels, codes, None
+
+
+def _totals(labels, codes, bits) -> np.ndarray:
+    """Số job trong từng nhóm của một chiều"""
+    if bits is not None:
+        return bits.sum(axis=0, dtype=np.int64)
+    return np.bincount(codes[codes >= 0], minlength=len(labels)).astype(np.int64)
+
+
+def _pair_counts(first, second) -> np.ndarray:
+    """Ma trận số job (nhóm chiều 1 x nhóm chiều 2)"""
+    labels_a, codes_a, bits_a = first
+    labels_b, codes_b, bits_b = second
+
+    if codes_a is not None and codes_b is not None:
+        valid = (codes_a >= 0) & (codes_b >= 0)
+        combined = codes_a[valid] * len(labels_b) + codes_b[valid]
+        counts = np.bincount(combined, minlength=len(labels_a) * len(labels_b))
+        return counts.reshape(len(labels_a), len(labels_b)).astype(np.int64)
+    if codes_a is not None:
+        return _group_sum(codes_a, len(labels_a), bits_b)
+    return _group_sum(codes_b, len(labels_b), bits_a).T
+
+
+def compute_facets(
+    df: pd.DataFrame,
+    skill_matrix,
+    row_ids: np.ndarray,
+    dimensions: List[str],
+    top: Optional[int] = None
+) -> Dict:
+    """
+    Đếm job theo 1-2 chiều trên các row id cho trước
+
+    - groups: số job của từng giá trị chiều thứ nhất (giảm dần)
+    - data: với 1 chiều giống groups; với 2 chiều là từng cặp giá trị,
+      percentage = % trên số job của nhóm chiều thứ nhất
+      (ví dụ by=category,skill: % job của category đó yêu cầu skill)
+    - top: chỉ giữ `top` giá trị đầu (1 chiều) / mỗi nhóm (2 chiều)
+    """
+    row_ids = np.sort(row_ids)
+    total = len(row_ids)
+
+    first = _dimension(df, skill_matrix, dimensions[0], row_ids)
+    totals = _totals(*first)
+    group_order = [code for code in np.argsort(-totals, kind='stable') if totals[code] > 0]
+
+    groups = [
+        {
+            dimensions[0]: first[0][code],
+            'count': int(totals[code]),
+            'percentage': round(totals[code] / total * 100, 1) if total > 0 else 0
+        }
+        for code in group_order
+    ]
+
+    if len(dimensions) == 1:
+        return {
+            "total": total,
+            "dimensions": dimensions,
+            "groups": groups,
+            "data": groups[:top] if top else groups
+        }
+
+    second = _dimension(df, skill_matrix, dimensions[1], row_ids)
+    counts = _pair_counts(first, second)
+
+    data = []
+    for code in group_order:
+        row = counts[code]
+        order = [other for other in np.argsort(-row, kind='stable') if row[other] > 0]
+        for other in order[:top] if top else order:
+            data.append({
+                dimensions[0]: first[0][code],
+                dimensions[1]: second[0][other],
+                'count': int(row[other]),
+                'percentage': round(row[other] / totals[code] * 100, 1)
+            })
+
+    return {
+        "total": total,
+        "dimensions": dimensions,
+        "groups": groups,
+        "data": data
+    }
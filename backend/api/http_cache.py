@@ -0,0 +1,151 @@
+"""
+HTTP Cache - Nén response (brotli / gzip) và ETag theo version dataset
+ETag chỉ phụ thuộc version + path + query nên kiểm tra If-None-Match không cần đụng tới DataFrame
+"""
+
+import gzip
+import hashlib
+from typing import Callable, Iterable, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Không có brotli -> chỉ dùng gzip
+    brotli = None
+
+# Response nhỏ hơn ngưỡng này không nén (header gzip + CPU không đáng)
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5          # Nén lúc request (trang /api/jobs, facets)
+BROTLI_QUALITY_CACHED = 11  # Nén một lần cho payload cache sẵn (aggregate)
+
+# Client luôn phải hỏi lại server (If-None-Match) vì dataset có thể được load lại bất cứ lúc nào
+CACHE_CONTROL = 'no-cache'
+
+# Thứ tự ưu tiên khi client chấp nhận nhiều encoding
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Encoding tốt nhất mà client chấp nhận (None = không nén)"""
+    if not accept_encoding:
+        return None
+
+    accepted = set()
+    for part in accept_encoding.split(','):
+        name, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+
+    for encoding in ENCODINGS:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Nén body bằng encoding ('br' / 'gzip'); cached=True -> mức nén cao nhất"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY_CACHED if cached else BROTLI_QUALITY)
+    # mtime=0 -> cùng body luôn ra cùng bytes
+    return gzip.compress(body, compresslevel=9 if cached else GZIP_LEVEL, mtime=0)
+
+
+def make_etag(version: str, path: str, params: Iterable[Tuple[str, str]], encoding: Optional[str]) -> str:
+    """
+    Strong ETag của một response
+
+    Cùng version dataset + path + query (không phụ thuộc thứ tự tham số)
+    -> cùng nội dung. Mỗi encoding là một representation khác nên có ETag
+    riêng; encoding là Content-Encoding thực tế của body (None = không nén).
+    """
+    key = '\n'.join([version, path] + [f'{name}={value}' for name, value in sorted(params)])
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    suffix = f'-{encoding}' if encoding else ''
+    return f'"{version}-{digest}{suffix}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match có chứa etag không (so sánh weak theo RFC 7232)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+class HTTPCacheMiddleware(BaseHTTPMiddleware):
+    """
+    ETag / 304 và nén cho các endpoint GET /api/*
+
+    - Trước khi gọi endpoint: ETag tính từ version dataset hiện tại + path +
+      query; khớp If-None-Match -> 304 ngay, không filter / serialize gì cả
+    - Sau endpoint: response có header version -> gắn ETag theo đúng version
+      của snapshot đã dùng; nén body nếu endpoint chưa nén sẵn
+    """
+
+    def __init__(self, app, current_version: Callable[[], Optional[str]], version_header: str):
+        super().__init__(app)
+        self.current_version = current_version
+        self.version_header = version_header
+
+    def _cache_headers(self, etag: str, version: str) -> dict:
+        # Key lowercase giống response.headers để update không sinh header trùng
+        return {
+            'etag': etag,
+            'cache-control': CACHE_CONTROL,
+            'vary': 'Accept-Encoding',
+            self.version_header.lower(): version,
+        }
+
+    async def dispatch(self, request, call_next):
+        if request.method not in ('GET', 'HEAD') or not request.url.path.startswith('/api/'):
+            return await call_next(request)
+
+        encoding = negotiate_encoding(request.headers.get('accept-encoding'))
+        path = request.url.path
+        params = request.query_params.multi_items()
+
+        version = self.current_version()
+        if version is not None:
+            # Chưa biết body có đủ lớn để nén không -> chấp nhận cả ETag của bản nén lẫn bản
+            # không nén (cùng version + path + query thì body luôn như nhau, client chỉ giữ một)
+            if_none_match = request.headers.get('if-none-match')
+            for body_encoding in dict.fromkeys([encoding, None]):
+                etag = make_etag(version, path, params, body_encoding)
+                if etag_matches(if_none_match, etag):
+                    return Response(status_code=304, headers=self._cache_headers(etag, version))
+
+        response = await call_next(request)
+        version = response.headers.get(self.version_header)
+        if response.status_code != 200 or version is None:
+            return response
+
+        body = b''.join([chunk async for chunk in response.body_iterator])
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key.lower() != 'content-length'
+        }
+
+        # Endpoint trả payload nén sẵn (aggregate cache) thì giữ nguyên
+        body_encoding = headers.get('content-encoding')
+        if body_encoding is None and encoding is not None and len(body) >= MIN_COMPRESS_SIZE:
+            body = compress(body, encoding)
+            body_encoding = encoding
+            headers['content-encoding'] = encoding
+
+        # ETag theo encoding thực tế của body (body nhỏ gửi không nén -> không có hậu tố)
+        headers.update(self._cache_headers(make_etag(version, path, params, body_encoding), version))
+        return Response(content=body, status_code=200, headers=headers)
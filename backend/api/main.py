@@ -3,14 +3,27 @@ FastAPI Backend - Global Job Market Analysis API
 REST API server để frontend lấy dữ liệu phân tích
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 import pandas as pd
 import numpy as np
 import math
-from pathlib import Path
+from datetime import date, timedelta
 from typing import List, Dict, Optional
 
+from api.aggregates import AggregateCache
+from api.dataset import DatasetSnapshot, DatasetStore
+from api.facets import compute_facets, parse_dimensions
+from api.http_cache import HTTPCacheMiddleware, negotiate_encoding
+from api.memory import memory_report
+from api.pagination import (
+    SORT_RELEVANCE, SORT_ROW, CursorError, StaleCursorError,
+    decode_cursor, encode_cursor, query_key, resume_offset
+)
+from api.query_cache import LRUCache, normalize_filters
+from api.serialization import encode_records, encoded_records_response
+from api.shared_snapshot import SharedDatasetStore, shared_dir
+
 # ============================================================================
 # KHỞI TẠO APP
 # ============================================================================
@@ -20,6 +33,17 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Header chứa version dataset của response (cache phía client/proxy key theo đây)
+VERSION_HEADER = 'X-Dataset-Version'
+
+# ETag / 304 + nén brotli/gzip cho GET /api/* (add trước CORS -> chạy bên trong
+# CORS, response 304 vẫn có header CORS)
+app.add_middleware(
+    HTTPCacheMiddleware,
+    current_version=lambda: dataset.current.version if dataset.current is not None else None,
+    version_header=VERSION_HEADER,
+)
+
 # Enable CORS để frontend có thể gọi API
 app.add_middleware(
     CORSMiddleware,
@@ -27,43 +51,62 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[VERSION_HEADER, "ETag"],  # frontend đọc được version dataset
 )
 
 # ============================================================================
 # LOAD DATA
 # ============================================================================
-DATA_FILE = Path(__file__).parent.parent / 'data' / 'clean_jobs.csv'
+# Snapshot hiện tại (df, skill matrix, index, version); tự load lại ở background
+# khi transform ghi file mới (xem api/dataset.py).
+# Chạy qua api/serve.py (nhiều worker): gắn bản dùng chung do process cha dựng
+# (xem api/shared_snapshot.py), worker không tự load dataset
+dataset = SharedDatasetStore(shared_dir()) if shared_dir() else DatasetStore()
+dataset.reload_if_changed()
 
-def load_data():
-    """Load dữ liệu từ CSV"""
-    try:
-        if not DATA_FILE.exists():
-            print(f"❌ Không tìm thấy file: {DATA_FILE}")
-            print("⚠️  Vui lòng chạy transform_jobs.py trước!")
-            return None
-        
-        df = pd.read_csv(DATA_FILE)
-        print(f"✅ Đã load {len(df)} jobs từ {DATA_FILE.name}")
-        return df
-    except Exception as e:
-        print(f"❌ Lỗi khi load data: {e}")
-        return None
+# Payload JSON của các endpoint tổng hợp, tính một lần cho mỗi version dataset
+aggregate_cache = AggregateCache()
+
+# Cache LRU (giới hạn theo QUERY_CACHE_MB) cho /api/jobs, key = version + filter đã chuẩn hóa:
+# - result_cache: danh sách row id đã filter (trang sau không phải filter lại)
+# - page_cache: JSON của từng trang (trang hay xem không phải serialize lại)
+result_cache = LRUCache("results")
+page_cache = LRUCache("pages")
 
-# Load data khi khởi động
-df_jobs = load_data()
+# Cột mặc định của danh sách /api/jobs (bảng + chart ở frontend chỉ dùng các cột này)
+DEFAULT_JOB_FIELDS = [
+    'job_id', 'job_title', 'company', 'country', 'city', 'region', 'category', 'role', 'seniority',
+    'salary_min', 'salary_max', 'salary_currency', 'salary_period',
+    'has_salary', 'date_posted'
+]
+
+# Cột lớn chỉ trả về ở /api/jobs/{job_id}
+DETAIL_ONLY_FIELDS = ['job_description']
+
+# Cột ảo: danh sách skill lấy từ SkillMatrix (chỉ tính khi được yêu cầu)
+SKILLS_FIELD = 'skills'
 
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def check_data_loaded():
-    """Kiểm tra data đã được load chưa"""
-    if df_jobs is None:
+def check_data_loaded(response: Optional[Response] = None) -> DatasetSnapshot:
+    """
+    Kiểm tra data đã được load chưa, trả về snapshot hiện tại
+    
+    Request dùng đúng snapshot này đến hết (hot reload không ảnh hưởng
+    request đang chạy); version được gắn vào header của response.
+    """
+    snapshot = dataset.current
+    if snapshot is None:
         raise HTTPException(
             status_code=503,
             detail="Dữ liệu chưa sẵn sàng. Vui lòng chạy transform_jobs.py trước!"
         )
+    if response is not None:
+        response.headers[VERSION_HEADER] = snapshot.version
+    return snapshot
 
 
 def clean_nan_values(obj):
@@ -84,10 +127,55 @@ def clean_nan_values(obj):
         if np.isnan(obj) or np.isinf(obj):
             return None
         return obj.item()  # Convert to Python native type
+    elif isinstance(obj, np.bool_):
+        return bool(obj)
+    elif obj is pd.NA or obj is pd.NaT:
+        # Missing value của cột string[pyarrow] / cột thời gian
+        return None
+    elif isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
     else:
         return obj
 
 
+def parse_job_fields(fields: Optional[str], columns) -> List[str]:
+    """
+    Danh sách cột cho /api/jobs từ tham số fields (ValueError nếu không hợp lệ)
+    Không truyền -> DEFAULT_JOB_FIELDS (bỏ cột dataset không có)
+    """
+    if fields is None:
+        return [column for column in DEFAULT_JOB_FIELDS if column in columns]
+
+    selected = list(dict.fromkeys(part.strip() for part in fields.split(',') if part.strip()))
+    if not selected:
+        raise ValueError("`fields` không được rỗng")
+
+    allowed = [column for column in columns if column not in DETAIL_ONLY_FIELDS] + [SKILLS_FIELD]
+    invalid = [column for column in selected if column not in allowed]
+    if invalid:
+        raise ValueError(
+            f"Cột không hỗ trợ: {', '.join(invalid)} "
+            f"(chọn trong {', '.join(allowed)}; job_description chỉ có ở /api/jobs/{{job_id}})"
+        )
+    return selected
+
+
+def cached_json(request, snapshot, key, build):
+    """
+    Response JSON dựng sẵn cho snapshot
+    build() chỉ chạy ở request đầu tiên sau mỗi lần load dataset;
+    bản nén (brotli/gzip) cũng chỉ nén một lần rồi dùng lại
+    """
+    encoding = negotiate_encoding(request.headers.get('accept-encoding'))
+    payload, encoding = aggregate_cache.get_encoded(
+        snapshot.version, key, lambda: clean_nan_values(build()), encoding
+    )
+    headers = {VERSION_HEADER: snapshot.version}
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
 
 # ============================================================================
 # API ENDPOINTS
@@ -96,35 +184,47 @@ def clean_nan_values(obj):
 @app.get("/")
 def root():
     """Root endpoint"""
+    snapshot = dataset.current
     return {
         "message": "Global Job Market Analysis API",
         "version": "1.0.0",
-        "status": "running" if df_jobs is not None else "data not loaded",
+        "status": "running" if snapshot is not None else "data not loaded",
+        "dataset_version": snapshot.version if snapshot is not None else None,
         "endpoints": [
             "/api/kpi",
             "/api/jobs",
+            "/api/jobs/{job_id}",
             "/api/jobs-by-country",
             "/api/jobs-by-region",
             "/api/salary-by-role",
-            "/api/top-skills"
+            "/api/salary-stats",
+            "/api/top-skills",
+            "/api/facets",
+            "/api/trends",
+            "/api/cache-stats",
+            "/api/memory"
         ]
     }
 
 
 @app.get("/api/kpi")
-def get_kpi():
+def get_kpi(request: Request):
     """
     Endpoint: KPI tổng quan
     Returns: Các chỉ số chính (total jobs, countries, companies, salary %)
     """
-    check_data_loaded()
-    
-    total_jobs = len(df_jobs)
-    total_countries = df_jobs['country'].nunique()
-    total_companies = df_jobs['company'].nunique()
+    snapshot = check_data_loaded()
+    return cached_json(request, snapshot, "kpi", lambda: build_kpi(snapshot.df))
+
+
+def build_kpi(df):
+    """Tính KPI tổng quan trên toàn bộ dataset"""
+    total_jobs = len(df)
+    total_countries = df['country'].nunique()
+    total_companies = df['company'].nunique()
     
     # Jobs có salary
-    jobs_with_salary = df_jobs['has_salary'].sum() if 'has_salary' in df_jobs.columns else 0
+    jobs_with_salary = df['has_salary'].sum() if 'has_salary' in df.columns else 0
     salary_percentage = (jobs_with_salary / total_jobs * 100) if total_jobs > 0 else 0
     
     return {
@@ -136,13 +236,37 @@ def get_kpi():
     }
 
 
+def job_ranges(salary_from, salary_to, posted_from, posted_to):
+    """Filter khoảng của /api/jobs và /api/facets -> dict ranges cho JobQueryEngine.select"""
+    return {
+        "salary_min": (salary_from, None),
+        "salary_max": (None, salary_to),
+        "date_posted": (
+            pd.Timestamp(posted_from, tz='UTC') if posted_from else None,
+            # Hết ngày posted_to (UTC)
+            pd.Timestamp(posted_to + timedelta(days=1), tz='UTC') - pd.Timedelta(1, 'ns') if posted_to else None
+        ),
+    }
+
+
 @app.get("/api/jobs")
 def get_jobs(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     country: Optional[str] = None,
     keyword: Optional[str] = None,
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    role: Optional[str] = Query(None, description="Nghề đã chuẩn hóa, ví dụ: Data Engineer"),
+    seniority: Optional[str] = Query(None, description="Intern | Junior | Mid | Senior | Lead | Head | Unspecified"),
+    has_salary: Optional[bool] = None,
+    salary_from: Optional[float] = Query(None, ge=0, description="salary_min_usd >= giá trị này (USD/năm)"),
+    salary_to: Optional[float] = Query(None, ge=0, description="salary_max_usd <= giá trị này (USD/năm)"),
+    posted_from: Optional[date] = Query(None, description="Đăng từ ngày (YYYY-MM-DD, UTC)"),
+    posted_to: Optional[date] = Query(None, description="Đăng đến hết ngày (YYYY-MM-DD, UTC)"),
+    sort: Optional[str] = Query(None, description="salary_min | salary_max | date_posted, '-' phía trước = giảm dần"),
+    fields: Optional[str] = Query(None, description="Các cột cần trả về, ví dụ: job_id,job_title,company"),
+    cursor: Optional[str] = Query(None, description="next_cursor của trang trước (thay cho skip)")
 ):
     """
     Endpoint: Danh sách jobs
@@ -150,56 +274,150 @@ def get_jobs(
         - skip: Số jobs bỏ qua (pagination)
         - limit: Số jobs trả về tối đa
         - country: Filter theo quốc gia (optional)
-        - keyword: Tìm kiếm trong job_title (optional)
+        - keyword: Tìm kiếm full-text trong job_title + job_description (optional)
         - category: Filter theo danh mục (Data Analyst, Data Engineer, Software Engineer)
+        - region: Filter theo khu vực (optional)
+        - role, seniority: Filter theo nghề / cấp bậc đã chuẩn hóa từ job title (optional)
+        - has_salary: Chỉ lấy jobs có (true) / không có (false) lương
+        - salary_from, salary_to: Khoảng lương theo USD/năm, đã quy đổi tỷ giá
+          (salary_min_usd >= salary_from, salary_max_usd <= salary_to)
+        - posted_from, posted_to: Khoảng ngày đăng (tính cả hai đầu)
+        - sort: Sort theo salary_min / salary_max (theo USD/năm) / date_posted (ví dụ -date_posted = mới nhất trước);
+          không truyền -> thứ tự gốc (hoặc độ liên quan khi có keyword)
+        - fields: Các cột trả về (mặc định DEFAULT_JOB_FIELDS; thêm `skills` để lấy
+          danh sách skill; job_description chỉ có ở /api/jobs/{job_id})
+        - cursor: Token next_cursor của response trước; trang tiếp theo luôn
+          thuộc cùng version dataset (410 nếu dataset đã được load lại)
     """
-    check_data_loaded()
-    
-    df = df_jobs.copy()
+    snapshot = check_data_loaded()
     
-    # Filter theo country
-    if country:
-        df = df[df['country'].str.lower() == country.lower()]
-    
-    # Filter theo keyword
-    if keyword:
-        df = df[df['job_title'].str.contains(keyword, case=False, na=False)]
-    
-    # Filter theo category
-    if category:
-        if 'category' in df.columns:
-            df = df[df['category'].str.contains(category, case=False, na=False)]
-    
-    total = len(df)
+    try:
+        columns = parse_job_fields(fields, snapshot.df.columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Pagination
-    df = df.iloc[skip:skip+limit]
+    try:
+        snapshot.query_engine.sort_key(sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    ranges = job_ranges(salary_from, salary_to, posted_from, posted_to)
+    filters = normalize_filters(
+        country=country, category=category, region=region, role=role, seniority=seniority,
+        keyword=keyword, has_salary=has_salary, ranges=ranges, sort=sort
+    )
+    query = query_key(**filters)
+    sort_order = filters.get("sort") or (SORT_RELEVANCE if filters.get("keyword") else SORT_ROW)
+    
+    # Filter bằng index dựng sẵn -> mảng row id, cache lại cho các trang sau
+    row_ids = result_cache.get(
+        (snapshot.version, query),
+        lambda: snapshot.query_engine.select(**filters)
+    )
+    
+    total = len(row_ids)
+    
+    if cursor is not None:
+        try:
+            offset, last_row = decode_cursor(cursor, snapshot.version, query, sort_order)
+            skip = resume_offset(row_ids, offset, last_row, sort_order)
+        except StaleCursorError as e:
+            raise HTTPException(status_code=410, detail=str(e))
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Pagination: chỉ lấy các dòng của trang hiện tại và các cột được yêu cầu
+    page_ids = row_ids[skip:skip+limit]
+    end = skip + len(page_ids)
+    next_cursor = (
+        encode_cursor(snapshot.version, query, sort_order, end, int(page_ids[-1]))
+        if end < total else None
+    )
+    records = page_cache.get(
+        (snapshot.version, query, skip, limit, tuple(columns)),
+        lambda: encode_records(build_jobs_page(snapshot, page_ids, columns))
+    )
+    
+    return encoded_records_response(
+        {
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "count": len(page_ids),
+            "next_cursor": next_cursor
+        },
+        "jobs",
+        records,
+        headers={VERSION_HEADER: snapshot.version}
+    )
+
+
+def build_jobs_page(snapshot, page_ids, columns):
+    """Các dòng của một trang, chỉ gồm các cột được yêu cầu"""
+    positions = snapshot.df.columns.get_indexer([column for column in columns if column != SKILLS_FIELD])
+    df = snapshot.df.iloc[page_ids, positions]
+    if SKILLS_FIELD in columns:
+        skills = snapshot.skills.labels(page_ids) if snapshot.skills is not None else [[] for _ in page_ids]
+        df = df.assign(**{SKILLS_FIELD: skills})[columns]
+    return df
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job_detail(job_id: str, response: Response):
+    """
+    Endpoint: Chi tiết một job
+    Returns: Mọi cột (kể cả job_description) + danh sách skills
+    """
+    snapshot = check_data_loaded(response)
     
-    # Convert to dict
-    jobs = df.to_dict('records')
+    row_id = snapshot.query_engine.row_of(job_id)
+    if row_id is None:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy job: {job_id}")
     
-    # Clean NaN/Infinity values - CRITICAL for JSON serialization
-    jobs = clean_nan_values(jobs)
+    job = snapshot.df.iloc[row_id].to_dict()
+    for column, store in snapshot.texts.items():
+        job[column] = store.get(row_id)
+    job['skills'] = snapshot.skills.names_for(row_id) if snapshot.skills is not None else []
     
+    return clean_nan_values(job)
+
+
+@app.get("/api/cache-stats")
+def get_cache_stats():
+    """
+    Endpoint: Counters của các cache trong process (hits, misses, evictions, bytes)
+    Mỗi uvicorn worker có cache riêng
+    """
     return {
-        "total": total,
-        "skip": skip,
-        "limit": limit,
-        "count": len(jobs),
-        "jobs": jobs
+        "caches": [result_cache.stats(), page_cache.stats()],
+        "aggregate_payloads": len(aggregate_cache)
     }
 
 
+@app.get("/api/memory")
+def get_memory():
+    """
+    Endpoint: Bộ nhớ của dataset đang phục vụ
+    Returns: bytes theo cột / skill matrix / text store / index và RSS / PSS của worker
+    """
+    snapshot = check_data_loaded()
+    return memory_report(snapshot)
+
+
 @app.get("/api/jobs-by-country")
-def get_jobs_by_country():
+def get_jobs_by_country(request: Request):
     """
     Endpoint: Số lượng jobs theo quốc gia
     Returns: List {country, count} để vẽ chart
     """
-    check_data_loaded()
-    
+    snapshot = check_data_loaded()
+    return cached_json(request, snapshot, "jobs-by-country", lambda: build_jobs_by_country(snapshot.df))
+
+
+def build_jobs_by_country(df):
+    """Đếm jobs theo quốc gia"""
     # Group by country
-    country_counts = df_jobs['country'].value_counts().reset_index()
+    country_counts = df['country'].value_counts().reset_index()
     country_counts.columns = ['country', 'count']
     
     # Convert to list of dicts
@@ -211,18 +429,22 @@ def get_jobs_by_country():
 
 
 @app.get("/api/jobs-by-region")
-def get_jobs_by_region():
+def get_jobs_by_region(request: Request):
     """
     Endpoint: Số lượng jobs theo khu vực
     Returns: List {region, count} để vẽ chart
     """
-    check_data_loaded()
-    
-    if 'region' not in df_jobs.columns:
+    snapshot = check_data_loaded()
+    return cached_json(request, snapshot, "jobs-by-region", lambda: build_jobs_by_region(snapshot.df))
+
+
+def build_jobs_by_region(df):
+    """Đếm jobs theo khu vực"""
+    if 'region' not in df.columns:
         return {"data": []}
     
     # Group by region
-    region_counts = df_jobs['region'].value_counts().reset_index()
+    region_counts = df['region'].value_counts().reset_index()
     region_counts.columns = ['region', 'count']
     
     # Convert to list of dicts
@@ -234,76 +456,186 @@ def get_jobs_by_region():
 
 
 @app.get("/api/salary-by-role")
-def get_salary_by_role():
+def get_salary_by_role(request: Request):
     """
-    Endpoint: Lương trung bình theo nghề nghiệp
-    Returns: List {role, avg_salary_min, avg_salary_max}
+    Endpoint: Lương theo nghề nghiệp (USD/năm, đã quy đổi tỷ giá)
+    Returns: List {role, count, avg_salary_min, avg_salary_max, p10, p25, p50, p75, p90}
     """
-    check_data_loaded()
-    
-    # Lọc jobs có salary
-    df_with_salary = df_jobs[df_jobs['salary_min'].notna() | df_jobs['salary_max'].notna()].copy()
+    snapshot = check_data_loaded()
+    return cached_json(request, snapshot, "salary-by-role", lambda: build_salary_by_role(snapshot))
+
+
+def build_salary_by_role(snapshot):
+    """Top 10 role (>= 3 jobs có lương) theo số jobs, đọc từ salary cube"""
+    result = snapshot.salary_cube.query(by=['role'], min_jobs=3, limit=10)
+    return {
+        "currency": result["currency"],
+        "period": result["period"],
+        "data": result["data"]
+    }
+
+
+@app.get("/api/salary-stats")
+def get_salary_stats(
+    response: Response,
+    by: Optional[str] = Query(None, description="Chiều group: country, category, role, seniority (ví dụ: role,seniority)"),
+    country: Optional[str] = None,
+    category: Optional[str] = None,
+    role: Optional[str] = None,
+    seniority: Optional[str] = None,
+    min_jobs: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=1000)
+):
+    """
+    Endpoint: Percentile lương (p10, p25, p50, p75, p90) từ salary cube
+    Params:
+        - by: Các chiều group; chiều không group và không filter được gộp toàn bộ
+        - country, category, role, seniority: Giữ đúng một giá trị của chiều đó
+        - min_jobs: Bỏ nhóm có ít jobs có lương hơn
+        - limit: Số nhóm tối đa (theo số jobs giảm dần)
+    Returns: {currency, period, by, percentiles,
+              data: [{<chiều>, count, avg_salary_min, avg_salary_max, p10, ..., p90}]}
+    """
+    snapshot = check_data_loaded(response)
     
-    if len(df_with_salary) == 0:
+    dimensions = [dimension.strip() for dimension in by.split(',') if dimension.strip()] if by else []
+    try:
+        result = snapshot.salary_cube.query(
+            by=dimensions,
+            limit=limit,
+            min_jobs=min_jobs,
+            country=country,
+            category=category,
+            role=role,
+            seniority=seniority
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return clean_nan_values(result)
+
+
+@app.get("/api/top-skills")
+def get_top_skills(request: Request, limit: int = Query(10, ge=1, le=200)):
+    """
+    Endpoint: Top kỹ năng được yêu cầu nhiều nhất
+    Params:
+        - limit: Số skill trả về tối đa (theo count giảm dần)
+    Returns: List {skill, count, percentage}
+    """
+    snapshot = check_data_loaded()
+    return cached_json(request, snapshot, f"top-skills:{limit}", lambda: build_top_skills(snapshot, limit))
+
+
+def build_top_skills(snapshot, limit):
+    """Top `limit` skill theo số jobs yêu cầu"""
+    skill_matrix = snapshot.skills
+    if skill_matrix is None:
         return {"data": []}
     
-    # Extract role từ job_title (đơn giản hóa: lấy 2 từ đầu)
-    df_with_salary['role'] = df_with_salary['job_title'].str.split().str[:2].str.join(' ')
-    
-    # Group by role, tính mean salary
-    role_salary = df_with_salary.groupby('role').agg({
-        'salary_min': 'mean',
-        'salary_max': 'mean',
-        'job_title': 'count'
-    }).reset_index()
-    
-    role_salary.columns = ['role', 'avg_salary_min', 'avg_salary_max', 'count']
+    total_jobs = len(snapshot.df)
+    counts = skill_matrix.counts()
     
-    # Chỉ lấy roles có >= 3 jobs
-    role_salary = role_salary[role_salary['count'] >= 3]
-    
-    # Sort by count giảm dần, lấy top 10
-    role_salary = role_salary.sort_values('count', ascending=False).head(10)
-    
-    # Convert to list
-    result = role_salary.to_dict('records')
+    # Sort by count giảm dần (ổn định theo thứ tự taxonomy), bỏ skill không xuất hiện
+    result = []
+    for skill_id in np.argsort(-counts, kind='stable')[:limit]:
+        count = int(counts[skill_id])
+        if count == 0:
+            break
+        percentage = (count / total_jobs * 100) if total_jobs > 0 else 0
+        
+        result.append({
+            'skill': skill_matrix.names[skill_id],
+            'count': count,
+            'percentage': round(percentage, 1)
+        })
     
     return {
         "data": result
     }
 
 
-@app.get("/api/top-skills")
-def get_top_skills():
+@app.get("/api/trends")
+def get_trends(
+    response: Response,
+    country: Optional[str] = None,
+    skills: Optional[str] = Query(None, description="Danh sách skill, ví dụ: Python,SQL (mặc định: top 5)"),
+    bucket: str = Query("week", description="day | week | month"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
     """
-    Endpoint: Top kỹ năng được yêu cầu nhiều nhất
-    Returns: List {skill, count, percentage}
+    Endpoint: Xu hướng theo thời gian (ngày đăng) từ rollup theo ngày của các snapshot
+    Params:
+        - country: Mã quốc gia (bỏ trống = mọi quốc gia)
+        - skills: Các skill cần tính tỷ lệ
+        - bucket: Khoảng gộp (day, week, month)
+        - date_from, date_to: Khoảng ngày đăng (YYYY-MM-DD)
+    Returns: {bucket, country, skills, crawl_dates,
+              data: [{period, jobs, salary_jobs, median_salary: {currency: value}, skill_share: {skill: %}}]}
     """
-    check_data_loaded()
+    snapshot = check_data_loaded(response)
     
-    skills = ['Python', 'SQL', 'AWS', 'Excel', 'English']
-    result = []
-    
-    total_jobs = len(df_jobs)
+    skill_list = [skill.strip() for skill in skills.split(',') if skill.strip()] if skills else None
+    try:
+        return snapshot.trends.query(
+            country=country,
+            skills=skill_list,
+            bucket=bucket,
+            date_from=date_from,
+            date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/facets")
+def get_facets(
+    response: Response,
+    by: str = Query(..., description="1-2 chiều, ví dụ: category,skill | role,seniority | region,has_salary"),
+    top: Optional[int] = Query(None, ge=1, le=500),
+    country: Optional[str] = None,
+    keyword: Optional[str] = None,
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    role: Optional[str] = None,
+    seniority: Optional[str] = None,
+    has_salary: Optional[bool] = None,
+    salary_from: Optional[float] = Query(None, ge=0, description="salary_min_usd >= giá trị này (USD/năm)"),
+    salary_to: Optional[float] = Query(None, ge=0, description="salary_max_usd <= giá trị này (USD/năm)"),
+    posted_from: Optional[date] = Query(None, description="Đăng từ ngày (YYYY-MM-DD, UTC)"),
+    posted_to: Optional[date] = Query(None, description="Đăng đến hết ngày (YYYY-MM-DD, UTC)")
+):
+    """
+    Endpoint: Đếm jobs theo nhóm trên toàn bộ dataset (sau khi filter)
+    Params:
+        - by: Các chiều group (country, category, region, role, seniority, has_salary, company, city, skill)
+        - top: Số giá trị tối đa (1 chiều) / mỗi nhóm của chiều thứ nhất (2 chiều)
+        - country, keyword, category, region, role, seniority, has_salary,
+          salary_from, salary_to, posted_from, posted_to: Filter giống /api/jobs
+          (facet luôn khớp với `total` của /api/jobs cùng filter)
+    Returns: {total, dimensions, groups: [{<chiều 1>, count, percentage}],
+              data: [{<chiều 1>, <chiều 2>, count, percentage}]}
+    """
+    snapshot = check_data_loaded(response)
     
-    for skill in skills:
-        col_name = f'skill_{skill.lower()}'
-        if col_name in df_jobs.columns:
-            count = df_jobs[col_name].sum()
-            percentage = (count / total_jobs * 100) if total_jobs > 0 else 0
-            
-            result.append({
-                'skill': skill,
-                'count': int(count),
-                'percentage': round(percentage, 1)
-            })
+    try:
+        dimensions = parse_dimensions(by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Sort by count giảm dần
-    result = sorted(result, key=lambda x: x['count'], reverse=True)
+    filters = normalize_filters(
+        country=country, category=category, region=region, role=role, seniority=seniority,
+        keyword=keyword, has_salary=has_salary,
+        ranges=job_ranges(salary_from, salary_to, posted_from, posted_to)
+    )
+    # Cùng key với /api/jobs (không sort) -> dùng chung mảng row id đã cache
+    row_ids = result_cache.get(
+        (snapshot.version, query_key(**filters)),
+        lambda: snapshot.query_engine.select(**filters)
+    )
     
-    return {
-        "data": result
-    }
+    result = compute_facets(snapshot.df, snapshot.skills, row_ids, dimensions, top)
+    return clean_nan_values(result)
 
 
 # ============================================================================
@@ -316,10 +648,17 @@ def startup_event():
     print("\n" + "="*70)
     print("🚀 FastAPI Server Started!")
     print("="*70)
-    if df_jobs is not None:
-        print(f"✅ Data loaded: {len(df_jobs)} jobs")
+    if dataset.current is not None:
+        print(f"✅ Data loaded: {len(dataset.current.df)} jobs (version {dataset.current.version})")
+        if dataset.current.bundle is not None:
+            print(f"🔗 Shared snapshot: {dataset.current.bundle}")
     else:
         print("⚠️  Data not loaded! Run transform_jobs.py first.")
+    
+    # Theo dõi output của transform, tự load dataset mới không cần restart
+    dataset.start()
+    if dataset.interval > 0:
+        print(f"🔄 Hot reload: kiểm tra dataset mỗi {dataset.interval:g}s")
     print("\n📚 API Documentation: http://localhost:8000/docs")
     print("="*70 + "\n")
 
@@ -327,6 +666,7 @@ def startup_event():
 @app.on_event("shutdown")
 def shutdown_event():
     """Event khi app shutdown"""
+    dataset.stop()
     print("\n👋 FastAPI Server Stopped\n")
 
 
@@ -0,0 +1,98 @@
+"""
+Memory - Báo cáo bộ nhớ của dataset đang phục vụ (cho /api/memory)
+Chia theo cột DataFrame, skill matrix, text store và từng index
+"""
+
+import os
+import sys
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+
+def process_rss() -> Optional[int]:
+    """Resident memory (byte) của process hiện tại, None nếu không đọc được"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    # Không có /proc (macOS): chỉ có peak RSS, đơn vị byte trên macOS, KB trên Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def process_memory() -> Dict[str, int]:
+    """
+    PSS / private (byte) của process hiện tại từ /proc/self/smaps_rollup ({} nếu không đọc được)
+
+    - pss: page dùng chung chia đều cho các process cùng map (cộng PSS mọi worker = RAM thật)
+    - private: page chỉ process này dùng (tăng theo số worker)
+    """
+    fields = {'Pss:': 'pss', 'Private_Clean:': 'private', 'Private_Dirty:': 'private'}
+    result = {}
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            for line in smaps:
+                parts = line.split()
+                if parts and parts[0] in fields:
+                    key = fields[parts[0]]
+                    result[key] = result.get(key, 0) + int(parts[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return {}
+    return result
+
+
+def memory_report(snapshot) -> Dict:
+    """
+    Số byte của mọi thành phần trong snapshot
+
+    - columns: dtype + bytes từng cột (deep=True: tính cả chuỗi Python / bảng category)
+    - skills, texts: ma trận bit-packed và buffer text
+    - indexes: index của query engine
+    - salary_cube: bảng percentile lương
+    - process_rss: RAM thực tế của worker (kể cả page cache của file memory-map đã chạm tới)
+    - process_pss / process_private: phần RAM của riêng worker khi chạy nhiều worker
+      dùng chung bundle (api/serve.py); shared_bundle = file bundle đang gắn
+    """
+    df = snapshot.df
+    usage = df.memory_usage(deep=True, index=False)
+    columns = {
+        column: {"dtype": str(df[column].dtype), "bytes": int(usage[column])}
+        for column in df.columns
+    }
+
+    skills = int(snapshot.skills.bits.nbytes) if snapshot.skills is not None else 0
+    texts = {column: store.nbytes for column, store in snapshot.texts.items()}
+    indexes = snapshot.query_engine.memory_usage()
+    salary_cube = snapshot.salary_cube.nbytes
+
+    total = (
+        sum(item["bytes"] for item in columns.values()) + skills + sum(texts.values())
+        + sum(indexes.values()) + salary_cube
+    )
+    rss = process_rss()
+    process = process_memory()
+
+    return {
+        "version": snapshot.version,
+        "rows": len(df),
+        "columns": columns,
+        "skills": skills,
+        "texts": texts,
+        "indexes": indexes,
+        "salary_cube": salary_cube,
+        "dataset_bytes": total,
+        "dataset_mb": round(total / MB, 2),
+        "process_rss_mb": round(rss / MB, 2) if rss is not None else None,
+        "process_pss_mb": round(process["pss"] / MB, 2) if "pss" in process else None,
+        "process_private_mb": round(process["private"] / MB, 2) if "private" in process else None,
+        "shared_bundle": str(snapshot.bundle) if snapshot.bundle is not None else None
+    }
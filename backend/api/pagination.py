@@ -0,0 +1,90 @@
+"""
+Pagination - Cursor cho /api/jobs
+Trang tiếp theo chỉ cần cắt mảng id đã cache (O(limit)), không filter lại cả dataset
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from typing import Tuple
+
+import numpy as np
+
+# Thứ tự của danh sách kết quả: theo thứ tự gốc của dataset / theo độ liên quan (keyword)
+SORT_ROW = 'row'
+SORT_RELEVANCE = 'relevance'
+
+
+class CursorError(ValueError):
+    """Cursor không hợp lệ (hỏng, sai filter)"""
+
+
+class StaleCursorError(CursorError):
+    """Cursor thuộc version dataset cũ (dataset đã được load lại)"""
+
+
+def query_key(**filters) -> str:
+    """Khóa ngắn của bộ filter (đã chuẩn hóa) - cùng filter -> cùng khóa, bỏ qua filter None"""
+    items = sorted((name, value) for name, value in filters.items() if value is not None)
+    return hashlib.sha1(json.dumps(items, default=str).encode('utf-8')).hexdigest()[:12]
+
+
+def encode_cursor(version: str, query: str, sort: str, offset: int, last_row: int) -> str:
+    """
+    Token opaque cho trang tiếp theo
+
+    Chứa version dataset, khóa filter, thứ tự sort, row id cuối cùng đã trả
+    về và vị trí của nó trong danh sách kết quả (gợi ý để khỏi tìm lại).
+    """
+    payload = json.dumps(
+        {'v': version, 'q': query, 's': sort, 'o': offset, 'r': last_row},
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, version: str, query: str, sort: str) -> Tuple[int, int]:
+    """
+    Giải mã cursor và kiểm tra khớp với request hiện tại
+
+    Returns:
+        (offset, last_row)
+    Raises:
+        StaleCursorError: dataset đã đổi version
+        CursorError: cursor hỏng hoặc dùng với filter / sort khác
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        token = (payload['v'], payload['q'], payload['s'], int(payload['o']), int(payload['r']))
+    except (ValueError, KeyError, TypeError, UnicodeError, binascii.Error):
+        raise CursorError("cursor không hợp lệ")
+
+    token_version, token_query, token_sort, offset, last_row = token
+    if token_version != version:
+        raise StaleCursorError("Dataset đã được cập nhật, vui lòng tải lại từ trang đầu")
+    if token_query != query or token_sort != sort:
+        raise CursorError("cursor không khớp với filter / sort của request")
+    if offset < 1:
+        raise CursorError("cursor không hợp lệ")
+
+    return offset, last_row
+
+
+def resume_offset(ids: np.ndarray, offset: int, last_row: int, sort: str) -> int:
+    """
+    Vị trí bắt đầu trang tiếp theo trong danh sách kết quả
+
+    Thường ids[offset - 1] == last_row -> O(1). Nếu danh sách được tính lại
+    (bị đẩy khỏi cache) vẫn tìm lại đúng vị trí theo row id cuối cùng.
+    """
+    if offset <= len(ids) and ids[offset - 1] == last_row:
+        return offset
+    if sort == SORT_ROW:
+        # Danh sách tăng dần theo row id -> keyset: các id lớn hơn last_row
+        return int(np.searchsorted(ids, last_row, side='right'))
+    matches = np.flatnonzero(ids == last_row)
+    if len(matches) == 0:
+        raise CursorError("cursor không khớp với kết quả hiện tại")
+    return int(matches[0]) + 1
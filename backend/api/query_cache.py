@@ -0,0 +1,130 @@
+"""
+Query Cache - LRU giới hạn theo bộ nhớ cho kết quả /api/jobs
+Lưu danh sách row id đã filter và trang JSON đã serialize, key = version dataset + filter đã chuẩn hóa
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+# Tổng dung lượng tối đa (MB) của mỗi cache; biến môi trường QUERY_CACHE_MB
+QUERY_CACHE_MB = float(os.getenv('QUERY_CACHE_MB', '64'))
+
+# Chi phí cố định ước tính cho mỗi entry (key, node của OrderedDict, object header)
+ENTRY_OVERHEAD = 256
+
+
+def normalize_filters(**filters) -> Dict[str, object]:
+    """
+    Chuẩn hóa filter để các request tương đương dùng chung một key
+
+    - Bỏ filter None / chuỗi rỗng (select() cũng bỏ qua chúng)
+    - country / category / region / role / seniority so khớp không phân biệt hoa thường -> lowercase
+    - keyword: lowercase + gộp khoảng trắng ('Data  Engineer' == 'data engineer')
+    - ranges: bỏ các khoảng không có đầu nào (None, None); không còn khoảng nào -> bỏ cả filter
+    """
+    normalized = {}
+    for name, value in filters.items():
+        if isinstance(value, str):
+            value = ' '.join(value.split()).lower()
+        elif isinstance(value, dict):
+            value = {key: bounds for key, bounds in value.items() if any(bound is not None for bound in bounds)}
+        if value is None or value == '' or value == {}:
+            continue
+        normalized[name] = value
+    return normalized
+
+
+def size_of(value) -> int:
+    """Dung lượng ước tính (byte) của một giá trị trong cache"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + ENTRY_OVERHEAD
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + ENTRY_OVERHEAD
+    return ENTRY_OVERHEAD
+
+
+class LRUCache:
+    """
+    Cache LRU thread-safe, giới hạn theo tổng số byte
+
+    - get(key, build): có sẵn -> hit; chưa có -> miss, gọi build() ngoài lock
+      (hai request cùng miss có thể cùng tính, kết quả như nhau)
+    - Vượt max_bytes -> bỏ entry lâu chưa dùng nhất (eviction)
+    - Entry lớn hơn cả cache thì trả về nhưng không lưu
+    - stats(): hits / misses / evictions / entries / bytes cho endpoint theo dõi
+    """
+
+    def __init__(self, name: str, max_bytes: Optional[int] = None):
+        self.name = name
+        self.max_bytes = int(QUERY_CACHE_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, build: Callable[[], object]):
+        """Giá trị của key (tính bằng build() nếu chưa có trong cache)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = build()
+        if isinstance(value, np.ndarray):
+            # Mảng được chia sẻ giữa các request -> không cho sửa
+            value.setflags(write=False)
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value):
+        """Lưu value, đẩy các entry cũ nhất ra cho đến khi đủ chỗ"""
+        size = size_of(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def clear(self):
+        """Xóa toàn bộ entry (giữ counters)"""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, object]:
+        """Counters hiện tại"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
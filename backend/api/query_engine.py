@@ -0,0 +1,321 @@
+"""
+Query Engine - Index dựng sẵn cho /api/jobs
+Dựng một lần khi load dataset, biến các filter thành phép giao các mảng row id
+"""
+
+import numpy as np
+import pandas as pd
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple
+
+from api.text_index import InvertedIndex
+from api.text_store import TextStore
+
+# Các cột categorical được index (filter = tra cứu + giao tập)
+INDEXED_COLUMNS = ['country', 'category', 'region', 'role', 'seniority', 'has_salary']
+
+# Các cột số / thời gian có index sắp xếp (range filter + sort): tên dùng trong API -> cột nguồn.
+# Lương sort / lọc theo giá trị đã quy đổi USD/năm (so sánh được giữa các đồng tiền);
+# dataset cũ chưa có cột *_usd thì dùng cột gốc
+SORTED_COLUMNS = {
+    'salary_min': ['salary_min_usd', 'salary_min'],
+    'salary_max': ['salary_max_usd', 'salary_max'],
+    'date_posted': ['date_posted'],
+}
+
+# Kiểu dữ liệu của row id (đủ cho vài triệu jobs, nhẹ hơn int64 một nửa)
+ROW_ID_DTYPE = np.int32
+
+# Cột id ổn định của job (/api/jobs/{job_id})
+ID_COLUMN = 'job_id'
+
+
+def parse_job_ids(ids: pd.Series) -> np.ndarray:
+    """job_id dạng hex (16 ký tự, hoặc số thứ tự dòng của dataset cũ) -> uint64"""
+    return np.array([int(value, 16) for value in ids.astype(str)], dtype=np.uint64)
+
+
+class CategoricalIndex:
+    """
+    Index cho một cột categorical, dạng CSR (không có dict / chuỗi Python theo giá trị)
+
+    - keys: các giá trị phân biệt (lowercase, đã sort) dạng TextStore
+    - ids / offsets: row id của keys[i] nằm trong ids[offsets[i]:offsets[i + 1]], tăng dần
+    """
+
+    def __init__(self, series: pd.Series):
+        categorical = pd.Categorical(series)
+        codes = categorical.codes
+
+        # Hai giá trị chỉ khác hoa/thường -> chung một key
+        lowered = pd.Series(categorical.categories.astype(str), dtype=object).str.lower()
+        key_codes, keys = pd.factorize(lowered, sort=True)
+        known = codes >= 0
+        row_keys = np.full(len(codes), -1, dtype=np.int64)
+        row_keys[known] = key_codes[codes[known]]
+
+        # Sort ổn định theo key -> row id trong mỗi nhóm vẫn tăng dần
+        order = np.argsort(row_keys, kind='stable').astype(ROW_ID_DTYPE)
+        counts = np.bincount(row_keys[known], minlength=len(keys))
+        self.ids = order[int((~known).sum()):]
+        self.offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.keys = TextStore.from_series(pd.Series(keys, dtype=object))
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.ids.nbytes + self.offsets.nbytes + self.keys.nbytes)
+
+    def _postings(self, key: int) -> np.ndarray:
+        return self.ids[self.offsets[key]:self.offsets[key + 1]]
+
+    def equals(self, value: str) -> np.ndarray:
+        """Row ids có giá trị bằng value (không phân biệt hoa/thường)"""
+        value = value.lower()
+        key = bisect_left(self.keys, value)
+        if key < len(self.keys) and self.keys[key] == value:
+            return self._postings(key)
+        return np.empty(0, dtype=ROW_ID_DTYPE)
+
+    def contains(self, value: str) -> np.ndarray:
+        """
+        Row ids có giá trị chứa chuỗi con value (không phân biệt hoa/thường)
+        Chỉ duyệt danh sách giá trị phân biệt, không duyệt từng dòng
+        """
+        matched = self.keys.find(value.lower())
+        if len(matched) == 0:
+            return np.empty(0, dtype=ROW_ID_DTYPE)
+        if len(matched) == 1:
+            return self._postings(matched[0])
+        return np.unique(np.concatenate([self._postings(key) for key in matched])).astype(ROW_ID_DTYPE)
+
+
+class SortedIndex:
+    """
+    Index sắp xếp cho một cột số hoặc thời gian (dựng một lần khi load)
+
+    - order: row id của các dòng có giá trị, sắp theo giá trị tăng dần
+    - values: giá trị tương ứng với order (đã sort) -> range = 2 lần binary search
+    - ranks: hạng (dense) của từng dòng, dòng thiếu giá trị = hạng lớn nhất
+    - ascending / descending: hoán vị toàn bộ dataset theo cột (thiếu giá trị ở cuối)
+    """
+
+    def __init__(self, series: pd.Series):
+        self.is_datetime = pd.api.types.is_datetime64_any_dtype(series)
+        if self.is_datetime:
+            # ns kể từ epoch (UTC nếu cột có timezone)
+            missing = series.isna().to_numpy()
+            keys = pd.DatetimeIndex(series).asi8
+        else:
+            keys = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(keys)
+
+        present = np.flatnonzero(~missing).astype(ROW_ID_DTYPE)
+        order = np.argsort(keys[present], kind='stable')
+        self.order = present[order]
+        self.values = keys[self.order]
+
+        uniques, codes = np.unique(self.values, return_inverse=True)
+        self.ranks = np.full(len(series), len(uniques), dtype=ROW_ID_DTYPE)
+        self.ranks[self.order] = codes
+        self.num_ranks = len(uniques)
+
+        nulls = np.flatnonzero(missing).astype(ROW_ID_DTYPE)
+        self.ascending = np.concatenate((self.order, nulls))
+        descending_keys = np.where(self.ranks < self.num_ranks, self.num_ranks - 1 - self.ranks, self.num_ranks)
+        self.descending = np.argsort(descending_keys, kind='stable').astype(ROW_ID_DTYPE)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.order, self.values, self.ranks, self.ascending, self.descending)
+        return int(sum(array.nbytes for array in arrays))
+
+    def _key(self, value):
+        """Giá trị filter -> cùng kiểu với values (timestamp -> ns kể từ epoch, UTC)"""
+        if self.is_datetime:
+            timestamp = pd.Timestamp(value)
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+            return timestamp.value
+        return float(value)
+
+    def between(self, low=None, high=None) -> np.ndarray:
+        """Row ids có low <= giá trị <= high (tăng dần), bỏ dòng thiếu giá trị"""
+        start = 0 if low is None else np.searchsorted(self.values, self._key(low), side='left')
+        stop = len(self.values) if high is None else np.searchsorted(self.values, self._key(high), side='right')
+        return np.sort(self.order[start:stop])
+
+    def sort(self, ids: np.ndarray, descending: bool = False) -> np.ndarray:
+        """Sắp các row id theo cột (thiếu giá trị ở cuối, cùng giá trị giữ thứ tự row id)"""
+        if len(ids) == len(self.ranks):
+            return self.descending if descending else self.ascending
+        ranks = self.ranks[ids]
+        if descending:
+            ranks = np.where(ranks < self.num_ranks, self.num_ranks - 1 - ranks, self.num_ranks)
+        return ids[np.argsort(ranks, kind='stable')]
+
+
+class JobQueryEngine:
+    """
+    Engine truy vấn jobs dựa trên index dựng sẵn
+
+    Mỗi filter trả về một mảng row id đã sort; kết hợp các filter bằng
+    np.intersect1d. Kết quả là row id theo thứ tự gốc của DataFrame (hoặc
+    theo điểm liên quan khi có keyword) nên pagination chỉ cần cắt mảng id
+    rồi lấy đúng các dòng đó.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.num_rows = len(df)
+        self.all_ids = np.arange(self.num_rows, dtype=ROW_ID_DTYPE)
+
+        self.indexes: Dict[str, CategoricalIndex] = {
+            column: CategoricalIndex(df[column])
+            for column in INDEXED_COLUMNS
+            if column in df.columns
+        }
+
+        self.sorted_indexes: Dict[str, SortedIndex] = {}
+        for name, sources in SORTED_COLUMNS.items():
+            column = next((source for source in sources if source in df.columns), None)
+            if column is not None:
+                self.sorted_indexes[name] = SortedIndex(df[column])
+
+        # Inverted index cho keyword search trên title + description
+        self.text_index = InvertedIndex(df)
+
+        # Hash index job_id -> row id cho endpoint chi tiết (job_id hex -> uint64, 8 byte / job)
+        self.id_index = pd.Index(parse_job_ids(df[ID_COLUMN])) if ID_COLUMN in df.columns else None
+        self.job_ids = df[ID_COLUMN] if ID_COLUMN in df.columns else None
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Số byte của từng index (cho /api/memory)"""
+        usage = {f'categorical:{column}': index.nbytes for column, index in self.indexes.items()}
+        usage.update({f'sorted:{column}': index.nbytes for column, index in self.sorted_indexes.items()})
+        usage['text_index'] = self.text_index.nbytes
+        if self.id_index is not None:
+            usage['id_index'] = int(self.id_index.memory_usage(deep=True))
+        return usage
+
+    def row_of(self, job_id: str) -> Optional[int]:
+        """Row id của job có job_id cho trước (None nếu không tồn tại)"""
+        if self.id_index is None:
+            return None
+        try:
+            loc = self.id_index.get_loc(np.uint64(int(job_id, 16)))
+        except (KeyError, ValueError, OverflowError):
+            return None
+        if isinstance(loc, slice):
+            # id trùng (dataset cũ) -> lấy dòng đầu tiên
+            row_id = loc.start
+        elif isinstance(loc, np.ndarray):
+            row_id = int(np.flatnonzero(loc)[0])
+        else:
+            row_id = int(loc)
+        # int(..., 16) chấp nhận cả '0x..', khoảng trắng -> so lại đúng chuỗi id
+        return row_id if self.job_ids.iat[row_id] == job_id else None
+
+    def _keyword_filter(self, ids: np.ndarray, keyword: str) -> np.ndarray:
+        """Giao row id ứng viên với kết quả full-text, sắp xếp theo điểm giảm dần"""
+        matched, scores = self.text_index.search(keyword)
+        if matched is None:
+            # Query không có token nào (chỉ ký tự đặc biệt) -> bỏ qua filter
+            return ids
+        if len(ids) < self.num_rows:
+            matched, keep, _ = np.intersect1d(matched, ids, assume_unique=True, return_indices=True)
+            scores = scores[keep]
+        return matched[np.argsort(-scores, kind='stable')]
+
+    def sort_key(self, sort: Optional[str]):
+        """
+        'salary_max' / '-date_posted' -> (cột, giảm dần?)
+        None -> (None, False); ValueError nếu cột không sort được
+        """
+        if not sort:
+            return None, False
+        column = sort.lstrip('-')
+        if column not in self.sorted_indexes:
+            raise ValueError(
+                f"Không sort được theo: {column} (chọn trong {', '.join(self.sorted_indexes)}, "
+                f"thêm '-' phía trước để sort giảm dần)"
+            )
+        return column, sort.startswith('-')
+
+    def select(
+        self,
+        country: Optional[str] = None,
+        category: Optional[str] = None,
+        region: Optional[str] = None,
+        role: Optional[str] = None,
+        seniority: Optional[str] = None,
+        keyword: Optional[str] = None,
+        has_salary: Optional[bool] = None,
+        ranges: Optional[Dict[str, Tuple]] = None,
+        sort: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Trả về mảng row id thỏa mãn tất cả filter
+        (tăng dần; nếu có keyword thì theo độ liên quan giảm dần; có sort thì theo cột sort)
+
+        Args:
+            country: So khớp chính xác (không phân biệt hoa/thường)
+            category: So khớp chuỗi con (không phân biệt hoa/thường)
+            region: So khớp chính xác (không phân biệt hoa/thường)
+            role, seniority: So khớp chính xác (không phân biệt hoa/thường) với giá trị
+                             đã chuẩn hóa bởi transform (Data Engineer, Senior...)
+            keyword: Full-text trên job_title + job_description
+                     (AND giữa các từ, mỗi từ khớp theo prefix)
+            has_salary: Chỉ lấy jobs có / không có lương
+            ranges: {cột: (low, high)} trên SORTED_COLUMNS, hai đầu đều tính,
+                    None = không giới hạn; dòng thiếu giá trị bị loại
+                    (salary_min / salary_max tính theo USD/năm)
+            sort: Tên cột trong SORTED_COLUMNS, '-' phía trước = giảm dần
+                  (lương sort theo giá trị USD/năm)
+        """
+        sort_column, descending = self.sort_key(sort)
+        candidates = []
+
+        if has_salary is not None and 'has_salary' in self.indexes:
+            candidates.append(self.indexes['has_salary'].equals(str(has_salary)))
+
+        for column, (low, high) in (ranges or {}).items():
+            if (low is None and high is None) or column not in self.sorted_indexes:
+                continue
+            # Binary search trên mảng đã sort sẵn, không sort lại mỗi request
+            candidates.append(self.sorted_indexes[column].between(low, high))
+
+        for column, value, exact in (
+            ('country', country, True),
+            ('category', category, False),
+            ('region', region, True),
+            ('role', role, True),
+            ('seniority', seniority, True),
+        ):
+            if not value:
+                continue
+            index = self.indexes.get(column)
+            if index is None:
+                # Cột không tồn tại trong dataset -> bỏ qua filter (giữ hành vi cũ)
+                continue
+            candidates.append(index.equals(value) if exact else index.contains(value))
+
+        if candidates:
+            # Giao từ tập nhỏ nhất để giảm chi phí
+            candidates.sort(key=len)
+            ids = candidates[0]
+            for other in candidates[1:]:
+                if len(ids) == 0:
+                    break
+                ids = np.intersect1d(ids, other, assume_unique=True)
+        else:
+            ids = self.all_ids
+
+        if keyword and len(ids) > 0:
+            ids = self._keyword_filter(ids, keyword)
+
+        if sort_column is not None and len(ids) > 0:
+            if keyword:
+                # Bỏ thứ tự theo độ liên quan, sort theo cột trên các row id tăng dần
+                ids = np.sort(ids)
+            ids = self.sorted_indexes[sort_column].sort(ids, descending)
+
+        return ids
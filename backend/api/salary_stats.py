@@ -0,0 +1,187 @@
+"""
+Salary Stats - Cube percentile lương (USD/năm) theo country × category × role × seniority
+Tính một lần cho mỗi snapshot từ mảng lương đã sort; request chỉ lọc các ô có sẵn
+"""
+
+from itertools import combinations
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from api.text_store import string_categories
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+# Các chiều của cube (mỗi chiều có thêm mức "tất cả" = None)
+CUBE_DIMENSIONS = ['country', 'category', 'role', 'seniority']
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+# Lương đã quy đổi bởi transform; dataset cũ chưa có thì dùng cột gốc
+SALARY_COLUMNS = {'salary_min_usd': 'salary_min', 'salary_max_usd': 'salary_max'}
+
+# Đơn vị của mọi giá trị trong cube
+CUBE_CURRENCY = 'USD'
+CUBE_PERIOD = 'year'
+
+
+def sorted_percentiles(codes: np.ndarray, values: np.ndarray, percentiles: List[int]) -> np.ndarray:
+    """
+    Percentile của từng nhóm (nội suy tuyến tính, giống np.percentile)
+
+    Sort một lần theo (nhóm, giá trị): mỗi nhóm là một đoạn liên tục đã sort,
+    percentile q nằm ở vị trí start + q * (n - 1) -> không vòng lặp Python.
+
+    Args:
+        codes: mã nhóm 0..k-1 của từng giá trị (mọi nhóm đều có giá trị)
+        values: giá trị (không NaN)
+    Returns:
+        float64 (k, len(percentiles))
+    """
+    order = np.lexsort((values, codes))
+    values = values[order]
+    sizes = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    position = starts[:, None] + np.asarray(percentiles, dtype=np.float64)[None, :] / 100 * (sizes - 1)[:, None]
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class SalaryCube:
+    """
+    Thống kê lương cho mọi tổ hợp chiều của CUBE_DIMENSIONS
+
+    Mỗi ô: giá trị của từng chiều (None = gộp tất cả), số jobs có lương,
+    lương min/max trung bình và p10..p90 của lương đại diện (trung bình
+    min/max của từng job). Có cả các ô gộp (ví dụ chỉ country, hoặc toàn bộ)
+    nên truy vấn ở mức nào cũng là tra bảng, không tính lại percentile.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        salary_columns = [
+            column if column in df.columns else fallback
+            for column, fallback in SALARY_COLUMNS.items()
+        ]
+        salaries = df[salary_columns].astype(np.float64)
+        salary = salaries.mean(axis=1).to_numpy()
+        paid = ~np.isnan(salary)
+
+        frame = pd.DataFrame({
+            dimension: self._dimension(df, dimension)[paid]
+            for dimension in CUBE_DIMENSIONS
+        })
+        salary = salary[paid]
+        salary_min = salaries.iloc[:, 0].to_numpy()[paid]
+        salary_max = salaries.iloc[:, 1].to_numpy()[paid]
+
+        cells = []
+        if len(salary):
+            for size in range(len(CUBE_DIMENSIONS) + 1):
+                for dimensions in combinations(CUBE_DIMENSIONS, size):
+                    cells.append(self._cells(frame, list(dimensions), salary, salary_min, salary_max))
+
+        self.cells = pd.concat(cells, ignore_index=True) if cells else pd.DataFrame(
+            columns=CUBE_DIMENSIONS + ['count', 'avg_salary_min', 'avg_salary_max'] + [f'p{q}' for q in PERCENTILES]
+        )
+        # Chiều -> category (categories sort theo chữ cái nên sort theo mã = sort theo giá trị),
+        # bảng giá trị string[pyarrow] -> không phải pickle chuỗi Python vào shared bundle
+        for dimension in CUBE_DIMENSIONS:
+            self.cells[dimension] = string_categories(self.cells[dimension].astype(object))
+
+    @staticmethod
+    def _dimension(df, dimension) -> np.ndarray:
+        if dimension in df.columns:
+            return df[dimension].astype(object).fillna('Unknown').to_numpy(dtype=object)
+        if dimension == 'seniority':
+            # Dataset cũ chưa có seniority -> một mức duy nhất
+            return np.full(len(df), 'Unspecified', dtype=object)
+        # Dataset cũ chưa có role -> dùng nguyên job title
+        return df['job_title'].astype(object).fillna('Unknown').to_numpy(dtype=object)
+
+    @staticmethod
+    def _cells(frame, dimensions, salary, salary_min, salary_max) -> pd.DataFrame:
+        """Các ô của một mức gộp (dimensions = chiều được giữ lại)"""
+        if dimensions:
+            codes, keys = pd.MultiIndex.from_frame(frame[dimensions]).factorize()
+            cells = keys.set_names(dimensions).to_frame(index=False)
+        else:
+            codes = np.zeros(len(salary), dtype=np.int64)
+            cells = pd.DataFrame(index=range(1))
+        for dimension in CUBE_DIMENSIONS:
+            if dimension not in dimensions:
+                cells[dimension] = None
+
+        count = np.bincount(codes)
+        cells['count'] = count
+        for column, values in (('avg_salary_min', salary_min), ('avg_salary_max', salary_max)):
+            known = ~np.isnan(values)
+            total = np.bincount(codes[known], weights=values[known], minlength=len(count))
+            number = np.bincount(codes[known], minlength=len(count))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                cells[column] = total / number
+
+        percentiles = sorted_percentiles(codes, salary, PERCENTILES)
+        for i, q in enumerate(PERCENTILES):
+            cells[f'p{q}'] = percentiles[:, i]
+        return cells[CUBE_DIMENSIONS + [c for c in cells.columns if c not in CUBE_DIMENSIONS]]
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.cells.memory_usage(deep=True).sum())
+
+    def query(self, by: Optional[List[str]] = None, limit: Optional[int] = None,
+              min_jobs: int = 1, **filters) -> Dict:
+        """
+        Các ô của cube
+
+        Args:
+            by: chiều group (ví dụ ['role']); chiều không group và không filter được gộp
+            filters: country / category / role / seniority = giá trị (không phân biệt hoa thường)
+            min_jobs: bỏ ô có ít jobs hơn
+            limit: số ô tối đa (theo số jobs giảm dần)
+        Raises:
+            ValueError: chiều không hợp lệ
+        """
+        by = by or []
+        unknown = [dimension for dimension in list(by) + list(filters) if dimension not in CUBE_DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Chiều không hợp lệ: {', '.join(unknown)} (chọn trong {', '.join(CUBE_DIMENSIONS)})"
+            )
+
+        mask = self.cells['count'].to_numpy() >= min_jobs
+        for dimension in CUBE_DIMENSIONS:
+            value = filters.get(dimension)
+            if value:
+                # So khớp không phân biệt hoa thường trên bảng giá trị, rồi lọc theo mã
+                values = self.cells[dimension].cat
+                matched = np.flatnonzero(values.categories.astype(str).str.lower() == value.lower())
+                mask &= np.isin(values.codes.to_numpy(), matched)
+            elif dimension in by:
+                mask &= self.cells[dimension].notna().to_numpy()
+            else:
+                mask &= self.cells[dimension].isna().to_numpy()
+
+        group = [dimension for dimension in CUBE_DIMENSIONS if dimension in by]
+        cells = self.cells[mask].sort_values(
+            ['count'] + group, ascending=[False] + [True] * len(group), kind='stable'
+        )
+        if limit is not None:
+            cells = cells.head(limit)
+
+        keep = [dimension for dimension in CUBE_DIMENSIONS if dimension in group or filters.get(dimension)]
+        columns = keep + [column for column in cells.columns if column not in CUBE_DIMENSIONS]
+        return {
+            'currency': CUBE_CURRENCY,
+            'period': CUBE_PERIOD,
+            'by': by,
+            'percentiles': PERCENTILES,
+            'data': cells[columns].round(2).to_dict('records'),
+        }
@@ -0,0 +1,50 @@
+"""
+Serialization - Ghi DataFrame thẳng ra JSON bytes cho các endpoint trả về list dòng
+Bỏ qua to_dict('records') + clean_nan_values + jsonable_encoder của FastAPI
+"""
+
+import json
+
+import pandas as pd
+from fastapi import Response
+
+
+def encode_json(obj) -> bytes:
+    """Serialize giống JSONResponse của FastAPI (UTF-8, không NaN, không khoảng trắng)"""
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(',', ':')
+    ).encode('utf-8')
+
+
+def encode_records(df: pd.DataFrame) -> bytes:
+    """
+    DataFrame -> JSON array các object (một object mỗi dòng)
+
+    Dùng encoder C của pandas, duyệt trực tiếp trên mảng của từng cột:
+    NaN / Inf / None / pd.NA -> null, bool/int/float numpy -> số JSON,
+    Categorical và string[pyarrow] -> chuỗi. Không tạo dict Python cho từng dòng.
+    """
+    return df.to_json(orient='records', force_ascii=False, date_format='iso').encode('utf-8')
+
+
+def records_response(meta: dict, key: str, df: pd.DataFrame, headers=None) -> Response:
+    """
+    Response JSON {**meta, key: [rows...]} ghép từ bytes có sẵn
+
+    Args:
+        meta: Các field nhỏ (total, skip, ...) - encode bằng json chuẩn
+        key: Tên field chứa danh sách dòng (ví dụ "jobs")
+        df: Các dòng cần trả về
+    """
+    return encoded_records_response(meta, key, encode_records(df), headers)
+
+
+def encoded_records_response(meta: dict, key: str, records: bytes, headers=None) -> Response:
+    """Như records_response() nhưng dùng JSON array đã encode sẵn (trang lấy từ cache)"""
+    head = encode_json(meta)
+    separator = b',' if meta else b''
+    body = head[:-1] + separator + encode_json(key) + b':' + records + b'}'
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,62 @@
+"""
+Serve - Chạy API với nhiều uvicorn worker dùng chung một bản dataset trong RAM
+Process cha load + dựng index rồi publish bundle; worker chỉ memory-map bundle
+
+Chạy từ thư mục backend:
+    python -m api.serve --workers 4
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+from api.shared_snapshot import DEFAULT_SHARED_DIR, SHARED_DIR_ENV, PublishingDatasetStore
+
+
+def parse_args():
+    """Đọc tham số dòng lệnh"""
+    parser = argparse.ArgumentParser(description="Chạy API nhiều worker với dataset dùng chung")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('API_WORKERS', '0')),
+        help="Số uvicorn worker (0 = số CPU)"
+    )
+    parser.add_argument(
+        '--shared-dir',
+        default=os.getenv(SHARED_DIR_ENV, str(DEFAULT_SHARED_DIR)),
+        help="Thư mục chứa bundle snapshot (ví dụ /dev/shm/jobs để bundle nằm hẳn trong RAM)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Publish snapshot của dataset hiện tại rồi chạy các worker"""
+    args = parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    print("\n" + "="*70)
+    print(f"🚀 Khởi động API: {workers} worker, dataset dùng chung tại {args.shared_dir}")
+    print("="*70)
+
+    # Worker được spawn sau dòng này -> thừa hưởng biến môi trường, gắn bundle thay vì tự load
+    os.environ[SHARED_DIR_ENV] = args.shared_dir
+
+    store = PublishingDatasetStore(args.shared_dir)
+    store.reload_if_changed()
+    if store.current is None:
+        raise SystemExit(1)
+
+    # Process cha theo dõi output của transform và publish version mới; worker tự chuyển theo pointer
+    store.start()
+    try:
+        uvicorn.run('api.main:app', host=args.host, port=args.port, workers=workers)
+    finally:
+        store.stop()
+
+
+if __name__ == "__main__":
+    main()
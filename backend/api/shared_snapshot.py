@@ -0,0 +1,234 @@
+"""
+Shared Snapshot - Một bản dataset + index trong RAM cho mọi uvicorn worker
+Process cha load và dựng index một lần rồi ghi ra bundle; worker memory-map bundle (zero-copy)
+"""
+
+import io
+import json
+import mmap
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from api.dataset import RELOAD_INTERVAL, DatasetSnapshot, DatasetStore, load_snapshot
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+# Process cha đặt biến này trước khi spawn worker; worker thấy biến -> gắn bundle thay vì tự load
+SHARED_DIR_ENV = 'DATASET_SHARED_DIR'
+DEFAULT_SHARED_DIR = Path(__file__).parent.parent / 'data' / 'shared'
+
+# File chứa tên bundle hiện tại (thay bằng rename -> worker không đọc phải pointer ghi dở)
+POINTER_NAME = 'current'
+BUNDLE_PREFIX = 'snapshot-'
+BUNDLE_SUFFIX = '.bin'
+
+# Giữ cả bundle trước đó cho worker chưa kịp chuyển (file đã map thì bị xóa vẫn đọc được)
+KEEP_BUNDLES = 2
+
+# Layout: [buffer mảng, căn lề ALIGNMENT]... [pickle] [footer JSON] [độ dài footer, 8 byte] [MAGIC]
+MAGIC = b'JOBSNAP1'
+ALIGNMENT = 64
+
+
+def shared_dir() -> Optional[Path]:
+    """Thư mục bundle nếu process chạy ở chế độ nhiều worker (api/serve.py), None nếu không"""
+    value = os.getenv(SHARED_DIR_ENV)
+    return Path(value) if value else None
+
+
+# ============================================================================
+# GHI / ĐỌC BUNDLE
+# ============================================================================
+
+def _view(array, dtype):
+    return array.view(dtype)
+
+
+class _BundlePickler(pickle.Pickler):
+    """
+    Pickle protocol 5: buffer của mảng numpy / Arrow đi ra ngoài luồng pickle
+    (buffer_callback) và được ghi thẳng vào bundle
+
+    numpy luôn pickle datetime64 / timedelta64 trong luồng -> gửi dưới dạng
+    view int64 rồi view lại dtype gốc khi đọc (vẫn zero-copy).
+    """
+
+    def reducer_override(self, obj):
+        if type(obj) is np.ndarray and obj.dtype.kind in 'mM' and obj.flags.c_contiguous:
+            return _view, (obj.view(np.int64), obj.dtype)
+        return NotImplemented
+
+
+def _write_aligned(f, data):
+    """Ghi data rồi đệm tới bội số ALIGNMENT; trả về offset của data"""
+    offset = f.tell()
+    f.write(data)
+    f.write(b'\0' * (-f.tell() % ALIGNMENT))
+    return offset
+
+
+def write_bundle(snapshot: DatasetSnapshot, path) -> Path:
+    """
+    Ghi snapshot (DataFrame, skill matrix, text store, index, cube, trends) ra một file
+
+    Mỗi buffer mảng nằm nguyên vẹn, căn lề trong file; phần pickle chỉ còn
+    cấu trúc object (nhỏ). Ghi file tạm rồi rename.
+    """
+    path = Path(path)
+    tmp_file = path.with_name(path.name + '.tmp')
+
+    buffers = []
+    stream = io.BytesIO()
+    _BundlePickler(stream, protocol=5, buffer_callback=buffers.append).dump(snapshot)
+
+    with open(tmp_file, 'wb') as f:
+        layout = [[_write_aligned(f, buffer.raw()), buffer.raw().nbytes] for buffer in buffers]
+        data = stream.getbuffer()
+        pickle_offset = _write_aligned(f, data)
+
+        footer = json.dumps({
+            'version': snapshot.version,
+            'pickle': [pickle_offset, data.nbytes],
+            'buffers': layout,
+        }).encode('utf-8')
+        f.write(footer)
+        f.write(len(footer).to_bytes(8, 'little'))
+        f.write(MAGIC)
+
+    tmp_file.replace(path)
+    return path
+
+
+def read_bundle(path) -> DatasetSnapshot:
+    """
+    Gắn snapshot từ bundle bằng memory-map (chỉ đọc)
+
+    Mảng numpy / Arrow được dựng trực tiếp trên vùng map (không copy): mọi
+    process gắn cùng bundle dùng chung một bản trong page cache. Vùng map
+    sống đến khi snapshot không còn được tham chiếu.
+
+    Raises:
+        ValueError: file không phải bundle hợp lệ
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+
+    if len(view) < 16 or bytes(view[-8:]) != MAGIC:
+        raise ValueError(f"Không phải bundle snapshot: {path}")
+    footer_length = int.from_bytes(view[-16:-8], 'little')
+    footer = json.loads(bytes(view[-16 - footer_length:-16]))
+
+    buffers = [view[offset:offset + length] for offset, length in footer['buffers']]
+    offset, length = footer['pickle']
+    snapshot = pickle.loads(view[offset:offset + length], buffers=buffers)
+    snapshot.bundle = path
+    return snapshot
+
+
+# ============================================================================
+# PUBLISH
+# ============================================================================
+
+def current_bundle(directory) -> Optional[Path]:
+    """Bundle mà pointer đang trỏ tới, None nếu chưa có"""
+    try:
+        name = (Path(directory) / POINTER_NAME).read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return None
+    path = Path(directory) / name
+    return path if name and path.exists() else None
+
+
+def publish(snapshot: DatasetSnapshot, directory) -> Path:
+    """
+    Ghi bundle của snapshot, trỏ pointer sang bundle mới và xóa các bundle cũ
+    (giữ KEEP_BUNDLES bundle mới nhất)
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    bundle = write_bundle(snapshot, directory / f'{BUNDLE_PREFIX}{snapshot.version}{BUNDLE_SUFFIX}')
+
+    pointer = directory / POINTER_NAME
+    tmp_pointer = pointer.with_name(POINTER_NAME + '.tmp')
+    tmp_pointer.write_text(bundle.name, encoding='utf-8')
+    tmp_pointer.replace(pointer)
+
+    bundles = sorted(
+        directory.glob(f'{BUNDLE_PREFIX}*{BUNDLE_SUFFIX}'),
+        key=lambda path: path.stat().st_mtime_ns,
+        reverse=True
+    )
+    for old in bundles[KEEP_BUNDLES:]:
+        if old != bundle:
+            old.unlink(missing_ok=True)
+
+    return bundle
+
+
+def build_bundle(path, directory) -> Path:
+    """Load file dataset, dựng index và publish (chạy trong process phụ của PublishingDatasetStore)"""
+    return publish(load_snapshot(Path(path)), directory)
+
+
+# ============================================================================
+# STORES
+# ============================================================================
+
+class PublishingDatasetStore(DatasetStore):
+    """
+    Store của process cha: theo dõi output của transform như DatasetStore,
+    mỗi version được load + dựng index đúng một lần rồi publish thành bundle
+
+    Việc dựng chạy trong một process phụ (spawn) và kết thúc cùng nó: RAM tạm
+    của lúc dựng được trả hết cho hệ điều hành, process cha chỉ giữ bản gắn
+    vào bundle (dùng chung page cache với worker).
+    """
+
+    def __init__(self, directory, interval: float = RELOAD_INTERVAL):
+        super().__init__(interval)
+        self.directory = Path(directory)
+
+    def load(self, path: Path) -> DatasetSnapshot:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            bundle = executor.submit(build_bundle, path, self.directory).result()
+        print(f"📦 Đã publish snapshot dùng chung: {bundle}")
+        return read_bundle(bundle)
+
+
+class SharedDatasetStore(DatasetStore):
+    """
+    Store của worker: không tự load dataset, chỉ gắn bundle mà pointer trỏ tới
+
+    Hot reload = đọc lại pointer mỗi `interval` giây; process cha publish
+    version mới thì worker gắn bundle mới và bỏ bundle cũ.
+    """
+
+    def __init__(self, directory, interval: float = RELOAD_INTERVAL):
+        super().__init__(interval)
+        self.directory = Path(directory)
+
+    def locate(self) -> Optional[Path]:
+        return current_bundle(self.directory)
+
+    def is_current(self, snapshot: DatasetSnapshot, path: Path) -> bool:
+        return snapshot.bundle == path
+
+    def load(self, path: Path) -> DatasetSnapshot:
+        snapshot = read_bundle(path)
+        print(f"🔗 Worker {os.getpid()} đã gắn snapshot {snapshot.version} ({path.name})")
+        return snapshot
+
+    def report_missing(self):
+        print(f"❌ Chưa có snapshot dùng chung trong: {self.directory}")
+        print("⚠️  Khởi động server bằng: python -m api.serve")
@@ -0,0 +1,127 @@
+"""
+Skill Matrix - Ma trận kỹ năng bit-packed cho /api/top-skills
+Mỗi job một dòng ceil(số skill / 8) byte, bit j = job yêu cầu skill j
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+# Tên cột trong file Arrow và metadata chứa danh sách skill
+ARROW_COLUMN = 'skill_bits'
+NAMES_METADATA_KEY = b'skill_names'
+
+# Cột text trong CSV ('Python|SQL') và ký tự nối
+LABELS_COLUMN = 'skills'
+SKILL_SEPARATOR = '|'
+
+# Định dạng cũ: một cột bool cho mỗi skill
+LEGACY_PREFIX = 'skill_'
+
+# Taxonomy của ETL: thứ tự skill trong file = thứ tự bit trong file Arrow
+TAXONOMY_FILE = Path(__file__).parent.parent / 'etl' / 'skills_taxonomy.json'
+
+
+def taxonomy_names(path=TAXONOMY_FILE) -> List[str]:
+    """Tên skill theo thứ tự trong taxonomy ([] nếu không đọc được file)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [skill['name'] for skill in json.load(f).get('skills', [])]
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Không đọc được taxonomy skill {path}: {e}")
+        return []
+
+
+class SkillMatrix:
+    """
+    Ma trận job x skill dạng bit-packed (uint8, shape (num_rows, num_bytes))
+
+    Đếm skill cho cả dataset hoặc một tập row id chỉ là unpackbits + sum
+    theo cột, không cần một cột bool cho từng skill trong DataFrame.
+    """
+
+    def __init__(self, bits: np.ndarray, names: List[str]):
+        self.bits = bits
+        self.names = list(names)
+
+    def __len__(self):
+        return len(self.bits)
+
+    @classmethod
+    def from_arrow(cls, table):
+        """
+        Tách cột skill_bits khỏi Arrow table
+
+        Returns:
+            (SkillMatrix hoặc None, table không còn cột skill_bits)
+            Buffer của cột được dùng trực tiếp (zero-copy nếu chỉ có một chunk)
+        """
+        if ARROW_COLUMN not in table.column_names:
+            return None, table
+
+        field = table.schema.field(ARROW_COLUMN)
+        names = json.loads((field.metadata or {}).get(NAMES_METADATA_KEY, b'[]'))
+        width = field.type.byte_width
+
+        chunks = [np.empty(0, dtype=np.uint8)]
+        for chunk in table.column(ARROW_COLUMN).chunks:
+            if len(chunk) == 0:
+                continue
+            data = np.frombuffer(chunk.buffers()[1], dtype=np.uint8)
+            chunks.append(data[chunk.offset * width:(chunk.offset + len(chunk)) * width])
+        flat = chunks[1] if len(chunks) == 2 else np.concatenate(chunks)
+
+        table = table.drop([ARROW_COLUMN])
+        return cls(flat.reshape(-1, width), names), table
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, taxonomy_file=TAXONOMY_FILE):
+        """
+        Dựng ma trận từ DataFrame đọc từ CSV (cột `skills` hoặc các cột skill_* cũ)
+
+        Cột `skills` dùng cùng thứ tự skill với file Arrow (thứ tự trong
+        taxonomy) -> top-skills xếp các skill bằng số đếm giống nhau dù load
+        từ Arrow hay CSV. Skill không còn trong taxonomy đứng cuối.
+
+        Returns:
+            (SkillMatrix hoặc None, DataFrame không còn các cột skill)
+        """
+        if LABELS_COLUMN in df.columns:
+            labels = df[LABELS_COLUMN].fillna('').astype(str)
+            lists = [value.split(SKILL_SEPARATOR) if value else [] for value in labels]
+            present = {name for skills in lists for name in skills}
+            names = taxonomy_names(taxonomy_file)
+            names += sorted(present.difference(names))
+            index = {name: skill_id for skill_id, name in enumerate(names)}
+            dense = np.zeros((len(df), len(names)), dtype=bool)
+            for row, skills in enumerate(lists):
+                dense[row, [index[name] for name in skills]] = True
+            return cls(np.packbits(dense, axis=1), names), df.drop(columns=[LABELS_COLUMN])
+
+        legacy = [column for column in df.columns if column.startswith(LEGACY_PREFIX)]
+        if legacy:
+            # skill_python -> 'Python' chỉ đoán được tên gần đúng, giữ như endpoint cũ
+            names = [column[len(LEGACY_PREFIX):] for column in legacy]
+            names = [name.upper() if len(name) <= 3 else name.capitalize() for name in names]
+            dense = df[legacy].fillna(False).astype(bool).to_numpy()
+            return cls(np.packbits(dense, axis=1), names), df.drop(columns=legacy)
+
+        return None, df
+
+    def counts(self, row_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Số job có từng skill (trên cả dataset hoặc chỉ các row id cho trước)"""
+        bits = self.bits if row_ids is None else self.bits[row_ids]
+        return np.unpackbits(bits, axis=1, count=len(self.names)).sum(axis=0, dtype=np.int64)
+
+    def names_for(self, row_id: int) -> List[str]:
+        """Danh sách skill của một job"""
+        row = np.unpackbits(self.bits[row_id], count=len(self.names)).astype(bool)
+        return [name for name, present in zip(self.names, row) if present]
+
+    def labels(self, row_ids: np.ndarray) -> List[List[str]]:
+        """Danh sách skill của từng job trong row_ids (cho cột `skills` của /api/jobs)"""
+        bits = np.unpackbits(self.bits[row_ids], axis=1, count=len(self.names)).astype(bool)
+        return [[self.names[skill_id] for skill_id in np.flatnonzero(row)] for row in bits]
@@ -0,0 +1,173 @@
+"""
+Text Index - Inverted index cho keyword search trên job_title và job_description
+Dựng một lần khi load dataset; query = tra cứu prefix + giao các posting list
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.text_store import TextStore
+
+# Token = chữ/số, giữ hậu tố '+'/'#' để phân biệt c++, c#
+TOKEN_PATTERN = r'\w+[+#]*'
+TOKEN_RE = re.compile(TOKEN_PATTERN)
+COMBINING_MARKS_PATTERN = r'[\u0300-\u036f]'
+
+# Trọng số: match trong title quan trọng hơn description
+FIELD_WEIGHTS = {
+    'job_title': 3.0,
+    'job_description': 1.0
+}
+
+ROW_ID_DTYPE = np.int32
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase + bỏ dấu (é -> e) để query và index dùng chung chuẩn"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return re.sub(COMBINING_MARKS_PATTERN, '', text)
+
+
+def tokenize(text: str) -> List[str]:
+    """Tách query thành các token đã chuẩn hóa"""
+    return TOKEN_RE.findall(normalize_text(text))
+
+
+def _normalize_series(series: pd.Series) -> pd.Series:
+    """Bản vectorized của normalize_text cho cả cột"""
+    return (
+        series.astype(object).fillna('').astype(str)  # astype(object): cột category / string[pyarrow]
+        .str.lower()
+        .str.normalize('NFKD')
+        .str.replace(COMBINING_MARKS_PATTERN, '', regex=True)
+    )
+
+
+class InvertedIndex:
+    """
+    Inverted index dạng CSR
+
+    - vocab: các token đã sort dạng TextStore (tìm prefix bằng binary search,
+      không giữ list chuỗi Python -> map được từ shared bundle)
+    - offsets: posting của token thứ i nằm trong [offsets[i], offsets[i+1])
+    - doc_ids: row id, tăng dần trong mỗi posting
+    - weights: điểm tf-idf (đã nhân trọng số field) của token trong row đó
+
+    Vì vocab đã sort, mọi token có cùng prefix nằm liền nhau nên posting
+    của một prefix chỉ là một lát cắt liên tục của doc_ids/weights.
+    """
+
+    def __init__(self, df: pd.DataFrame, fields: Optional[dict] = None):
+        fields = fields or FIELD_WEIGHTS
+        self.num_rows = len(df)
+
+        frames = []
+        for column, weight in fields.items():
+            if column not in df.columns:
+                continue
+            tokens = _normalize_series(df[column]).str.findall(TOKEN_PATTERN)
+            exploded = tokens.explode().dropna()
+            frames.append(pd.DataFrame({
+                'token': exploded.to_numpy(),
+                'doc': exploded.index.to_numpy(),
+                'weight': weight
+            }))
+
+        if frames:
+            pairs = pd.concat(frames, ignore_index=True)
+        else:
+            pairs = pd.DataFrame({'token': [], 'doc': [], 'weight': []})
+
+        # Index của df có thể không phải 0..n-1 -> đổi sang vị trí dòng
+        if len(pairs) > 0:
+            pairs['doc'] = df.index.get_indexer(pairs['doc'])
+
+        # Tần suất có trọng số của mỗi (token, doc)
+        tf = pairs.groupby(['token', 'doc'], sort=True)['weight'].sum()
+
+        # tf đã sort theo token -> factorize giữ đúng thứ tự vocab
+        token_codes, vocab = pd.factorize(tf.index.get_level_values('token'))
+        self.vocab = TextStore.from_series(pd.Series(vocab, dtype=object))
+        self.doc_ids = tf.index.get_level_values('doc').to_numpy(dtype=ROW_ID_DTYPE)
+
+        counts = np.bincount(token_codes, minlength=len(self.vocab))
+        self.offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        # idf làm mượt: token càng hiếm càng có giá trị
+        idf = np.log1p(self.num_rows / np.maximum(counts, 1))
+        self.weights = ((1.0 + np.log(tf.to_numpy())) * np.repeat(idf, counts)).astype(np.float32)
+
+    def __len__(self):
+        return len(self.vocab)
+
+    @property
+    def nbytes(self) -> int:
+        """Số byte của các mảng posting + vocab"""
+        return int(self.offsets.nbytes + self.doc_ids.nbytes + self.weights.nbytes + self.vocab.nbytes)
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Khoảng [lo, hi) trong vocab của các token bắt đầu bằng prefix"""
+        lo = bisect_left(self.vocab, prefix)
+        hi = bisect_left(self.vocab, prefix + '\U0010ffff', lo)
+        return lo, hi
+
+    def _term_postings(self, term: str, prefix: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Row ids (tăng dần, unique) và điểm của một term"""
+        if prefix:
+            lo, hi = self._prefix_range(term)
+        else:
+            lo = bisect_left(self.vocab, term)
+            hi = lo + 1 if lo < len(self.vocab) and self.vocab[lo] == term else lo
+
+        start, end = self.offsets[lo], self.offsets[hi]
+        docs = self.doc_ids[start:end]
+        weights = self.weights[start:end]
+
+        if hi - lo <= 1:
+            return docs, weights
+
+        # Nhiều token cùng prefix -> gộp theo row, lấy điểm cao nhất
+        order = np.argsort(docs, kind='stable')
+        docs, weights = docs[order], weights[order]
+        unique_docs, starts = np.unique(docs, return_index=True)
+        return unique_docs, np.maximum.reduceat(weights, starts)
+
+    def search(self, query: str, prefix: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tìm các row chứa TẤT CẢ term trong query (AND)
+
+        Args:
+            query: Chuỗi tìm kiếm, ví dụ "data eng"
+            prefix: True -> mỗi term khớp mọi token bắt đầu bằng nó
+
+        Returns:
+            (row_ids tăng dần, scores tương ứng); (None, None) nếu query không có token
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return None, None
+
+        postings = [self._term_postings(term, prefix) for term in terms]
+        # Giao từ posting ngắn nhất
+        postings.sort(key=lambda item: len(item[0]))
+
+        ids, scores = postings[0]
+        for other_ids, other_scores in postings[1:]:
+            if len(ids) == 0:
+                break
+            ids, left, right = np.intersect1d(ids, other_ids, assume_unique=True, return_indices=True)
+            scores = scores[left] + other_scores[right]
+
+        return ids.astype(ROW_ID_DTYPE, copy=False), scores
+
+    def ranked(self, query: str, prefix: bool = True) -> np.ndarray:
+        """Row ids khớp query, sắp xếp theo điểm giảm dần"""
+        ids, scores = self.search(query, prefix=prefix)
+        if ids is None:
+            return np.empty(0, dtype=ROW_ID_DTYPE)
+        return ids[np.argsort(-scores, kind='stable')]
@@ -0,0 +1,119 @@
+"""
+Text Store - Cột text lớn (job_description) lưu ngoài DataFrame
+Một buffer UTF-8 liên tục + mảng offsets, đọc một dòng = cắt buffer rồi decode
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Không có pyarrow -> chỉ dựng từ pandas Series
+    pa = None
+
+
+class TextStore:
+    """
+    Cột text dạng (data, offsets) giống layout string của Arrow
+
+    - data: uint8, nội dung UTF-8 của mọi dòng nối liền nhau
+    - offsets: dòng i nằm trong data[offsets[i]:offsets[i + 1]]
+
+    Không có object Python cho từng dòng; dựng từ Arrow thì dùng thẳng
+    buffer của file memory-map (zero-copy).
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> 'TextStore':
+        """
+        Dựng từ Series (missing -> chuỗi rỗng)
+
+        Cột string[pyarrow] dùng lại buffer Arrow; cột object được encode
+        một lần thành một buffer (không giữ bytes tạm cho từng dòng).
+        """
+        if pa is not None and isinstance(series.dtype, pd.StringDtype) and series.dtype.storage == 'pyarrow':
+            return cls.from_arrow(pa.array(series.array))
+
+        values = series.fillna('').astype(str).tolist()
+        lengths = np.fromiter((len(value.encode('utf-8')) for value in values), dtype=np.int64, count=len(values))
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        data = np.frombuffer(''.join(values).encode('utf-8'), dtype=np.uint8)
+        return cls(data, offsets)
+
+    @classmethod
+    def from_arrow(cls, array) -> 'TextStore':
+        """Dựng từ mảng string / large_string của Arrow (Array hoặc ChunkedArray)"""
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks() if array.num_chunks != 1 else array.chunk(0)
+        if array.null_count:
+            array = pc.fill_null(array, '')
+
+        offset_type = np.int64 if pa.types.is_large_string(array.type) else np.int32
+        _, offsets_buffer, data_buffer = array.buffers()
+        offsets = np.frombuffer(offsets_buffer, dtype=offset_type)[array.offset:array.offset + len(array) + 1]
+        data = (
+            np.frombuffer(data_buffer, dtype=np.uint8)
+            if data_buffer is not None else np.empty(0, dtype=np.uint8)
+        )
+        return cls(data, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self, row_id: int) -> str:
+        """Text của một dòng"""
+        start, end = self.offsets[row_id], self.offsets[row_id + 1]
+        return self.data[start:end].tobytes().decode('utf-8')
+
+    def __getitem__(self, row_id: int) -> str:
+        # Cho bisect: store chứa chuỗi đã sort -> binary search không cần list chuỗi Python
+        return self.get(row_id)
+
+    def find(self, needle: str) -> np.ndarray:
+        """
+        Chỉ số các dòng chứa chuỗi con needle (tăng dần)
+
+        Tìm thẳng trên buffer UTF-8 (không decode từng dòng); UTF-8 tự đồng bộ
+        nên khớp byte = khớp ký tự, chỉ cần bỏ các lần khớp vắt qua hai dòng.
+        """
+        if not needle:
+            return np.arange(len(self), dtype=np.int64)
+        pattern = needle.encode('utf-8')
+        # Lookahead -> lấy cả các lần khớp chồng lên nhau
+        starts = np.fromiter(
+            (match.start() for match in re.finditer(b'(?=' + re.escape(pattern) + b')', self.data)),
+            dtype=np.int64
+        )
+        rows = np.searchsorted(self.offsets, starts, side='right') - 1
+        valid = (rows >= 0) & (rows < len(self))
+        rows, starts = rows[valid], starts[valid]
+        return np.unique(rows[starts + len(pattern) <= self.offsets[rows + 1]])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes + self.offsets.nbytes)
+
+
+def string_categories(values) -> pd.Categorical:
+    """
+    Categorical có categories kiểu string[pyarrow] (buffer UTF-8 + offsets)
+
+    Categories object là list chuỗi Python: khi ghi shared bundle chúng nằm
+    trong luồng pickle và mỗi worker dựng lại một bản; categories Arrow đi ra
+    ngoài luồng -> worker map thẳng từ bundle. Không có pyarrow (hoặc categories
+    không phải chuỗi, ví dụ bool) -> giữ nguyên.
+    """
+    categorical = pd.Categorical(values)
+    categories = categorical.categories
+    if pa is None or categories.dtype != object:
+        return categorical
+    dtype = pd.CategoricalDtype(categories.astype(pd.StringDtype('pyarrow')), ordered=categorical.ordered)
+    return pd.Categorical.from_codes(categorical.codes, dtype=dtype)
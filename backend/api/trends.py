@@ -0,0 +1,216 @@
+"""
+Trends - Chuỗi thời gian từ rollup theo ngày của các snapshot (data/trends)
+Chỉ đọc rollup.json (vài KB mỗi partition), không quét lại jobs; gộp theo ngày / tuần / tháng
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+TRENDS_DIR = Path(__file__).parent.parent / 'data' / 'trends'
+ROLLUP_NAME = 'rollup.json'
+
+# Phải khớp với etl/trend_store.py
+ROLLUP_VERSION = 1
+
+# Khoảng thời gian gộp -> period của pandas (tuần bắt đầu từ thứ Hai)
+BUCKETS = {'day': 'D', 'week': 'W-SUN', 'month': 'M'}
+
+# Số skill mặc định trong response khi không chỉ định (skill phổ biến nhất trong khoảng đã chọn)
+DEFAULT_TREND_SKILLS = 5
+
+
+# ============================================================================
+# LOAD
+# ============================================================================
+
+def read_rollups(root=TRENDS_DIR) -> List[dict]:
+    """Mọi rollup đọc được trong root (bỏ qua file hỏng / khác version)"""
+    rollups = []
+    for path in sorted(Path(root).glob(f'crawl_date=*/country=*/{ROLLUP_NAME}')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                rollup = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Bỏ qua rollup lỗi {path}: {e}")
+            continue
+        if rollup.get('version') == ROLLUP_VERSION:
+            rollups.append(rollup)
+    return rollups
+
+
+def salary_edges(bins: dict) -> np.ndarray:
+    """Biên các bin lương (thang log) theo cấu hình lưu trong rollup"""
+    return np.geomspace(bins['min'], bins['max'], bins['count'] + 1)
+
+
+class TrendStore:
+    """
+    Rollup theo (quốc gia, ngày đăng) đã gộp từ mọi lần crawl
+
+    Cùng một job xuất hiện trong nhiều lần crawl liên tiếp nên không cộng
+    các snapshot với nhau: mỗi (quốc gia, ngày) lấy rollup của lần crawl
+    thấy nhiều jobs nhất cho ngày đó (bằng nhau -> lần crawl mới hơn).
+
+    - daily: DataFrame (country, date, jobs, salary_jobs), một dòng mỗi (quốc gia, ngày)
+    - skill_counts: int32 (số dòng daily, số skill), skill_names: tên cột
+    - salary_hist: {currency: int32 (số ô khác 0, 3)}, mỗi dòng là
+      (dòng daily, bin, số jobs); edges: biên bin. Lưu thưa vì mỗi đồng tiền
+      chỉ xuất hiện ở các ngày của quốc gia dùng nó.
+    """
+
+    def __init__(self, rollups: List[dict]):
+        chosen: Dict[tuple, tuple] = {}
+        self.edges = None
+        for rollup in rollups:
+            edges = salary_edges(rollup['salary_bins'])
+            if self.edges is None:
+                self.edges = edges
+            elif len(edges) != len(self.edges) or not np.allclose(edges, self.edges):
+                print(f"⚠️  Bỏ qua rollup {rollup['crawl_date']}/{rollup['country']}: khác cấu hình bin lương")
+                continue
+            for day in rollup['days']:
+                key = (rollup['country'], day['date'])
+                rank = (day['jobs'], rollup['crawl_date'])
+                if key not in chosen or rank > chosen[key][0]:
+                    chosen[key] = (rank, day)
+
+        keys = sorted(chosen)
+        days = [chosen[key][1] for key in keys]
+
+        self.daily = pd.DataFrame({
+            'country': pd.Categorical([country for country, _ in keys]),
+            'date': pd.to_datetime([day for _, day in keys]),
+            'jobs': np.array([day['jobs'] for day in days], dtype=np.int64),
+            'salary_jobs': np.array([day['salary_jobs'] for day in days], dtype=np.int64),
+        })
+
+        self.skill_names = sorted({skill for day in days for skill in day['skills']})
+        skill_ids = {skill: i for i, skill in enumerate(self.skill_names)}
+        self.skill_counts = np.zeros((len(days), len(self.skill_names)), dtype=np.int32)
+        for row, day in enumerate(days):
+            for skill, count in day['skills'].items():
+                self.skill_counts[row, skill_ids[skill]] = count
+
+        self.num_bins = len(self.edges) - 1 if self.edges is not None else 0
+        cells: Dict[str, list] = {}
+        for row, day in enumerate(days):
+            for currency, histogram in day['salary_hist'].items():
+                cells.setdefault(currency, []).extend(
+                    (row, int(bin_id), count) for bin_id, count in histogram.items()
+                )
+        self.salary_hist: Dict[str, np.ndarray] = {
+            currency: np.array(entries, dtype=np.int32).reshape(-1, 3)
+            for currency, entries in cells.items()
+        }
+
+        self.crawl_dates = sorted({rollup['crawl_date'] for rollup in rollups})
+
+    @classmethod
+    def load(cls, root=TRENDS_DIR) -> 'TrendStore':
+        return cls(read_rollups(root))
+
+    def __len__(self):
+        return len(self.daily)
+
+    def median(self, histogram: np.ndarray) -> Optional[float]:
+        """Median nội suy từ histogram (trong bin: nội suy theo thang log)"""
+        total = histogram.sum()
+        if total == 0:
+            return None
+        cumulative = np.cumsum(histogram)
+        half = total / 2
+        bin_id = int(np.searchsorted(cumulative, half))
+        before = cumulative[bin_id - 1] if bin_id > 0 else 0
+        fraction = (half - before) / histogram[bin_id]
+        low, high = self.edges[bin_id], self.edges[bin_id + 1]
+        return float(low * (high / low) ** fraction)
+
+    def query(self, country: Optional[str] = None, skills: Optional[List[str]] = None,
+              bucket: str = 'week', date_from=None, date_to=None) -> dict:
+        """
+        Chuỗi thời gian theo bucket
+
+        Mỗi period: số jobs, số jobs có lương, median lương theo currency và
+        tỷ lệ (%) jobs yêu cầu từng skill. skills=None -> DEFAULT_TREND_SKILLS
+        skill phổ biến nhất trong khoảng đã chọn.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"bucket không hợp lệ: {bucket} (chọn trong {', '.join(BUCKETS)})")
+
+        mask = np.ones(len(self.daily), dtype=bool)
+        if country:
+            mask &= (self.daily['country'].astype(str).str.lower() == country.lower()).to_numpy()
+        if date_from is not None:
+            mask &= (self.daily['date'] >= pd.Timestamp(date_from)).to_numpy()
+        if date_to is not None:
+            mask &= (self.daily['date'] <= pd.Timestamp(date_to)).to_numpy()
+        rows = np.flatnonzero(mask)
+
+        if skills:
+            skill_ids = {skill.lower(): i for i, skill in enumerate(self.skill_names)}
+            unknown = [skill for skill in skills if skill.lower() not in skill_ids]
+            if unknown:
+                raise ValueError(f"skill không có trong dữ liệu trend: {', '.join(unknown)}")
+            selected = [skill_ids[skill.lower()] for skill in skills]
+        else:
+            totals = self.skill_counts[rows].sum(axis=0)
+            selected = [int(i) for i in np.argsort(-totals, kind='stable')[:DEFAULT_TREND_SKILLS] if totals[i] > 0]
+
+        periods = self.daily['date'].iloc[rows].dt.to_period(BUCKETS[bucket]).dt.start_time
+        codes, starts = pd.factorize(periods, sort=True)
+
+        # Cộng các dòng theo ngày vào period của chúng
+        def sum_by_period(values):
+            result = np.zeros((len(starts),) + values.shape[1:], dtype=np.int64)
+            np.add.at(result, codes, values[rows])
+            return result
+
+        # Histogram thưa: period của từng ô (-1 = dòng ngoài khoảng đã chọn)
+        period_of = np.full(len(self.daily), -1, dtype=np.int64)
+        period_of[rows] = codes
+
+        def histogram_by_period(cells):
+            periods = period_of[cells[:, 0]]
+            keep = periods >= 0
+            result = np.zeros((len(starts), self.num_bins), dtype=np.int64)
+            np.add.at(result, (periods[keep], cells[keep, 1]), cells[keep, 2])
+            return result
+
+        jobs = sum_by_period(self.daily['jobs'].to_numpy())
+        salary_jobs = sum_by_period(self.daily['salary_jobs'].to_numpy())
+        skill_counts = sum_by_period(self.skill_counts[:, selected])
+        histograms = {currency: histogram_by_period(cells) for currency, cells in self.salary_hist.items()}
+
+        data = []
+        for period, start in enumerate(starts):
+            total = int(jobs[period])
+            medians = {}
+            for currency, histogram in histograms.items():
+                value = self.median(histogram[period])
+                if value is not None:
+                    medians[currency] = round(value)
+            data.append({
+                'period': start.strftime('%Y-%m-%d'),
+                'jobs': total,
+                'salary_jobs': int(salary_jobs[period]),
+                'median_salary': medians,
+                'skill_share': {
+                    self.skill_names[skill_id]: round(skill_counts[period, i] / total * 100, 1) if total else 0.0
+                    for i, skill_id in enumerate(selected)
+                },
+            })
+
+        return {
+            'bucket': bucket,
+            'country': country,
+            'skills': [self.skill_names[skill_id] for skill_id in selected],
+            'crawl_dates': self.crawl_dates,
+            'data': data,
+        }
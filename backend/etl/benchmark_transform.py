@@ -0,0 +1,170 @@
+"""
+Benchmark - Throughput của transform pipeline (rows/giây)
+So sánh bản vectorized hiện tại với cách xử lý từng dòng cũ trên dữ liệu giả lập
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import re
+import time
+import warnings
+
+import pandas as pd
+
+import transform_jobs
+from skill_matcher import SkillMatcher
+
+# ============================================================================
+# DỮ LIỆU GIẢ LẬP
+# ============================================================================
+WORDS = (
+    'python sql aws excel english data pipeline team agile cloud spark kafka '
+    'docker analytics dashboard reporting stakeholder engineer modelling etl'
+).split()
+
+
+def generate_jobs(num_jobs, seed=42):
+    """Sinh raw jobs có cấu trúc giống response Adzuna"""
+    rng = random.Random(seed)
+    countries = list(transform_jobs.COUNTRY_TO_REGION)
+    jobs = []
+
+    for i in range(num_jobs):
+        words = ' '.join(rng.choice(WORDS) for _ in range(80))
+        job = {
+            'id': str(i),
+            'title': f"{rng.choice(['Senior ', 'Junior ', ''])}{rng.choice(['Data Analyst', 'Data Engineer', 'Software Engineer'])} {i % 997}",
+            'company': {'display_name': f'Company {rng.randint(1, 500)}'},
+            'location': {'display_name': f'City {rng.randint(1, 50)}'},
+            'description': f'<p><strong>{words}</strong></p>\n  <ul><li>{words}</li></ul>',
+            'created': '2026-01-15T10:00:00Z',
+            '_category': 'Data Analyst',
+            '_country_code': rng.choice(countries)
+        }
+        if rng.random() < 0.5:
+            job['salary_min'] = rng.randint(30, 90) * 1000
+            job['salary_max'] = job['salary_min'] + rng.randint(5, 40) * 1000
+        jobs.append(job)
+
+    return jobs
+
+
+# ============================================================================
+# BASELINE: XỬ LÝ TỪNG DÒNG (cách làm trước khi vectorize)
+# ============================================================================
+
+def _legacy_extract_fields(job):
+    location = job.get('location', {})
+    company = job.get('company', {})
+    return {
+        'job_title': job.get('title', ''),
+        'company': company.get('display_name', 'Unknown') if isinstance(company, dict) else str(company),
+        'country': job.get('_country_code', '').upper(),
+        'city': location.get('display_name', '') if isinstance(location, dict) else str(location),
+        'salary_min': job.get('salary_min'),
+        'salary_max': job.get('salary_max'),
+        'job_description': job.get('description', ''),
+        'date_posted': job.get('created', ''),
+        'category': job.get('_category', 'Unknown')
+    }
+
+
+def _legacy_clean_html(text):
+    if not isinstance(text, str):
+        return ''
+    return ' '.join(re.sub(r'<[^>]+>', '', text).split())
+
+
+def run_legacy(jobs):
+    df = pd.DataFrame([_legacy_extract_fields(job) for job in jobs])
+    df['job_description'] = df['job_description'].apply(_legacy_clean_html)
+    return df
+
+
+def run_legacy_skills(texts, skill_names):
+    """Mỗi skill một lượt regex trên toàn bộ cột (cách analyze_skills cũ)"""
+    return {
+        skill: texts.str.contains(r'\b' + re.escape(skill) + r'\b', case=False, regex=True, na=False)
+        for skill in skill_names
+    }
+
+
+def run_vectorized(jobs, chunk_size):
+    frames = [
+        transform_jobs.extract_fields(jobs[start:start + chunk_size])
+        for start in range(0, len(jobs), chunk_size)
+    ]
+    df = pd.concat(frames, ignore_index=True)
+    df['job_description'] = transform_jobs.clean_html(df['job_description'])
+    return df
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def measure(label, func, num_rows, repeat):
+    """Chạy func `repeat` lần, in thời gian tốt nhất và throughput"""
+    best = float('inf')
+    for _ in range(repeat):
+        # Ẩn log của pipeline để không lẫn vào kết quả đo
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+
+    print(f"   {label:<28} {best:8.3f}s   {num_rows / best:>12,.0f} rows/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transform pipeline")
+    parser.add_argument('--rows', type=int, default=50000, help="Số jobs giả lập")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Kích thước chunk")
+    parser.add_argument('--repeat', type=int, default=3, help="Số lần chạy (lấy kết quả tốt nhất)")
+    parser.add_argument('--skip-legacy', action='store_true', help="Bỏ qua baseline xử lý từng dòng")
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    print("\n" + "="*70)
+    print(f"⏱️  BENCHMARK TRANSFORM - {args.rows:,} jobs")
+    print("="*70)
+
+    jobs = generate_jobs(args.rows)
+
+    print("\n📋 Extract fields + clean HTML:")
+    vectorized = measure('vectorized', lambda: run_vectorized(jobs, args.chunk_size), args.rows, args.repeat)
+    if not args.skip_legacy:
+        legacy = measure('legacy (từng dòng)', lambda: run_legacy(jobs), args.rows, args.repeat)
+        print(f"   ⚡ Nhanh hơn {legacy / vectorized:.1f}x")
+
+    df = run_vectorized(jobs, args.chunk_size)
+    matcher = SkillMatcher.from_file(transform_jobs.SKILLS_TAXONOMY_FILE)
+
+    print(f"\n🔍 Nhận diện skill ({len(matcher)} skills trong taxonomy):")
+    single_pass = measure('SkillMatcher (1 lượt)', lambda: matcher.match(df['job_description']), args.rows, args.repeat)
+    if not args.skip_legacy:
+        legacy = measure(
+            'regex từng skill',
+            lambda: run_legacy_skills(df['job_description'], matcher.names),
+            args.rows,
+            args.repeat
+        )
+        print(f"   ⚡ Nhanh hơn {legacy / single_pass:.1f}x")
+
+    print("\n🧹 Toàn bộ clean_data + analyze_skills:")
+    measure(
+        'clean_data + analyze_skills',
+        lambda: transform_jobs.analyze_skills(transform_jobs.clean_data(df.copy())),
+        args.rows,
+        args.repeat
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main()
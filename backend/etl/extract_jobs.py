@@ -3,13 +3,27 @@ ETL Script - Extract Jobs Data from Adzuna API
 Thu thập dữ liệu việc làm từ 7 quốc gia và 3 nghề nghiệp
 """
 
-import requests
+import aiohttp
+import argparse
+import asyncio
 import json
+import math
+import random
 import time
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+from raw_store import (
+    LEGACY_SUFFIX,
+    RawJobWriter,
+    find_shard,
+    iter_job_chunks,
+    iter_raw_jobs,
+    remove_other_shards,
+    shard_path
+)
+
 # ============================================================================
 # LOAD ENVIRONMENT VARIABLES
 # ============================================================================
@@ -23,6 +37,9 @@ load_dotenv()
 ADZUNA_APP_ID = os.getenv('ADZUNA_APP_ID')
 ADZUNA_APP_KEY = os.getenv('ADZUNA_APP_KEY')
 
+# Base URL (đổi sang stub server local khi test: http://127.0.0.1:8080)
+ADZUNA_API_URL = os.getenv('ADZUNA_API_URL', 'https://api.adzuna.com/v1/api')
+
 # ============================================================================
 # CẤU HÌNH THU THẬP DỮ LIỆU
 # ============================================================================
@@ -49,9 +66,64 @@ JOB_KEYWORDS = [
 RESULTS_PER_PAGE = 50
 MAX_PAGES = 2  # Tối đa 2 trang (100 jobs) mỗi keyword
 
+# Chế độ incremental: crawl sâu hơn nhưng dừng ngay khi gặp job đã có
+INCREMENTAL_MAX_PAGES = int(os.getenv('ADZUNA_INCREMENTAL_MAX_PAGES', '20'))
+
+# ============================================================================
+# CẤU HÌNH RATE LIMIT & CONCURRENCY
+# ============================================================================
+# Token bucket: trung bình RATE_LIMIT request/giây, cho phép burst RATE_BURST
+RATE_LIMIT = float(os.getenv('ADZUNA_RATE_LIMIT', '2'))
+RATE_BURST = int(os.getenv('ADZUNA_RATE_BURST', '4'))
+
+# Số request chạy song song tối đa
+MAX_CONCURRENCY = int(os.getenv('ADZUNA_MAX_CONCURRENCY', '8'))
+
+# Retry cho 429 và 5xx (exponential backoff + jitter)
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0  # giây
+REQUEST_TIMEOUT = 10  # giây
+
 # Output directory
 OUTPUT_DIR = Path(__file__).parent.parent / 'data' / 'raw_jobs'
 
+# Checkpoint của chế độ incremental (để ngoài raw_jobs vì transform đọc *.json trong đó)
+CHECKPOINT_FILE = Path(__file__).parent.parent / 'data' / 'extract_checkpoint.json'
+
+
+# ============================================================================
+# RATE LIMITER
+# ============================================================================
+
+class TokenBucket:
+    """
+    Token bucket cho asyncio
+    
+    Bucket chứa tối đa `capacity` token, được nạp lại `rate` token/giây.
+    Mỗi request lấy 1 token; hết token thì chờ đến khi được nạp lại.
+    """
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    async def acquire(self):
+        """Chờ đến khi lấy được 1 token"""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
 
 # ============================================================================
 # HÀM CHÍNH
@@ -63,108 +135,386 @@ def create_output_directory():
     print(f"✅ Output directory sẵn sàng: {OUTPUT_DIR}")
 
 
-def fetch_jobs_for_country_keyword(country_code, keyword, page=1):
+def _retry_delay(attempt, retry_after=None):
+    """Thời gian chờ trước lần retry thứ `attempt` (ưu tiên header Retry-After)"""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return BACKOFF_BASE * (2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+
+
+async def fetch_jobs_for_country_keyword(session, limiter, country_code, keyword, page=1, extra_params=None):
     """
     Gọi Adzuna API để lấy jobs cho quốc gia và keyword cụ thể
     
     Args:
+        session: aiohttp.ClientSession dùng chung (connection pool)
+        limiter: TokenBucket giới hạn tốc độ gọi API
         country_code: Mã quốc gia (vn, sg, us...)
         keyword: Từ khóa nghề nghiệp
         page: Số trang (bắt đầu từ 1)
+        extra_params: Query params bổ sung (vd: sort_by)
     
     Returns:
         dict: Response từ API hoặc None nếu lỗi
     """
     # Build API URL
-    base_url = f"https://api.adzuna.com/v1/api/jobs/{country_code}/search/{page}"
+    url = f"{ADZUNA_API_URL}/jobs/{country_code}/search/{page}"
     
     params = {
         'app_id': ADZUNA_APP_ID,
         'app_key': ADZUNA_APP_KEY,
         'what': keyword,
         'results_per_page': RESULTS_PER_PAGE,
-        'content-type': 'application/json'
+        'content-type': 'application/json',
+        **(extra_params or {})
     }
     
-    try:
-        print(f"   📡 Đang gọi API: {country_code} - {keyword} (trang {page})")
-        response = requests.get(base_url, params=params, timeout=10)
+    for attempt in range(MAX_RETRIES + 1):
+        await limiter.acquire()
         
-        if response.status_code == 200:
-            data = response.json()
-            count = data.get('count', 0)
-            results = len(data.get('results', []))
-            print(f"   ✅ Thành công! Tìm thấy {results} jobs (tổng: {count})")
-            return data
-        else:
-            print(f"   ❌ Lỗi {response.status_code}: {response.text[:100]}")
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None)
+                    count = data.get('count', 0)
+                    results = len(data.get('results', []))
+                    print(f"   ✅ {country_code} - {keyword} (trang {page}): {results} jobs (tổng: {count})")
+                    return data
+                
+                text = await response.text()
+                
+                # 429 / 5xx -> lỗi tạm thời, retry với backoff
+                if response.status == 429 or response.status >= 500:
+                    if attempt < MAX_RETRIES:
+                        delay = _retry_delay(attempt, response.headers.get('Retry-After'))
+                        print(f"   🔁 {country_code} - {keyword} (trang {page}): lỗi {response.status}, thử lại sau {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                
+                print(f"   ❌ {country_code} - {keyword} (trang {page}): lỗi {response.status}: {text[:100]}")
+                return None
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt < MAX_RETRIES:
+                delay = _retry_delay(attempt)
+                print(f"   🔁 {country_code} - {keyword} (trang {page}): {type(e).__name__}, thử lại sau {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            print(f"   ❌ Exception: {str(e)}")
             return None
+    
+    return None
+
+
+def _tag_category(jobs, keyword):
+    """Tag mỗi job với category (keyword)"""
+    for job in jobs:
+        job['_category'] = keyword
+    return jobs
+
+
+def _newest_created(jobs, newest=''):
+    """Timestamp `created` mới nhất trong jobs (so sánh chuỗi ISO 8601)"""
+    return max([newest] + [job.get('created', '') for job in jobs])
+
+
+class CountrySink:
+    """
+    Đích ghi jobs của một quốc gia
+
+    Các keyword được crawl song song nhưng được ghi theo đúng thứ tự
+    JOB_KEYWORDS (trong một keyword: theo số trang), giống hệt khi crawl tuần
+    tự: job trùng giữa các keyword luôn mang `_category` của keyword đứng
+    trước và thứ tự dòng trong shard không phụ thuộc request nào về trước.
+
+    Một keyword được bỏ trùng theo Adzuna job id rồi ghi xuống shard NDJSON
+    ngay khi nó và mọi keyword đứng trước đã xong -> chỉ giữ các trang đang
+    chờ trong RAM, không phải cả quốc gia.
+    """
+
+    def __init__(self, writer, seen_ids, keywords=JOB_KEYWORDS):
+        self.writer = writer
+        self.seen_ids = seen_ids
+        self.new_count = 0
+        # Keyword chưa ghi (theo thứ tự) -> {page: jobs}
+        self.pending = {keyword: {} for keyword in keywords}
+        self.finished = set()
+
+    def add(self, keyword, page, jobs):
+        """Giữ jobs của một trang đến lượt keyword được ghi"""
+        self.pending[keyword][page] = jobs
+
+    def finish(self, keyword):
+        """Đánh dấu keyword đã xong (kể cả lỗi) và ghi các keyword đầu hàng đã đủ điều kiện"""
+        self.finished.add(keyword)
+        while self.pending and next(iter(self.pending)) in self.finished:
+            keyword = next(iter(self.pending))
+            pages = self.pending.pop(keyword)
+            for page in sorted(pages):
+                self.write(_tag_category(pages[page], keyword))
+
+    def write(self, jobs):
+        unique_jobs = dedup_by_id(jobs, self.seen_ids)
+        self.writer.write(unique_jobs)
+        self.new_count += len(unique_jobs)
+
+
+async def fetch_keyword(session, limiter, semaphore, country_code, keyword, sink):
+    """
+    Thu thập tất cả các trang của một (country_code, keyword)
+    
+    Trang 1 được gọi trước để biết tổng số kết quả; các trang còn lại
+    (tối đa MAX_PAGES) được gọi song song. Mỗi trang được giữ trong sink,
+    sink ghi cả keyword theo thứ tự trang khi keyword xong.
+    
+    Returns:
+        (str, bool): `created` mới nhất đã thấy và cờ đã crawl trọn vẹn hay chưa
+    """
+    async def fetch(page):
+        async with semaphore:
+            data = await fetch_jobs_for_country_keyword(session, limiter, country_code, keyword, page)
+        if data and 'results' in data:
+            sink.add(keyword, page, data['results'])
+        return data
+    
+    try:
+        first = await fetch(1)
+        if not first or 'results' not in first:
+            print(f"   ⚠️  {country_code} - {keyword}: API call thất bại, skip keyword này")
+            return '', False
+        
+        pages = [first]
+        total_pages = min(MAX_PAGES, math.ceil(first.get('count', 0) / RESULTS_PER_PAGE))
+        
+        if first['results'] and total_pages > 1:
+            pages.extend(await asyncio.gather(*(fetch(page) for page in range(2, total_pages + 1))))
+    finally:
+        sink.finish(keyword)
+    
+    complete = all(data and 'results' in data for data in pages)
+    newest = ''
+    for data in pages:
+        if data and 'results' in data:
+            newest = _newest_created(data['results'], newest)
+    
+    return newest, complete
+
+
+async def fetch_keyword_incremental(session, limiter, semaphore, country_code, keyword, sink, checkpoint):
+    """
+    Crawl incremental một (country_code, keyword)
+    
+    Gọi API với sort_by=date (mới nhất trước) và đi tuần tự từng trang,
+    dừng ngay khi gặp job có `created` không mới hơn checkpoint của chính
+    (country_code, keyword) này. Nhờ vậy có thể cho phép crawl sâu
+    (INCREMENTAL_MAX_PAGES) mà lần chạy hằng đêm chỉ tốn vài request.
+    
+    Tập job id đã có của quốc gia (dùng chung mọi keyword) chỉ để bỏ trùng:
+    một job đã được keyword khác lấy về không có nghĩa keyword này đã crawl
+    tới phần dữ liệu cũ.
+    
+    Đã có checkpoint mà hết INCREMENTAL_MAX_PAGES trang vẫn chưa gặp job cũ
+    -> giữa trang cuối và checkpoint còn job chưa lấy: trả về chưa trọn vẹn
+    để checkpoint không tiến (lần sau lấy lại từ đầu, dedup theo id tránh trùng).
+    
+    Returns:
+        (str, bool): `created` mới nhất đã thấy và cờ đã crawl trọn vẹn hay chưa
+    """
+    last_created = (checkpoint or {}).get('last_created', '')
+    newest = ''
+    
+    try:
+        for page in range(1, INCREMENTAL_MAX_PAGES + 1):
+            async with semaphore:
+                data = await fetch_jobs_for_country_keyword(
+                    session, limiter, country_code, keyword, page,
+                    extra_params={'sort_by': 'date'}
+                )
+            
+            if not data or 'results' not in data:
+                print(f"   ⚠️  {country_code} - {keyword}: API call thất bại ở trang {page}")
+                return newest, False
             
-    except Exception as e:
-        print(f"   ❌ Exception: {str(e)}")
-        return None
+            results = data['results']
+            fresh = [
+                job for job in results
+                if not last_created or job.get('created', '') > last_created
+            ]
+            # Job trùng id với job đã có (của bất kỳ keyword nào) bị bỏ trong sink
+            sink.add(keyword, page, fresh)
+            newest = _newest_created(fresh, newest)
+            
+            # Gặp job không mới hơn checkpoint của keyword này hoặc hết kết quả -> dừng pagination
+            if len(fresh) < len(results) or len(results) < RESULTS_PER_PAGE:
+                return newest, True
+    finally:
+        sink.finish(keyword)
+    
+    if not last_created:
+        # Chưa có checkpoint: giống full crawl, chỉ lấy tối đa INCREMENTAL_MAX_PAGES trang mới nhất
+        return newest, True
+    
+    print(
+        f"   ⚠️  {country_code} - {keyword}: hết {INCREMENTAL_MAX_PAGES} trang vẫn chưa tới checkpoint, "
+        f"giữ checkpoint cũ (tăng ADZUNA_INCREMENTAL_MAX_PAGES hoặc chạy full crawl)"
+    )
+    return newest, False
+
+
+def load_checkpoints():
+    """Đọc checkpoint {"cc:keyword": {...}} của các lần chạy incremental trước"""
+    if not CHECKPOINT_FILE.exists():
+        return {}
+    with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoints(checkpoints):
+    """Ghi checkpoint (file tạm + rename để không hỏng khi bị ngắt giữa chừng)"""
+    tmp_file = CHECKPOINT_FILE.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(checkpoints, f, indent=2, ensure_ascii=False)
+    tmp_file.replace(CHECKPOINT_FILE)
+
+
+def open_country_shard(country_code, incremental):
+    """
+    Mở writer NDJSON cho một quốc gia
+    
+    - Full: ghi shard mới (file tạm, commit khi xong)
+    - Incremental: append vào shard hiện có; nếu chỉ có file .json định dạng
+      cũ thì chuyển đổi sang NDJSON trước
+    
+    Returns:
+        (RawJobWriter, set): writer và tập job id đã có trong shard
+    """
+    legacy_file = OUTPUT_DIR / f"{country_code}{LEGACY_SUFFIX}"
+    
+    if not incremental:
+        return RawJobWriter(shard_path(OUTPUT_DIR, country_code)), set()
+    
+    existing = find_shard(OUTPUT_DIR, country_code)
+    
+    if existing is None and legacy_file.exists():
+        print(f"   🔄 Chuyển {legacy_file.name} sang NDJSON")
+        writer = RawJobWriter(shard_path(OUTPUT_DIR, country_code))
+        for chunk in iter_job_chunks([legacy_file]):
+            writer.write(chunk)
+        writer.commit()
+        legacy_file.unlink()
+        existing = writer.path
+    
+    seen_ids = set()
+    if existing is not None:
+        seen_ids = {str(job.get('id')) for job in iter_raw_jobs(existing) if job.get('id')}
+    
+    return RawJobWriter(existing or shard_path(OUTPUT_DIR, country_code), append=True), seen_ids
 
 
-def extract_jobs_for_country(country_code, country_name):
+def dedup_by_id(jobs, seen_ids):
+    """Bỏ các job có Adzuna id đã xuất hiện (cập nhật seen_ids tại chỗ)"""
+    unique_jobs = []
+    for job in jobs:
+        job_id = str(job.get('id', ''))
+        if job_id and job_id in seen_ids:
+            continue
+        if job_id:
+            seen_ids.add(job_id)
+        unique_jobs.append(job)
+    return unique_jobs
+
+
+async def extract_all_countries(countries=None, incremental=False):
     """
-    Thu thập tất cả jobs cho một quốc gia (tất cả keywords)
+    Thu thập song song mọi (country_code, keyword, page)
+    
+    Một ClientSession dùng chung cho toàn bộ request, semaphore giới hạn
+    số request đồng thời, TokenBucket giới hạn tốc độ thay cho time.sleep.
+    Jobs được ghi xuống raw_jobs/{country_code}.ndjson theo từng keyword,
+    đúng thứ tự JOB_KEYWORDS (xem CountrySink).
     
     Args:
-        country_code: Mã quốc gia
-        country_name: Tên quốc gia
+        countries: Dict {country_code: country_name} (mặc định COUNTRIES)
+        incremental: True -> chỉ lấy job mới và append vào raw file hiện có
     """
-    print(f"\n{'='*70}")
-    print(f"🌍 Quốc gia: {country_name} ({country_code.upper()})")
-    print(f"{'='*70}")
+    countries = countries or COUNTRIES
+    limiter = TokenBucket(RATE_LIMIT, RATE_BURST)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
     
-    all_jobs = []
+    checkpoints = load_checkpoints()
+    sinks = {}
+    for country_code in countries:
+        writer, seen_ids = open_country_shard(country_code, incremental)
+        sinks[country_code] = CountrySink(writer, seen_ids)
     
-    for keyword in JOB_KEYWORDS:
-        print(f"\n🔍 Keyword: '{keyword}'")
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY)
+    
+    try:
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            tasks = {}
+            for country_code in countries:
+                for keyword in JOB_KEYWORDS:
+                    if incremental:
+                        coro = fetch_keyword_incremental(
+                            session, limiter, semaphore, country_code, keyword,
+                            sinks[country_code], checkpoints.get(f"{country_code}:{keyword}")
+                        )
+                    else:
+                        coro = fetch_keyword(session, limiter, semaphore, country_code, keyword, sinks[country_code])
+                    tasks[(country_code, keyword)] = asyncio.create_task(coro)
+            await asyncio.gather(*tasks.values())
+    except BaseException:
+        # Full crawl lỗi giữa chừng -> giữ nguyên shard cũ
+        for sink in sinks.values():
+            sink.writer.abort()
+        raise
+    
+    for country_code, country_name in countries.items():
+        sink = sinks[country_code]
+        sink.writer.commit()
         
-        for page in range(1, MAX_PAGES + 1):
-            # Gọi API
-            data = fetch_jobs_for_country_keyword(country_code, keyword, page)
-            
-            if data and 'results' in data:
-                jobs = data['results']
-                # Tag mỗi job với category (keyword)
-                for job in jobs:
-                    job['_category'] = keyword
-                all_jobs.extend(jobs)
-                
-                # Nếu không còn jobs, dừng pagination
-                if len(jobs) == 0:
-                    print(f"   ℹ️  Không còn jobs, dừng pagination")
-                    break
-            else:
-                print(f"   ⚠️  API call thất bại, skip trang này")
-                break
+        # Shard vừa ghi thay thế file .json cũ / shard với kiểu nén khác
+        remove_other_shards(OUTPUT_DIR, country_code, keep=sink.writer.path)
+        
+        for keyword in JOB_KEYWORDS:
+            newest, complete = tasks[(country_code, keyword)].result()
             
-            # Sleep để tránh rate limit (chỉ sleep nếu chưa phải page cuối)
-            if page < MAX_PAGES:
-                time.sleep(2)
+            # Chỉ tiến checkpoint khi keyword đã crawl trọn vẹn, nếu không
+            # lần sau sẽ bỏ sót các trang lỗi (dedup theo id tránh trùng)
+            if complete:
+                key = f"{country_code}:{keyword}"
+                # Full crawl ghi đè raw file -> checkpoint cũng bắt đầu lại
+                previous = checkpoints.get(key, {}).get('last_created', '') if incremental else ''
+                checkpoints[key] = {
+                    'last_created': max(newest, previous),
+                    'last_run': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                }
         
-        # Sleep giữa các keywords
-        time.sleep(2)
+        label = "jobs mới" if incremental else "jobs"
+        print(f"💾 {country_name}: đã ghi {sink.new_count} {label} vào {sink.writer.path.name}")
     
-    # Lưu vào file JSON
-    output_file = OUTPUT_DIR / f"{country_code}.json"
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'country_code': country_code,
-            'country_name': country_name,
-            'total_jobs': len(all_jobs),
-            'keywords': JOB_KEYWORDS,
-            'jobs': all_jobs
-        }, f, indent=2, ensure_ascii=False)
-    
-    print(f"\n💾 Đã lưu {len(all_jobs)} jobs vào: {output_file.name}")
+    save_checkpoints(checkpoints)
+
+
+def parse_args():
+    """Tham số dòng lệnh"""
+    parser = argparse.ArgumentParser(description="Thu thập jobs từ Adzuna API")
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="Chỉ lấy job mới (dừng khi gặp job đã có) và append vào raw file"
+    )
+    return parser.parse_args()
 
 
 def main():
     """Hàm main - Thu thập dữ liệu cho tất cả quốc gia"""
+    args = parse_args()
+    
     print("\n" + "="*70)
     print("🚀 BẮT ĐẦU THU THẬP DỮ LIỆU TỪ ADZUNA API")
     print("="*70)
@@ -184,17 +534,17 @@ def main():
     # Tạo thư mục output
     create_output_directory()
     
-    # Thu thập dữ liệu từng quốc gia
-    for country_code, country_name in COUNTRIES.items():
-        extract_jobs_for_country(country_code, country_name)
-        
-        # Sleep giữa các quốc gia
-        print("\n⏸️  Sleep 3 giây trước khi chuyển quốc gia...\n")
-        time.sleep(3)
+    # Thu thập dữ liệu tất cả quốc gia (song song, có rate limit)
+    mode = f"incremental (tối đa {INCREMENTAL_MAX_PAGES} trang)" if args.incremental else f"full ({MAX_PAGES} trang)"
+    print(f"⚙️  Chế độ: {mode}")
+    print(f"⚙️  Rate limit: {RATE_LIMIT} req/s (burst {RATE_BURST}), concurrency: {MAX_CONCURRENCY}\n")
+    start = time.monotonic()
+    asyncio.run(extract_all_countries(incremental=args.incremental))
     
     print("\n" + "="*70)
     print("✅ HOÀN THÀNH THU THẬP DỮ LIỆU!")
     print("="*70)
+    print(f"⏱️  Thời gian: {time.monotonic() - start:.1f} giây")
     print(f"📁 Dữ liệu được lưu tại: {OUTPUT_DIR}")
     print(f"📊 Tổng số file: {len(COUNTRIES)}")
     print("\n🎯 Bước tiếp theo: Chạy transform_jobs.py để xử lý dữ liệu")
@@ -0,0 +1,243 @@
+"""
+Near Dedup - Phát hiện job gần trùng bằng MinHash + LSH trên shingle của job_description
+Không so từng cặp: chỉ các job rơi cùng bucket LSH mới được so, thời gian ~ tuyến tính theo số jobs
+"""
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+# Shingle = SHINGLE_SIZE từ liên tiếp (description ngắn hơn -> cả description là một shingle)
+SHINGLE_SIZE = 5
+TOKEN_PATTERN = r'\w+'
+
+# Số hàm hash của chữ ký MinHash (nhiều hơn -> ước lượng Jaccard chính xác hơn, chậm hơn)
+NUM_PERM = 128
+
+# Hai job gần trùng nếu Jaccard ước lượng giữa hai tập shingle >= ngưỡng
+NEAR_DUP_THRESHOLD = 0.8
+
+# Trọng số của false negative khi chọn số band LSH: cặp ứng viên luôn được kiểm tra lại
+# bằng chữ ký, nên bỏ sót cặp trùng tốn hơn nhiều so với một lần so sánh thừa
+FALSE_NEGATIVE_WEIGHT = 0.9
+
+# Số description xử lý mỗi lượt khi tính chữ ký (giới hạn RAM cho mảng shingle)
+SIGNATURE_CHUNK = 20_000
+
+# Hằng số trộn bit (splitmix64)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_PRIME = np.uint64(0x100000001B3)
+_SEED = 1
+
+
+def _mix(values):
+    """Trộn bit uint64 (splitmix64), dùng làm họ hàm hash của MinHash"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * _MIX_1
+    values = values ^ (values >> np.uint64(27))
+    values = values * _MIX_2
+    return values ^ (values >> np.uint64(31))
+
+
+# ============================================================================
+# MINHASH
+# ============================================================================
+
+def shingle_hashes(tokens):
+    """
+    Hash uint64 của mọi shingle trong một nhóm description
+
+    Args:
+        tokens: Series, mỗi dòng một list từ (không rỗng)
+    Returns:
+        (hashes, starts): shingle của description i nằm trong
+        hashes[starts[i]:starts[i + 1]]
+    """
+    lengths = tokens.str.len().to_numpy(dtype=np.int64)
+    words = pd.util.hash_array(tokens.explode().to_numpy(dtype=object))
+    word_starts = np.concatenate(([0], np.cumsum(lengths)))
+
+    # Shingle bắt đầu tại mỗi từ còn đủ SHINGLE_SIZE - 1 từ phía sau trong cùng description;
+    # description ngắn hơn SHINGLE_SIZE chỉ có một shingle (cả description)
+    counts = np.maximum(lengths - SHINGLE_SIZE + 1, 1)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    first = np.repeat(word_starts[:-1], counts)
+    position = first + np.arange(starts[-1]) - np.repeat(starts[:-1], counts)
+    width = np.repeat(np.minimum(lengths, SHINGLE_SIZE), counts)
+
+    hashes = np.zeros(len(position), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(SHINGLE_SIZE):
+            inside = offset < width
+            hashes[inside] = hashes[inside] * _PRIME + words[position[inside] + offset]
+    return hashes, starts
+
+
+def signatures(texts, num_perm=NUM_PERM):
+    """
+    Chữ ký MinHash (uint32, len(texts) x num_perm) của từng description
+
+    Tách từ theo từng nhóm SIGNATURE_CHUNK description (không giữ list từ
+    của cả dataset trong RAM).
+
+    Returns:
+        (signatures, has_text): description rỗng không có chữ ký, signatures
+        chỉ gồm các dòng has_text = True
+    """
+    texts = texts.fillna('').astype(str)
+
+    # Hàm hash thứ i: (h ^ seed_i) * multiplier_i (multiplier lẻ), h đã được trộn một lần
+    seeds = _mix(np.arange(_SEED, _SEED + num_perm, dtype=np.uint64))
+    multipliers = _mix(seeds) | np.uint64(1)
+
+    chunks = []
+    has_text = np.zeros(len(texts), dtype=bool)
+    with np.errstate(over='ignore'):
+        for chunk in range(0, len(texts), SIGNATURE_CHUNK):
+            tokens = texts.iloc[chunk:chunk + SIGNATURE_CHUNK].str.lower().str.findall(TOKEN_PATTERN)
+            present = (tokens.str.len() > 0).to_numpy()
+            has_text[chunk:chunk + len(tokens)] = present
+            if not present.any():
+                continue
+
+            hashes, starts = shingle_hashes(tokens[present])
+            hashes = _mix(hashes)
+            result = np.empty((len(starts) - 1, num_perm), dtype=np.uint32)
+            for perm in range(num_perm):
+                # min của từng description (các đoạn liên tục, không rỗng); giữ 32 bit cao
+                permuted = (hashes ^ seeds[perm]) * multipliers[perm]
+                result[:, perm] = np.minimum.reduceat(permuted, starts[:-1]) >> np.uint64(32)
+            chunks.append(result)
+
+    signature = np.concatenate(chunks) if chunks else np.empty((0, num_perm), dtype=np.uint32)
+    return signature, has_text
+
+
+# ============================================================================
+# LSH
+# ============================================================================
+
+def optimal_bands(threshold, num_perm=NUM_PERM):
+    """
+    (bands, rows) với bands * rows <= num_perm
+
+    Hai job có Jaccard s là ứng viên với xác suất 1 - (1 - s^rows)^bands;
+    chọn cặp làm nhỏ nhất tổng (có trọng số FALSE_NEGATIVE_WEIGHT) diện
+    tích sai lệch dưới / trên ngưỡng.
+    """
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+
+    best, best_error = (num_perm, 1), None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            # false positive: s < ngưỡng nhưng thành ứng viên; false negative: s >= ngưỡng nhưng bị bỏ
+            false_positive = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+            false_negative = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+            error = (1 - FALSE_NEGATIVE_WEIGHT) * false_positive + FALSE_NEGATIVE_WEIGHT * false_negative
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+def candidate_pairs(signature, bands, rows):
+    """
+    Các cặp (i, j), i < j rơi cùng bucket ở ít nhất một band
+
+    Trong mỗi bucket chỉ ghép mọi phần tử với phần tử đầu tiên (hình sao),
+    nên số cặp tuyến tính theo kích thước bucket; gộp cụm ở bước sau.
+    """
+    pairs = []
+    if len(signature) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    for band in range(bands):
+        key = np.zeros(len(signature), dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for column in signature[:, band * rows:(band + 1) * rows].T:
+                key = key * _PRIME + column.astype(np.uint64)
+        codes = pd.factorize(key)[0]
+
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        run_start = np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1]))
+        leader = order[np.maximum.accumulate(np.where(run_start, np.arange(len(order)), 0))]
+        member = ~run_start
+        pairs.append(np.stack([leader[member], order[member]], axis=1))
+
+    pairs = np.concatenate(pairs)
+    return np.unique(np.sort(pairs, axis=1), axis=0)
+
+
+def connected_labels(num_items, pairs):
+    """Nhãn cụm của từng phần tử = chỉ số nhỏ nhất trong cụm (lan truyền nhãn + nhảy con trỏ)"""
+    labels = np.arange(num_items)
+    if len(pairs) == 0:
+        return labels
+    left, right = pairs[:, 0], pairs[:, 1]
+    while True:
+        smallest = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, smallest)
+        np.minimum.at(updated, right, smallest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def split_clusters(signature, labels, threshold):
+    """
+    Tách cụm để mọi dòng đủ giống dòng đại diện của nó
+
+    Cụm liên thông có thể là một chuỗi A~B~C trong đó C không đủ giống A: các
+    dòng dưới ngưỡng so với đại diện được gom lại (theo cụm cũ) quanh dòng nhỏ
+    nhất trong số chúng, lặp đến khi không còn dòng nào dưới ngưỡng.
+
+    Returns:
+        (labels, similarity): đại diện mới và Jaccard ước lượng với đại diện
+    """
+    labels = labels.copy()
+    similarity = (signature == signature[labels]).mean(axis=1)
+    components = labels.copy()
+
+    pending = np.flatnonzero(similarity < threshold)
+    while len(pending):
+        leaders = pd.Series(pending).groupby(components[pending]).transform('min').to_numpy()
+        labels[pending] = leaders
+        similarity[pending] = (signature[pending] == signature[leaders]).mean(axis=1)
+        pending = pending[similarity[pending] < threshold]
+    return labels, similarity
+
+
+def find_near_duplicates(texts, threshold=NEAR_DUP_THRESHOLD, num_perm=NUM_PERM):
+    """
+    Gom các description gần trùng thành cụm
+
+    Cặp ứng viên từ LSH được kiểm tra lại bằng tỷ lệ hash trùng trong chữ ký
+    (ước lượng Jaccard) trước khi gộp; cụm nối theo chuỗi được tách lại để
+    mọi dòng có Jaccard ước lượng với đại diện >= threshold.
+
+    Returns:
+        (cluster, similarity): với mỗi dòng, vị trí dòng đại diện của cụm
+        (dòng xuất hiện đầu tiên, dòng không trùng ai -> chính nó) và
+        Jaccard ước lượng với dòng đại diện
+    """
+    signature, has_text = signatures(texts, num_perm)
+    bands, rows = optimal_bands(threshold, num_perm)
+
+    pairs = candidate_pairs(signature, bands, rows)
+    if len(pairs):
+        similar = (signature[pairs[:, 0]] == signature[pairs[:, 1]]).mean(axis=1) >= threshold
+        pairs = pairs[similar]
+    labels, similarity = split_clusters(signature, connected_labels(len(signature), pairs), threshold)
+
+    # Đổi từ chỉ số trong các dòng có text về vị trí trong toàn bộ texts
+    positions = np.flatnonzero(has_text)
+    cluster = np.arange(len(texts))
+    cluster[positions] = positions[labels]
+    result_similarity = np.ones(len(texts))
+    result_similarity[positions] = similarity
+    return cluster, result_similarity
@@ -0,0 +1,220 @@
+"""
+Raw Store - Lưu raw jobs dạng NDJSON (mỗi dòng một job)
+Append-only, có thể nén gzip/zstd; extract ghi từng trang, transform đọc dạng stream
+"""
+
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # zstd là tùy chọn: chỉ cần khi RAW_COMPRESSION=zstd
+    zstandard = None
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+# Kiểu nén khi tạo shard mới: none | gzip | zstd
+RAW_COMPRESSION = os.getenv('RAW_COMPRESSION', 'none')
+
+# Đuôi file theo kiểu nén
+RAW_SUFFIXES = {
+    'none': '.ndjson',
+    'gzip': '.ndjson.gz',
+    'zstd': '.ndjson.zst'
+}
+
+# Định dạng cũ: một JSON document {"country_code", "jobs": [...]} mỗi quốc gia
+LEGACY_SUFFIX = '.json'
+
+# Số job mỗi chunk khi đọc stream
+DEFAULT_CHUNK_SIZE = 5000
+
+
+# ============================================================================
+# HÀM TIỆN ÍCH
+# ============================================================================
+
+def _compression_of(path):
+    """Suy ra kiểu nén từ đuôi file"""
+    name = Path(path).name
+    for compression, suffix in RAW_SUFFIXES.items():
+        if compression != 'none' and name.endswith(suffix):
+            return compression
+    return 'none'
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("Cần cài 'zstandard' để đọc/ghi raw file .zst (pip install zstandard)")
+
+
+def shard_stem(path):
+    """Tên shard (country code) từ đường dẫn: raw_jobs/de.ndjson.gz -> 'de'"""
+    return Path(path).name.split('.')[0]
+
+
+def shard_path(directory, country_code, compression=None):
+    """Đường dẫn shard NDJSON của một quốc gia"""
+    compression = compression or RAW_COMPRESSION
+    if compression not in RAW_SUFFIXES:
+        raise ValueError(f"RAW_COMPRESSION không hợp lệ: {compression} (none | gzip | zstd)")
+    return Path(directory) / f"{country_code}{RAW_SUFFIXES[compression]}"
+
+
+def find_shard(directory, country_code):
+    """Shard NDJSON đã có của một quốc gia (bất kể kiểu nén), hoặc None"""
+    for suffix in RAW_SUFFIXES.values():
+        path = Path(directory) / f"{country_code}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def remove_other_shards(directory, country_code, keep):
+    """Xóa các shard khác của cùng quốc gia (kiểu nén khác, file .json cũ)"""
+    keep = Path(keep)
+    candidates = [Path(directory) / f"{country_code}{LEGACY_SUFFIX}"]
+    candidates += [Path(directory) / f"{country_code}{suffix}" for suffix in RAW_SUFFIXES.values()]
+    for path in candidates:
+        if path != keep and path.exists():
+            path.unlink()
+
+
+def find_raw_files(directory):
+    """
+    Liệt kê các raw shard, mỗi quốc gia một file (sort theo tên)
+    Nếu một quốc gia có cả NDJSON lẫn file .json cũ thì ưu tiên NDJSON
+    """
+    directory = Path(directory)
+    shards = {}
+
+    for path in sorted(directory.glob(f'*{LEGACY_SUFFIX}')):
+        shards[shard_stem(path)] = path
+
+    for suffix in RAW_SUFFIXES.values():
+        for path in sorted(directory.glob(f'*{suffix}')):
+            shards[shard_stem(path)] = path
+
+    return [shards[stem] for stem in sorted(shards)]
+
+
+# ============================================================================
+# GHI
+# ============================================================================
+
+class RawJobWriter:
+    """
+    Writer NDJSON cho một shard
+
+    - append=True: ghi nối vào cuối file (gzip/zstd tạo thêm member/frame mới,
+      reader vẫn đọc liền mạch)
+    - append=False: ghi ra file tạm, commit() mới rename đè file cũ
+    """
+
+    def __init__(self, path, append=False):
+        self.path = Path(path)
+        self.append = append
+        self.target = self.path if append else self.path.with_name(self.path.name + '.tmp')
+        self.count = 0
+
+        compression = _compression_of(self.path)
+        self._raw = open(self.target, 'ab' if append else 'wb')
+
+        if compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb')
+        elif compression == 'zstd':
+            _require_zstandard()
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def write(self, jobs):
+        """Ghi một batch job (ví dụ một trang kết quả API)"""
+        if not jobs:
+            return
+        lines = ''.join(json.dumps(job, ensure_ascii=False) + '\n' for job in jobs)
+        self._stream.write(lines.encode('utf-8'))
+        self._stream.flush()
+        self.count += len(jobs)
+
+    def close(self):
+        """Đóng file (không rename)"""
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+    def commit(self):
+        """Đóng file và (nếu không phải append) thay thế shard cũ"""
+        self.close()
+        if not self.append:
+            self.target.replace(self.path)
+
+    def abort(self):
+        """Đóng và bỏ file tạm (chỉ với append=False)"""
+        self.close()
+        if not self.append and self.target.exists():
+            self.target.unlink()
+
+
+# ============================================================================
+# ĐỌC
+# ============================================================================
+
+def _open_text(path):
+    """Mở shard NDJSON ở chế độ text, tự giải nén theo đuôi file"""
+    compression = _compression_of(path)
+
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        _require_zstandard()
+        raw = open(path, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_raw_jobs(path):
+    """
+    Generator: đọc từng job của một shard
+
+    Job được gắn `_country_code` (nếu chưa có) theo tên file. Hỗ trợ cả
+    file .json định dạng cũ (phải load cả document vào RAM).
+    """
+    path = Path(path)
+
+    if path.suffix == LEGACY_SUFFIX:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        country_code = data.get('country_code', shard_stem(path))
+        for job in data.get('jobs', []):
+            job.setdefault('_country_code', country_code)
+            yield job
+        return
+
+    country_code = shard_stem(path)
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            job = json.loads(line)
+            job.setdefault('_country_code', country_code)
+            yield job
+
+
+def iter_job_chunks(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Generator: gom job từ nhiều shard thành các chunk tối đa chunk_size"""
+    chunk = []
+    for path in paths:
+        for job in iter_raw_jobs(path):
+            chunk.append(job)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
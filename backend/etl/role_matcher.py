@@ -0,0 +1,156 @@
+"""
+Role Matcher - Chuẩn hóa job title thành role (nghề) + seniority (cấp bậc)
+Đọc bảng alias + luật từ role_taxonomy.json; mỗi title khác nhau chỉ được xử lý một lần
+"""
+
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+ROLE_TAXONOMY_FILE = Path(__file__).parent / 'role_taxonomy.json'
+
+# Token giống skill_matcher: '-', '/', '.' tách token nên "Front-End", "UX/UI" khớp alias nhiều từ
+TOKEN_PATTERN = r'\w+[+#]*'
+
+# Phần trong ngoặc ("(Remote)", "(Contract - 6 months)") không thuộc về nghề
+PARENTHESES_PATTERN = r'\([^)]*\)|\[[^\]]*\]'
+
+
+# ============================================================================
+# MATCHER
+# ============================================================================
+
+class AliasTable:
+    """Bảng alias (nhiều từ) -> id, tra bằng n-gram của một list token"""
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: List (id, alias) theo thứ tự ưu tiên
+        """
+        # phrases[n] = {tuple n token: id} (alias lặp lại giữ id đầu tiên)
+        self.phrases = {}
+        for entry_id, alias in entries:
+            tokens = tuple(re.findall(TOKEN_PATTERN, alias.lower()))
+            if tokens:
+                self.phrases.setdefault(len(tokens), {}).setdefault(tokens, entry_id)
+
+    def find(self, tokens):
+        """List (start, n, id) của mọi alias xuất hiện trong tokens"""
+        found = []
+        for n, table in self.phrases.items():
+            for start in range(len(tokens) - n + 1):
+                entry_id = table.get(tuple(tokens[start:start + n]))
+                if entry_id is not None:
+                    found.append((start, n, entry_id))
+        return found
+
+
+class RoleMatcher:
+    """
+    Chuẩn hóa job title theo bảng từ điển + luật
+
+    - role: alias dài nhất khớp trong title ("Senior Machine Learning
+      Engineer" -> Machine Learning Engineer, không phải Software Engineer);
+      không khớp alias nào -> title bỏ cấp bậc, bậc số, từ nhiễu và phần
+      trong ngoặc ("Senior Data Wrangler (Remote)" -> "Data Wrangler")
+    - seniority: cấp cao nhất trong các alias cấp bậc của title; không có thì
+      theo bậc số La Mã (II, III...); không có gì -> default_seniority
+
+    Kết quả của từng title được cache trong matcher nên các shard/lần gọi
+    sau chỉ tra dict.
+    """
+
+    def __init__(self, taxonomy):
+        """
+        Args:
+            taxonomy: Nội dung role_taxonomy.json
+        """
+        self.roles = [role['name'] for role in taxonomy['roles']]
+        self.levels = [level['name'] for level in taxonomy['seniority']]
+        self.default_role = taxonomy.get('default_role', 'Other')
+        self.default_seniority = taxonomy.get('default_seniority', 'Unspecified')
+
+        self.role_aliases = AliasTable(
+            (role_id, alias)
+            for role_id, role in enumerate(taxonomy['roles'])
+            for alias in role.get('aliases', [])
+        )
+        self.level_aliases = AliasTable(
+            (level_id, alias)
+            for level_id, level in enumerate(taxonomy['seniority'])
+            for alias in level.get('aliases', [])
+        )
+        # Bậc số đứng riêng ("Engineer II") -> id cấp bậc
+        self.grades = {
+            grade.lower(): self.levels.index(level)
+            for grade, level in taxonomy.get('grades', {}).items()
+        }
+        self.noise = AliasTable((0, alias) for alias in taxonomy.get('noise', []))
+
+        self._cache = {}
+
+    @classmethod
+    def from_file(cls, path=ROLE_TAXONOMY_FILE):
+        """Tạo matcher từ file taxonomy JSON"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def match_title(self, title):
+        """Một job title -> (role, seniority), có cache theo title"""
+        result = self._cache.get(title)
+        if result is None:
+            result = self._cache[title] = self._match(title)
+        return result
+
+    def _match(self, title):
+        words = re.findall(TOKEN_PATTERN, re.sub(PARENTHESES_PATTERN, ' ', title))
+        tokens = [word.lower() for word in words]
+        # Cấp bậc có thể nằm trong ngoặc ("Data Analyst (Senior)")
+        all_tokens = re.findall(TOKEN_PATTERN, title.lower())
+
+        levels = self.level_aliases.find(all_tokens)
+        if levels:
+            seniority = self.levels[max(level_id for _, _, level_id in levels)]
+        else:
+            grades = [self.grades[token] for token in tokens if token in self.grades]
+            seniority = self.levels[max(grades)] if grades else self.default_seniority
+
+        roles = self.role_aliases.find(tokens)
+        if roles:
+            # Alias dài nhất thắng, bằng nhau thì role đứng trước trong taxonomy
+            _, _, role_id = max(roles, key=lambda found: (found[1], -found[2]))
+            return self.roles[role_id], seniority
+
+        # Không có trong từ điển: bỏ các từ cấp bậc / bậc số / nhiễu, giữ phần còn lại
+        covered = np.zeros(len(tokens), dtype=bool)
+        for start, n, _ in self.level_aliases.find(tokens) + self.noise.find(tokens):
+            covered[start:start + n] = True
+        kept = [
+            word.capitalize() if word.islower() else word
+            for word, token, skip in zip(words, tokens, covered)
+            if not skip and token not in self.grades
+        ]
+        return (' '.join(kept) or self.default_role), seniority
+
+    def normalize(self, titles):
+        """
+        Chuẩn hóa cả cột job title
+
+        Args:
+            titles: Series job title
+
+        Returns:
+            (roles, seniority): hai mảng object cùng độ dài với titles
+        """
+        codes, uniques = pd.factorize(titles.fillna('').astype(str))
+        matched = [self.match_title(title) for title in uniques]
+        roles = np.array([role for role, _ in matched] or [self.default_role], dtype=object)
+        levels = np.array([level for _, level in matched] or [self.default_seniority], dtype=object)
+        return roles[codes], levels[codes]
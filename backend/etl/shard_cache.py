@@ -0,0 +1,150 @@
+"""
+Shard Cache - Cache kết quả transform của từng raw shard
+Manifest lưu content hash mỗi shard; transform chỉ chạy lại shard đã thay đổi
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+# Kích thước block khi đọc file để tính hash
+HASH_BLOCK_SIZE = 1 << 20
+
+MANIFEST_NAME = 'manifest.json'
+CACHE_SUFFIX = '.pkl'
+
+
+# ============================================================================
+# HÀM TIỆN ÍCH
+# ============================================================================
+
+def file_digest(path):
+    """SHA-256 nội dung file (đọc từng block, không load cả file vào RAM)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat_key(path):
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class ShardCache:
+    """
+    Cache DataFrame đã transform (chưa dedup) cho từng raw shard
+
+    Manifest: {"config": ..., "output": ..., "shards": {tên file: {"hash", "stat", "rows"}}}
+    - Shard được coi là không đổi nếu size + mtime giống lần trước (không cần
+      đọc file); nếu khác thì so content hash (file chỉ bị touch vẫn dùng cache)
+    - `config` đổi (taxonomy, mapping region, phiên bản transform) -> bỏ toàn bộ cache
+    """
+
+    def __init__(self, directory, config):
+        self.directory = Path(directory)
+        self.manifest_file = self.directory / MANIFEST_NAME
+        self.config = config
+
+        manifest = {}
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+        if manifest.get('config') != config:
+            manifest = {}
+
+        self.shards = manifest.get('shards', {})
+        self.output = manifest.get('output')
+        self._digests = {}
+
+    def _cache_file(self, raw_file):
+        return self.directory / (Path(raw_file).name + CACHE_SUFFIX)
+
+    def digest(self, raw_file):
+        """
+        Content hash của shard (dùng lại hash cũ nếu size + mtime không đổi)
+
+        Shard chỉ bị touch (stat khác, hash như cũ) -> ghi stat mới vào entry
+        để lần chạy sau không phải hash lại (có hiệu lực sau save()).
+        """
+        raw_file = Path(raw_file)
+        if raw_file.name not in self._digests:
+            entry = self.shards.get(raw_file.name)
+            stat = _stat_key(raw_file)
+            if entry and entry['stat'] == stat:
+                self._digests[raw_file.name] = entry['hash']
+            else:
+                digest = self._digests[raw_file.name] = file_digest(raw_file)
+                if entry and entry['hash'] == digest:
+                    entry['stat'] = stat
+        return self._digests[raw_file.name]
+
+    def is_fresh(self, raw_file):
+        """True nếu đã có kết quả cache khớp với nội dung shard hiện tại"""
+        entry = self.shards.get(Path(raw_file).name)
+        return (
+            entry is not None
+            and entry['hash'] == self.digest(raw_file)
+            and self._cache_file(raw_file).exists()
+        )
+
+    def load(self, raw_file):
+        """DataFrame đã cache của shard"""
+        return pd.read_pickle(self._cache_file(raw_file))
+
+    def store(self, raw_file, df):
+        """Lưu kết quả transform của shard (file tạm + rename)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        cache_file = self._cache_file(raw_file)
+        tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+        df.to_pickle(tmp_file)
+        tmp_file.replace(cache_file)
+
+        self.shards[Path(raw_file).name] = {
+            'hash': self.digest(raw_file),
+            'stat': _stat_key(raw_file),
+            'rows': len(df)
+        }
+
+    def prune(self, raw_files):
+        """Bỏ cache của các shard không còn trong danh sách raw_files"""
+        names = {Path(raw_file).name for raw_file in raw_files}
+        for name in list(self.shards):
+            if name not in names:
+                del self.shards[name]
+        if self.directory.exists():
+            for cache_file in self.directory.glob(f'*{CACHE_SUFFIX}'):
+                if cache_file.name[:-len(CACHE_SUFFIX)] not in names:
+                    cache_file.unlink()
+
+    def signature(self, raw_files):
+        """Khóa của toàn bộ input (tập shard + hash) -> biết output đã cập nhật chưa"""
+        digest = hashlib.sha256(self.config.encode('utf-8'))
+        for raw_file in raw_files:
+            digest.update(f"{Path(raw_file).name}:{self.digest(raw_file)}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def save(self, output=None):
+        """Ghi manifest (file tạm + rename); output = signature của lần xuất output gần nhất"""
+        if output is not None:
+            self.output = output
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'config': self.config,
+                'output': self.output,
+                'shards': self.shards
+            }, f, indent=2, ensure_ascii=False)
+        tmp_file.replace(self.manifest_file)
@@ -0,0 +1,133 @@
+"""
+Skill Matcher - Nhận diện kỹ năng trong job description bằng một lần quét
+Đọc danh mục kỹ năng + synonyms từ skills_taxonomy.json, lưu kết quả dạng bit-packed
+"""
+
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+TAXONOMY_FILE = Path(__file__).parent / 'skills_taxonomy.json'
+
+# Token = chữ/số, giữ hậu tố '+'/'#' (c++, c#). Dấu '-', '/', '.' tách token
+# nên alias nhiều từ ("amazon web services", "ci/cd", "node.js") so khớp theo n-gram
+TOKEN_PATTERN = r'\w+[+#]*'
+
+# Ký tự nối tên skill trong cột text (CSV/Excel)
+SKILL_SEPARATOR = '|'
+
+
+# ============================================================================
+# MATCHER
+# ============================================================================
+
+class SkillMatcher:
+    """
+    Matcher đa mẫu theo từ (kiểu Aho-Corasick trên token)
+
+    Mỗi description được tách token đúng một lần; mọi alias (kể cả alias
+    nhiều từ) được tra bằng phép giao tập n-gram của description với bảng
+    alias -> skill id. Chi phí gần như không đổi khi thêm skill, thay vì
+    mỗi skill một lượt regex trên toàn bộ text.
+    """
+
+    def __init__(self, skills):
+        """
+        Args:
+            skills: List dict {"name", "group", "aliases"} theo thứ tự taxonomy
+                    (chỉ aliases được so khớp; name là tên hiển thị)
+        """
+        self.names = [skill['name'] for skill in skills]
+        self.groups = [skill.get('group', '') for skill in skills]
+
+        # phrases[n] = {tuple n token: [skill ids]} (n >= 2)
+        self.phrases = {}
+        for skill_id, skill in enumerate(skills):
+            for alias in skill.get('aliases', []):
+                tokens = tuple(re.findall(TOKEN_PATTERN, alias.lower()))
+                if not tokens:
+                    continue
+                ids = self.phrases.setdefault(len(tokens), {}).setdefault(tokens, [])
+                if skill_id not in ids:
+                    ids.append(skill_id)
+
+        # Alias 1 từ tra trực tiếp theo chuỗi; alias nhiều từ chỉ dựng n-gram
+        # khi description có chứa từ đầu tiên của ít nhất một alias dài n
+        self.words = {tokens[0]: ids for tokens, ids in self.phrases.pop(1, {}).items()}
+        self.first_words = {
+            n: {tokens[0] for tokens in table}
+            for n, table in self.phrases.items()
+        }
+        self.num_bytes = (len(self.names) + 7) // 8
+
+    @classmethod
+    def from_file(cls, path=TAXONOMY_FILE):
+        """Tạo matcher từ file taxonomy JSON"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['skills'])
+
+    def __len__(self):
+        return len(self.names)
+
+    def match_tokens(self, tokens):
+        """Skill ids (tăng dần) xuất hiện trong một list token"""
+        found = set()
+        unique = set(tokens)
+        for word in unique & self.words.keys():
+            found.update(self.words[word])
+        for n, table in self.phrases.items():
+            if unique.isdisjoint(self.first_words[n]):
+                continue
+            grams = set(zip(*(tokens[k:] for k in range(n))))
+            for gram in grams & table.keys():
+                found.update(table[gram])
+        return sorted(found)
+
+    def match(self, texts):
+        """
+        Nhận diện skill cho cả cột description
+
+        Args:
+            texts: Series text đã clean
+
+        Returns:
+            np.ndarray uint8 shape (len(texts), num_bytes): ma trận bit-packed,
+            bit j của dòng i = 1 nếu job i yêu cầu skill j
+        """
+        tokens = texts.fillna('').astype(str).str.lower().str.findall(TOKEN_PATTERN)
+        return self.pack(tokens.map(self.match_tokens))
+
+    def pack(self, skill_ids):
+        """List (mỗi dòng một list skill id) -> ma trận bit-packed"""
+        dense = np.zeros((len(skill_ids), self.num_bytes * 8), dtype=bool)
+        rows = np.repeat(np.arange(len(skill_ids)), [len(ids) for ids in skill_ids])
+        cols = np.fromiter((i for ids in skill_ids for i in ids), dtype=np.int64, count=len(rows))
+        dense[rows, cols] = True
+        return np.packbits(dense, axis=1)
+
+    def counts(self, packed):
+        """Số job có từng skill (theo thứ tự self.names)"""
+        bits = np.unpackbits(packed, axis=1, count=len(self.names))
+        return bits.sum(axis=0, dtype=np.int64)
+
+    def labels(self, packed):
+        """Ma trận bit-packed -> Series text 'Python|SQL' (dạng thưa cho CSV/Excel)"""
+        bits = np.unpackbits(packed, axis=1, count=len(self.names)).astype(bool)
+        names = np.array(self.names, dtype=object)
+        return pd.Series([SKILL_SEPARATOR.join(names[row]) for row in bits], dtype=object)
+
+    def from_labels(self, labels):
+        """Series text 'Python|SQL' -> ma trận bit-packed (ngược với labels())"""
+        index = {name: skill_id for skill_id, name in enumerate(self.names)}
+        skill_ids = [
+            sorted(index[name] for name in str(value).split(SKILL_SEPARATOR) if name in index)
+            if isinstance(value, str) and value else []
+            for value in labels
+        ]
+        return self.pack(skill_ids)
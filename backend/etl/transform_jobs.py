@@ -1,13 +1,31 @@
 """
 ETL Script - Transform & Clean Jobs Data
-Xử lý dữ liệu từ raw JSON thành dataset sạch để phân tích
+Xử lý dữ liệu từ raw NDJSON thành dataset sạch để phân tích
 """
 
-import json
+import argparse
+import os
+import time
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+import json
 import re
-from datetime import datetime
+from datetime import datetime, timezone
+
+from raw_store import DEFAULT_CHUNK_SIZE, find_raw_files, iter_job_chunks
+from shard_cache import ShardCache, file_digest
+from near_dedup import NEAR_DUP_THRESHOLD, find_near_duplicates
+from role_matcher import ROLE_TAXONOMY_FILE, RoleMatcher
+from skill_matcher import TAXONOMY_FILE, SkillMatcher
+from trend_store import TRENDS_DIR, write_snapshot
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow là tùy chọn: thiếu thì chỉ xuất CSV/Excel
+    pa = None
 
 # ============================================================================
 # CẤU HÌNH
@@ -15,6 +33,12 @@ from datetime import datetime
 RAW_DATA_DIR = Path(__file__).parent.parent / 'data' / 'raw_jobs'
 OUTPUT_DIR = Path(__file__).parent.parent / 'data'
 
+# Cache kết quả transform từng shard (--incremental)
+CACHE_DIR = OUTPUT_DIR / 'transform_cache'
+
+# Tăng khi đổi logic extract/clean/skills để cache cũ tự bị bỏ
+TRANSFORM_VERSION = 5
+
 # Mapping quốc gia -> khu vực
 COUNTRY_TO_REGION = {
     'sg': 'Southeast Asia',
@@ -27,79 +51,128 @@ COUNTRY_TO_REGION = {
     'nz': 'Oceania'
 }
 
-# Danh sách kỹ năng cần phân tích
-SKILLS_TO_TRACK = ['Python', 'SQL', 'AWS', 'Excel', 'English']
+# Danh mục kỹ năng cần phân tích (tên chuẩn + synonyms), sửa file JSON để thêm skill
+SKILLS_TAXONOMY_FILE = TAXONOMY_FILE
+
+# Bảng tỷ giá: đồng tiền của từng quốc gia + tỷ giá quy đổi về USD
+CURRENCY_RATES_FILE = Path(__file__).parent / 'currency_rates.json'
+
+# Lương đã quy đổi (cùng đơn vị USD/năm, so sánh được giữa các quốc gia)
+SALARY_USD_COLUMNS = {'salary_min': 'salary_min_usd', 'salary_max': 'salary_max_usd'}
+
+# Số skill in ra log sau khi phân tích
+TOP_SKILLS_TO_PRINT = 15
+
+# Regex dùng chung cho bước clean text (cú pháp chạy được cả trên re và RE2)
+HTML_TAG_PATTERN = r'<[^>]+>'
+
+# Mọi ký tự khoảng trắng Unicode trừ dấu cách (giống str.split())
+_OTHER_WHITESPACE = ''.join(chr(c) for c in range(0x3001) if chr(c).isspace() and chr(c) != ' ')
+
+# Chỉ khớp chỗ cần thay: chuỗi >= 2 khoảng trắng hoặc 1 khoảng trắng khác ' '
+# (khớp r'\s+' sẽ thay cả từng dấu cách đơn -> chậm hơn nhiều)
+WHITESPACE_PATTERN = f'[ {_OTHER_WHITESPACE}]{{2,}}|[{_OTHER_WHITESPACE}]'
+
+# Hai job trùng nhau nếu cùng job_title + company
+DEDUP_COLUMNS = ['job_title', 'company']
+
+# Báo cáo các cụm job gần trùng đã gộp (xem drop_near_duplicates)
+NEAR_DUP_REPORT_FILE = OUTPUT_DIR / 'near_duplicates.csv'
+
+# Số cụm lớn nhất in ra log
+TOP_CLUSTERS_TO_PRINT = 5
+
+# Cột id ổn định của job (API dùng cho /api/jobs/{job_id})
+ID_COLUMN = 'job_id'
+
+# Các cột lưu dạng dictionary (categorical) trong file Arrow
+CATEGORICAL_COLUMNS = [
+    'country', 'region', 'category', 'role', 'seniority', 'salary_currency', 'salary_period', 'source'
+]
 
 
 # ============================================================================
 # HÀM XỬ LÝ DỮ LIỆU
 # ============================================================================
 
-def load_raw_json_files():
-    """Đọc tất cả file JSON từ thư mục raw_jobs"""
-    print("\n📂 Đang đọc raw JSON files...")
+def list_raw_files():
+    """Liệt kê các raw shard (NDJSON, có thể nén; hoặc file .json cũ)"""
+    raw_files = find_raw_files(RAW_DATA_DIR)
     
-    all_jobs = []
-    json_files = list(RAW_DATA_DIR.glob('*.json'))
-    
-    if not json_files:
-        print(f"❌ Không tìm thấy file JSON nào trong {RAW_DATA_DIR}")
+    if not raw_files:
+        print(f"❌ Không tìm thấy raw file nào trong {RAW_DATA_DIR}")
         print("⚠️  Vui lòng chạy extract_jobs.py trước!")
-        return []
-    
-    for json_file in json_files:
-        print(f"   📄 Đọc: {json_file.name}")
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            jobs = data.get('jobs', [])
-            country_code = data.get('country_code', '')
-            
-            # Thêm country_code vào mỗi job
-            for job in jobs:
-                job['_country_code'] = country_code
-            
-            all_jobs.extend(jobs)
     
-    print(f"✅ Đã load {len(all_jobs)} jobs từ {len(json_files)} files\n")
-    return all_jobs
+    return raw_files
 
 
-def extract_fields(job):
+def build_dataframe(raw_files, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Đọc raw jobs dạng stream và dựng DataFrame theo từng chunk
+    
+    Chỉ một chunk raw dict (tối đa chunk_size jobs) nằm trong RAM tại một
+    thời điểm; mỗi chunk được rút gọn thành DataFrame các trường cần thiết.
     """
-    Trích xuất các trường cần thiết từ raw job data
+    print("\n📂 Đang đọc raw jobs (streaming)...")
+    for raw_file in raw_files:
+        print(f"   📄 {raw_file.name}")
+    
+    frames = [extract_fields(chunk) for chunk in iter_job_chunks(raw_files, chunk_size)]
+    
+    if not frames:
+        return pd.DataFrame()
+    
+    df = pd.concat(frames, ignore_index=True)
+    print(f"✅ Đã load {len(df)} jobs từ {len(raw_files)} files\n")
+    return df
+
+
+def _column(raw, name, default):
+    """Lấy cột `name` của batch (cột hằng `default` nếu không job nào có key này)"""
+    if name in raw.columns:
+        return raw[name]
+    return pd.Series(default, index=raw.index, dtype=object)
+
+
+def _display_name(raw, field, default):
+    """
+    Lấy `field['display_name']` cho cả cột (vectorized qua Series.str.get);
+    nếu API trả `field` dạng chuỗi (không phải dict) thì dùng chính chuỗi đó
+    """
+    values = _column(raw, field, None)
+    names = values.str.get('display_name') if values.notna().any() else values
+    names = names.where(values.map(type) != str, values)
+    return names.fillna(default)
+
+
+def extract_fields(jobs):
+    """
+    Trích xuất các trường cần thiết từ một batch raw jobs (vectorized)
     
     Args:
-        job: Dict chứa thông tin job từ API
+        jobs: List dict job từ API (một chunk)
         
     Returns:
-        Dict với các trường đã chuẩn hóa
-    """
-    # Trích xuất salary info
-    salary_min = job.get('salary_min')
-    salary_max = job.get('salary_max')
-    
-    # Location
-    location = job.get('location', {})
-    city = location.get('display_name', '') if isinstance(location, dict) else str(location)
-    
-    # Company
-    company = job.get('company', {})
-    company_name = company.get('display_name', 'Unknown') if isinstance(company, dict) else str(company)
-    
-    return {
-        'job_title': job.get('title', ''),
-        'company': company_name,
-        'country': job.get('_country_code', '').upper(),
-        'city': city,
-        'salary_min': salary_min,
-        'salary_max': salary_max,
-        'salary_currency': 'USD',  # Adzuna trả về USD mặc định
+        DataFrame với các trường đã chuẩn hóa
+    """
+    raw = pd.DataFrame.from_records(jobs)
+    country = _column(raw, '_country_code', '').fillna('')
+    
+    return pd.DataFrame({
+        'job_title': _column(raw, 'title', '').fillna(''),
+        'company': _display_name(raw, 'company', 'Unknown'),
+        'country': country.str.upper(),
+        'city': _display_name(raw, 'location', ''),
+        'salary_min': pd.to_numeric(_column(raw, 'salary_min', None), errors='coerce'),
+        'salary_max': pd.to_numeric(_column(raw, 'salary_max', None), errors='coerce'),
+        # Adzuna trả lương năm theo đồng tiền của quốc gia được tìm kiếm
+        'salary_currency': country.str.lower().map(load_currency_rates()['countries']),
         'salary_period': 'year',
-        'job_description': job.get('description', ''),
-        'date_posted': job.get('created', ''),
-        'category': job.get('_category', 'Unknown'),
+        'job_description': _column(raw, 'description', '').fillna(''),
+        'date_posted': pd.to_datetime(_column(raw, 'created', None), utc=True, errors='coerce'),
+        'category': _column(raw, '_category', 'Unknown').fillna('Unknown'),
         'source': 'Adzuna'
-    }
+    })
 
 
 def clean_data(df):
@@ -117,71 +190,327 @@ def clean_data(df):
     initial_count = len(df)
     
     # 1. Xóa duplicates (dựa trên job_title + company)
-    df = df.drop_duplicates(subset=['job_title', 'company'], keep='first')
+    df = df.drop_duplicates(subset=DEDUP_COLUMNS, keep='first', ignore_index=True)
     print(f"   ✅ Xóa {initial_count - len(df)} jobs trùng lặp")
     
+    # 2 -> 4. Region, missing values, HTML, salary
+    print(f"   ⏳ Đang xóa HTML tags từ {len(df)} descriptions...")
+    df = clean_fields(df)
+    print(f"   ✅ Đã gán region cho tất cả jobs")
+    print(f"   ✅ Đã clean descriptions")
+    print(f"   ✅ Đã xử lý missing values\n")
+    
+    return df
+
+
+def clean_fields(df):
+    """
+    Các bước clean chỉ phụ thuộc từng dòng (không cần nhìn toàn bộ dataset)
+    nên chạy được riêng trên từng shard trước khi merge
+    
+    Args:
+        df: DataFrame từ extract_fields
+        
+    Returns:
+        DataFrame có thêm job_id, region, has_salary, lương USD, role, seniority; description đã clean
+    """
+    # df có thể là kết quả dedup / lọc của frame khác -> copy một lần rồi gán cột trên bản riêng
+    df = df.copy()
+    
     # 2. Gán region dựa trên country
     df['region'] = df['country'].str.lower().map(COUNTRY_TO_REGION)
     df['region'] = df['region'].fillna('Other')
-    print(f"   ✅ Đã gán region cho tất cả jobs")
     
     # 3. Xử lý missing values
     df['city'] = df['city'].fillna('Unknown')
     df['company'] = df['company'].fillna('Unknown Company')
     df['job_description'] = df['job_description'].fillna('')
     
-    # Clean HTML tags từ description (có thể mất vài giây...)
-    print(f"   ⏳ Đang xóa HTML tags từ {len(df)} descriptions...")
-    df['job_description'] = df['job_description'].apply(clean_html)
-    print(f"   ✅ Đã clean descriptions")
+    # Clean HTML tags từ description (vectorized trên cả cột)
+    df['job_description'] = clean_html(df['job_description'])
     
     # 4. Chuẩn hóa salary
     # Nếu có salary_min hoặc salary_max, đánh dấu has_salary = True
     df['has_salary'] = (df['salary_min'].notna()) | (df['salary_max'].notna())
     
-    print(f"   ✅ Đã xử lý missing values\n")
+    # Quy đổi về USD theo bảng tỷ giá (đồng tiền không có trong bảng -> NaN)
+    rate = df['salary_currency'].map(load_currency_rates()['rates']).astype('float64')
+    for column, usd_column in SALARY_USD_COLUMNS.items():
+        df[usd_column] = df[column] * rate
+    
+    # Nghề + cấp bậc chuẩn hóa từ job title (dimension của index, facets, salary cube)
+    roles, seniority = load_role_matcher().normalize(df['job_title'])
+    df = df.assign(role=roles, seniority=seniority)
+    
+    # 5. Id ổn định cho từng job
+    df.insert(0, ID_COLUMN, job_ids(df))
     
     return df
 
 
-def clean_html(text):
-    """Xóa HTML tags khỏi text (optimized)"""
-    if not isinstance(text, str):
-        return ''
-    # Remove HTML tags
-    clean_text = re.sub(r'<[^>]+>', '', text)
-    # Remove extra whitespace
-    clean_text = ' '.join(clean_text.split())
-    return clean_text
+@lru_cache(maxsize=None)
+def load_currency_rates():
+    """Bảng tỷ giá từ CURRENCY_RATES_FILE (đọc một lần mỗi process)"""
+    with open(CURRENCY_RATES_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_role_matcher():
+    """RoleMatcher từ ROLE_TAXONOMY_FILE (một instance mỗi process -> cache title dùng chung giữa các shard)"""
+    return RoleMatcher.from_file(ROLE_TAXONOMY_FILE)
+
+
+def job_ids(df):
+    """
+    Id ổn định của job: hash 64-bit (hex) của job_title + company
+    
+    Đây chính là khóa dedup nên id không trùng sau khi dedup, và giữ nguyên
+    giữa các lần chạy ETL chừng nào tin tuyển dụng còn tồn tại (khác số
+    thứ tự dòng, vốn đổi mỗi lần dữ liệu thay đổi).
+    """
+    hashes = pd.util.hash_pandas_object(df[DEDUP_COLUMNS], index=False)
+    return hashes.map('{:016x}'.format).to_numpy(dtype=object)
+
+
+def clean_html(texts):
+    """
+    Xóa HTML tags và gộp khoảng trắng thừa cho cả cột (vectorized)
+    
+    Nếu có pyarrow, cột được chuyển sang string[pyarrow] để regex chạy bằng
+    engine RE2 của Arrow trên toàn bộ buffer (nhanh hơn re của Python).
+    Kết quả giống hệt ' '.join(re.sub(tag, '', text).split()).
+    
+    Args:
+        texts: Series chứa text (giá trị không phải string -> '')
+    """
+    texts = texts.where(texts.map(type) == str, '')
+    if pa is not None:
+        texts = texts.astype('string[pyarrow]')
+    
+    cleaned = (
+        texts.str.replace(HTML_TAG_PATTERN, '', regex=True)
+        .str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+        .str.strip()
+    )
+    return cleaned.astype(object)
+
+
+@lru_cache(maxsize=None)
+def load_skill_matcher():
+    """SkillMatcher từ SKILLS_TAXONOMY_FILE (đọc một lần mỗi process)"""
+    return SkillMatcher.from_file(SKILLS_TAXONOMY_FILE)
 
 
-def analyze_skills(df):
+def detect_skills(df, matcher):
+    """
+    Thêm cột `skills` (tên skill nối bằng '|', ví dụ 'Python|SQL')
+    
+    Trả về DataFrame mới (df.assign) thay vì gán vào df của caller: df có thể
+    là kết quả lọc / dedup của frame khác (SettingWithCopyWarning).
+    
+    Returns:
+        (DataFrame có cột skills, ma trận skill bit-packed - xem SkillMatcher.match)
+    """
+    packed = matcher.match(df['job_description'])
+    return df.assign(skills=matcher.labels(packed).values), packed
+
+
+def print_skill_summary(matcher, packed):
+    """In các skill xuất hiện nhiều nhất"""
+    counts = matcher.counts(packed)
+    print(f"   ✅ {len(matcher)} skills trong taxonomy, {int((counts > 0).sum())} skills xuất hiện")
+    for skill_id in counts.argsort(kind='stable')[::-1][:TOP_SKILLS_TO_PRINT]:
+        count = int(counts[skill_id])
+        if count == 0:
+            break
+        percentage = (count / len(packed) * 100) if len(packed) > 0 else 0
+        print(f"   {matcher.names[skill_id]}: {count} jobs ({percentage:.1f}%)")
+
+
+def analyze_skills(df, matcher=None):
     """
     Phân tích kỹ năng được yêu cầu trong job descriptions
     
+    Quét mỗi description một lần với SkillMatcher (mọi skill + synonyms
+    trong taxonomy), thay vì một lượt regex cho từng skill.
+    
     Args:
         df: DataFrame chứa jobs
+        matcher: SkillMatcher (mặc định đọc SKILLS_TAXONOMY_FILE)
         
     Returns:
-        DataFrame với các cột skill mới (True/False)
+        DataFrame với cột `skills` (tên skill nối bằng '|', ví dụ 'Python|SQL')
     """
     print("🔍 Đang phân tích kỹ năng...")
     
-    for skill in SKILLS_TO_TRACK:
-        # Tìm skill trong job_description (case-insensitive)
-        pattern = r'\b' + re.escape(skill) + r'\b'
-        df[f'skill_{skill.lower()}'] = df['job_description'].str.contains(
-            pattern, case=False, regex=True, na=False
-        )
-        
-        count = df[f'skill_{skill.lower()}'].sum()
-        percentage = (count / len(df) * 100) if len(df) > 0 else 0
-        print(f"   {skill}: {count} jobs ({percentage:.1f}%)")
+    matcher = matcher or load_skill_matcher()
+    df, packed = detect_skills(df, matcher)
+    print_skill_summary(matcher, packed)
+    
+    print()
+    return df
+
+
+# ============================================================================
+# TRANSFORM SONG SONG (--workers N)
+# ============================================================================
+
+def transform_shard(raw_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Extract + clean + nhận diện skill cho một raw shard (chạy trong worker process)
+    
+    Chưa dedup: job trùng có thể nằm ở shard khác, dedup chạy sau khi merge.
+    """
+    frames = [extract_fields(chunk) for chunk in iter_job_chunks([raw_file], chunk_size)]
+    if not frames:
+        return pd.DataFrame()
+    
+    df = clean_fields(pd.concat(frames, ignore_index=True))
+    df, _ = detect_skills(df, load_skill_matcher())
+    return df
+
+
+def _partition_keep(keys):
+    """Vị trí các dòng giữ lại (lần xuất hiện đầu tiên) trong một partition"""
+    return keys.index[~keys.duplicated(keep='first')].to_numpy()
+
+
+def drop_duplicates_partitioned(df, partitions, executor=None):
+    """
+    drop_duplicates(DEDUP_COLUMNS, keep='first') chia theo hash
     
+    Các dòng cùng key luôn rơi vào cùng partition, nên mỗi partition dedup
+    độc lập (song song nếu có executor). Kết quả giống hệt drop_duplicates
+    trên toàn bộ df, kể cả thứ tự dòng.
+    """
+    keys = df[DEDUP_COLUMNS].reset_index(drop=True)
+    partition = pd.util.hash_pandas_object(keys, index=False).to_numpy() % partitions
+    groups = [keys[partition == p] for p in range(partitions)]
+    
+    mapper = executor.map if executor is not None else map
+    keep = np.sort(np.concatenate([np.empty(0, dtype=np.int64)] + list(mapper(_partition_keep, groups))))
+    return df.iloc[keep].reset_index(drop=True)
+
+
+def transform_sharded(raw_files, workers=1, cache=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Transform từng raw shard (song song nếu workers > 1) rồi merge + dedup
+    
+    Args:
+        raw_files: Danh sách raw shard
+        workers: Số process (1 = chạy trong process hiện tại)
+        cache: ShardCache (incremental) -> chỉ transform shard đã thay đổi,
+               shard không đổi đọc lại kết quả đã cache
+    
+    Returns:
+        DataFrame giống main() chạy tuần tự (clean_data + analyze_skills)
+    """
+    stale = [raw_file for raw_file in raw_files if cache is None or not cache.is_fresh(raw_file)]
+    print(f"\n⚙️  Transform theo shard: {len(stale)}/{len(raw_files)} shards cần xử lý, {workers} workers")
+    
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    mapper = executor.map if executor is not None else map
+    
+    try:
+        results = dict(zip(stale, mapper(transform_shard, stale, [chunk_size] * len(stale))))
+        
+        frames = []
+        for raw_file in raw_files:
+            if raw_file in results:
+                frame = results[raw_file]
+                if cache is not None:
+                    cache.store(raw_file, frame)
+                print(f"   📄 {raw_file.name}: {len(frame)} jobs")
+            else:
+                frame = cache.load(raw_file)
+                print(f"   ♻️  {raw_file.name}: {len(frame)} jobs (cache)")
+            if not frame.empty:
+                frames.append(frame)
+        
+        if cache is not None:
+            cache.prune(raw_files)
+            cache.save()
+        
+        if not frames:
+            return pd.DataFrame()
+        
+        df = pd.concat(frames, ignore_index=True)
+        print(f"✅ Đã transform {len(df)} jobs từ {len(raw_files)} files\n")
+        
+        print("🧹 Đang xóa jobs trùng lặp (hash-partitioned)...")
+        initial_count = len(df)
+        df = drop_duplicates_partitioned(df, workers, executor)
+        print(f"   ✅ Xóa {initial_count - len(df)} jobs trùng lặp\n")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    print("🔍 Kỹ năng:")
+    matcher = load_skill_matcher()
+    print_skill_summary(matcher, matcher.from_labels(df['skills']))
     print()
+    
     return df
 
 
+def drop_near_duplicates(df, threshold=NEAR_DUP_THRESHOLD):
+    """
+    Gộp các job gần trùng (repost đổi title, cùng description ở nhiều thành phố / quốc gia)
+    
+    MinHash + LSH trên shingle của job_description (near_dedup.py): mỗi cụm
+    giữ job xuất hiện đầu tiên, giống drop_duplicates(keep='first').
+    Các cụm đã gộp được ghi ra NEAR_DUP_REPORT_FILE.
+    
+    Args:
+        df: DataFrame đã dedup chính xác
+        threshold: Ngưỡng Jaccard ước lượng giữa hai description
+    """
+    print(f"🧬 Đang tìm jobs gần trùng (MinHash + LSH, ngưỡng {threshold:g})...")
+    
+    start = time.monotonic()
+    cluster, similarity = find_near_duplicates(df['job_description'], threshold)
+    duplicated = cluster != np.arange(len(df))
+    
+    members = np.isin(cluster, cluster[duplicated])
+    report = df.loc[members, [ID_COLUMN, 'job_title', 'company', 'country', 'city']].copy()
+    report.insert(0, 'cluster', df[ID_COLUMN].to_numpy()[cluster[members]])
+    report['kept'] = ~duplicated[members]
+    report['similarity'] = similarity[members].round(3)
+    report = report.sort_values(['cluster', 'kept'], ascending=[True, False], kind='stable')
+    
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    report.to_csv(NEAR_DUP_REPORT_FILE, index=False, encoding='utf-8')
+    
+    sizes = pd.Series(cluster[members]).value_counts()
+    print(f"   ✅ Xóa {int(duplicated.sum())} jobs gần trùng trong {len(sizes)} cụm ({time.monotonic() - start:.1f}s)")
+    for representative, size in sizes.head(TOP_CLUSTERS_TO_PRINT).items():
+        job = df.iloc[representative]
+        print(f"      • {size} jobs: {job['job_title']} - {job['company']} ({job['country']})")
+    if len(sizes):
+        print(f"   📄 Chi tiết các cụm: {NEAR_DUP_REPORT_FILE.name}")
+    print()
+    
+    return df[~duplicated].reset_index(drop=True)
+
+
+def open_shard_cache():
+    """
+    ShardCache trong CACHE_DIR
+    
+    Config gồm TRANSFORM_VERSION, hash taxonomy skill / role, hash bảng tỷ giá và mapping region: đổi bất kỳ
+    thứ nào -> mọi shard được transform lại.
+    """
+    config = json.dumps({
+        'version': TRANSFORM_VERSION,
+        'taxonomy': file_digest(SKILLS_TAXONOMY_FILE),
+        'roles': file_digest(ROLE_TAXONOMY_FILE),
+        'currency': file_digest(CURRENCY_RATES_FILE),
+        'regions': COUNTRY_TO_REGION
+    }, sort_keys=True)
+    return ShardCache(CACHE_DIR, config)
+
+
 def calculate_kpis(df):
     """Tính toán các KPIs"""
     print("📊 KPI Tổng quan:")
@@ -194,16 +523,101 @@ def calculate_kpis(df):
     print()
 
 
+def skill_bits_array(labels, matcher):
+    """
+    Cột `skills` ('Python|SQL') -> ma trận skill bit-packed dạng Arrow
+    fixed_size_binary (mỗi job một dòng ceil(số skill / 8) byte)
+    
+    Thứ tự bit = thứ tự skill trong taxonomy, lưu trong metadata của field.
+    """
+    packed = matcher.from_labels(labels)
+    array = pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(matcher.num_bytes), len(packed), [None, pa.py_buffer(packed.tobytes())]
+    )
+    field = pa.field('skill_bits', array.type, metadata={
+        'skill_names': json.dumps(matcher.names, ensure_ascii=False)
+    })
+    return field, array
+
+
+def to_arrow_table(df, matcher=None):
+    """
+    Chuyển DataFrame sang Arrow table với kiểu cột rõ ràng
+    
+    - country/region/category/...: dictionary (categorical)
+    - has_salary: bool
+    - skills: ma trận bit-packed `skill_bits` (fixed_size_binary)
+    - salary_min/max: float64
+    - date_posted: timestamp (UTC)
+    - còn lại: string (không null, để API đọc zero-copy)
+    """
+    fields = []
+    arrays = []
+    
+    for column in df.columns:
+        series = df[column]
+        
+        if column == 'skills':
+            field, array = skill_bits_array(series, matcher or load_skill_matcher())
+            fields.append(field)
+            arrays.append(array)
+            continue
+        
+        if column in CATEGORICAL_COLUMNS:
+            array = pa.array(series.fillna('Unknown').astype(str)).dictionary_encode()
+        elif column == 'has_salary':
+            array = pa.array(series.fillna(False).astype(bool), type=pa.bool_())
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            array = pa.array(series, type=pa.timestamp('ns', tz='UTC'), from_pandas=True)
+        elif pd.api.types.is_numeric_dtype(series):
+            array = pa.array(series.astype('float64'), type=pa.float64(), from_pandas=True)
+        else:
+            array = pa.array(series.fillna('').astype(str), type=pa.string())
+        
+        fields.append(pa.field(column, array.type))
+        arrays.append(array)
+    
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def save_arrow(df, arrow_file):
+    """
+    Lưu Arrow IPC file (không nén) để API memory-map trực tiếp
+    Ghi ra file tạm rồi rename -> API không bao giờ đọc phải file ghi dở
+    """
+    table = to_arrow_table(df)
+    tmp_file = arrow_file.with_suffix(arrow_file.suffix + '.tmp')
+    
+    with pa.OSFile(str(tmp_file), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    
+    tmp_file.replace(arrow_file)
+
+
 def save_output(df):
-    """Lưu kết quả ra CSV và Excel"""
+    """Lưu kết quả ra Arrow, CSV và Excel"""
     print("💾 Đang lưu kết quả...")
     
     # Ensure output directory exists
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Save CSV (nhanh)
+    # Save Arrow (API đọc file này, memory-mapped)
+    arrow_file = OUTPUT_DIR / 'clean_jobs.arrow'
+    if pa is not None:
+        save_arrow(df, arrow_file)
+        print(f"   ✅ Đã lưu Arrow: {arrow_file.name}")
+    else:
+        print("   ⚠️  Chưa cài pyarrow, bỏ qua file Arrow (API sẽ đọc CSV)")
+        # Xóa file Arrow cũ để API không đọc nhầm dữ liệu lỗi thời
+        if arrow_file.exists():
+            arrow_file.unlink()
+    
+    # Save CSV (nhanh) - file tạm + rename để API hot reload không đọc phải file ghi dở
     csv_file = OUTPUT_DIR / 'clean_jobs.csv'
-    df.to_csv(csv_file, index=False, encoding='utf-8')
+    tmp_csv_file = csv_file.with_suffix('.csv.tmp')
+    df.to_csv(tmp_csv_file, index=False, encoding='utf-8')
+    tmp_csv_file.replace(csv_file)
     print(f"   ✅ Đã lưu CSV: {csv_file.name}")
     
     # Save Excel (chậm - skip nếu đã tồn tại)
@@ -220,42 +634,125 @@ def save_output(df):
     
     if should_create_excel:
         print(f"   ⏳ Đang tạo Excel file (có thể mất 10-30 giây)...")
-        df.to_excel(excel_file, index=False, engine='openpyxl')
+        # Excel không lưu được datetime có timezone -> ghi giờ UTC không kèm timezone
+        excel_df = df.assign(**{
+            column: df[column].dt.tz_localize(None)
+            for column in df.columns
+            if isinstance(df[column].dtype, pd.DatetimeTZDtype)
+        })
+        excel_df.to_excel(excel_file, index=False, engine='openpyxl')
         print(f"   ✅ Đã lưu Excel: {excel_file.name}")
     
     print(f"\n📁 Output tại: {OUTPUT_DIR}")
 
 
+def save_trend_snapshot(df, crawl_date=None):
+    """Ghi snapshot + rollup theo ngày của lần crawl này (partition theo quốc gia)"""
+    print("📈 Đang lưu snapshot trend...")
+    partitions = write_snapshot(df, crawl_date)
+    if partitions:
+        print(f"   ✅ {len(partitions)} partition trong {partitions[0].parent.relative_to(TRENDS_DIR.parent)}")
+    print()
+
+
+def parse_args():
+    """Tham số dòng lệnh"""
+    parser = argparse.ArgumentParser(description="Transform & clean raw jobs")
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help="Số process transform song song theo từng raw shard (0 = số CPU, 1 = tuần tự)"
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="Chỉ transform lại raw shard đã thay đổi (dùng cache trong data/transform_cache)"
+    )
+    parser.add_argument(
+        '--crawl-date',
+        type=lambda value: datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d'),
+        default=None,
+        help="Ngày crawl (YYYY-MM-DD) của snapshot trend trong data/trends (mặc định: hôm nay, UTC)"
+    )
+    parser.add_argument(
+        '--near-dup-threshold',
+        type=float,
+        default=NEAR_DUP_THRESHOLD,
+        help="Ngưỡng Jaccard (0-1] để coi hai job description là gần trùng"
+    )
+    parser.add_argument(
+        '--no-near-dedup',
+        action='store_true',
+        help="Bỏ bước gộp jobs gần trùng (chỉ dedup chính xác job_title + company)"
+    )
+    args = parser.parse_args()
+    if not 0 < args.near_dup_threshold <= 1:
+        parser.error("--near-dup-threshold phải trong khoảng (0, 1]")
+    return args
+
+
 def main():
     """Hàm main - Transform & Clean data"""
+    args = parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    
     print("\n" + "="*70)
     print("🚀 BẮT ĐẦU TRANSFORM & CLEAN DATA")
     print("="*70)
     
-    # 1. Load raw JSON
-    all_jobs = load_raw_json_files()
+    start = time.monotonic()
+    raw_files = list_raw_files()
+    cache = open_shard_cache() if args.incremental and raw_files else None
+    
+    # Output phụ thuộc raw shard, cấu hình near dedup (đổi ngưỡng -> xuất lại) và ngày crawl:
+    # ngày crawl mới luôn phải ghi snapshot trend của nó (shard không đổi vẫn lấy từ cache)
+    near_dup_threshold = None if args.no_near_dedup else args.near_dup_threshold
+    crawl_date = args.crawl_date or datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    output_key = (
+        f"{cache.signature(raw_files)}:{near_dup_threshold}:{crawl_date}" if cache is not None else None
+    )
+    
+    if cache is not None and cache.output == output_key and (OUTPUT_DIR / 'clean_jobs.csv').exists():
+        # Lưu stat mới của các shard chỉ bị touch (lần sau khỏi hash lại)
+        cache.save()
+        print("\n✅ Không có raw shard nào thay đổi, output đã mới nhất")
+        return
+    
+    if (workers > 1 or cache is not None) and raw_files:
+        # 1 -> 4. Mỗi shard extract + clean + skills (song song / từ cache), rồi merge + dedup
+        df = transform_sharded(raw_files, workers, cache)
+    else:
+        # 1 + 2. Đọc raw jobs (stream theo chunk) & extract fields
+        df = build_dataframe(raw_files) if raw_files else pd.DataFrame()
+        
+        if not df.empty:
+            # 3. Clean data
+            df = clean_data(df)
+            
+            # 4. Analyze skills
+            df = analyze_skills(df)
     
-    if not all_jobs:
+    if df.empty:
         print("❌ Không có dữ liệu để xử lý!")
         return
     
-    # 2. Extract fields
-    print("📋 Đang trích xuất các trường dữ liệu...")
-    extracted_data = [extract_fields(job) for job in all_jobs]
-    df = pd.DataFrame(extracted_data)
-    print(f"✅ Đã trích xuất {len(df)} jobs\n")
+    # 4b. Gộp jobs gần trùng (sau dedup chính xác, trên toàn bộ dataset đã merge)
+    if near_dup_threshold is not None:
+        df = drop_near_duplicates(df, near_dup_threshold)
     
-    # 3. Clean data
-    df = clean_data(df)
-    
-    # 4. Analyze skills
-    df = analyze_skills(df)
+    print(f"⏱️  Transform xong sau {time.monotonic() - start:.1f}s\n")
     
     # 5. Calculate KPIs
     calculate_kpis(df)
     
-    # 6. Save output
+    # 6. Snapshot trend (trước output chính: API load lại khi clean_jobs đổi là đã thấy rollup mới)
+    save_trend_snapshot(df, crawl_date)
+    
+    # 7. Save output
     save_output(df)
+    if cache is not None:
+        cache.save(output=output_key)
     
     print("\n" + "="*70)
     print("✅ HOÀN THÀNH TRANSFORM & CLEAN!")
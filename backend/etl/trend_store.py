@@ -0,0 +1,178 @@
+"""
+Trend Store - Snapshot dữ liệu theo ngày crawl + quốc gia và rollup theo ngày đăng
+Mỗi lần transform ghi thêm một snapshot (không ghi đè lịch sử); /api/trends chỉ đọc rollup
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CẤU HÌNH
+# ============================================================================
+# data/trends/crawl_date=YYYY-MM-DD/country=XX/{jobs.csv.gz, rollup.json}
+TRENDS_DIR = Path(__file__).parent.parent / 'data' / 'trends'
+
+JOBS_NAME = 'jobs.csv.gz'
+ROLLUP_NAME = 'rollup.json'
+
+# Tăng khi đổi format rollup -> API bỏ qua rollup cũ không đọc được
+ROLLUP_VERSION = 1
+
+# Cột giữ lại trong snapshot jobs (bỏ job_description để snapshot nhỏ)
+SNAPSHOT_COLUMNS = [
+    'job_id', 'job_title', 'company', 'city', 'category', 'role', 'seniority', 'salary_min', 'salary_max',
+    'salary_currency', 'salary_period', 'salary_min_usd', 'salary_max_usd', 'date_posted', 'skills'
+]
+
+# Histogram lương theo thang log: SALARY_BINS bin từ SALARY_BIN_MIN tới SALARY_BIN_MAX
+# (mỗi bin rộng ~2.3% -> median nội suy từ histogram sai số < 1.2%).
+# Histogram cộng được giữa các ngày, median thì không -> rollup lưu histogram.
+SALARY_BIN_MIN = 1_000
+SALARY_BIN_MAX = 10_000_000
+SALARY_BINS = 400
+
+SKILL_SEPARATOR = '|'
+
+
+# ============================================================================
+# HÀM TIỆN ÍCH
+# ============================================================================
+
+def partition_dir(crawl_date, country, root=TRENDS_DIR):
+    """Thư mục partition của một quốc gia trong một lần crawl"""
+    return Path(root) / f'crawl_date={crawl_date}' / f'country={country}'
+
+
+def salary_bin(values):
+    """Lương -> chỉ số bin trên thang log (giá trị ngoài khoảng bị kẹp vào bin đầu/cuối)"""
+    scale = SALARY_BINS / np.log(SALARY_BIN_MAX / SALARY_BIN_MIN)
+    bins = np.floor(np.log(np.maximum(values, SALARY_BIN_MIN) / SALARY_BIN_MIN) * scale)
+    return np.clip(bins, 0, SALARY_BINS - 1).astype(np.int64)
+
+
+def salary_midpoint(df):
+    """Mức lương đại diện của mỗi job: trung bình min/max (thiếu một đầu thì lấy đầu còn lại)"""
+    return df[['salary_min', 'salary_max']].astype('float64').mean(axis=1)
+
+
+def _write_atomic(path, write):
+    tmp_file = path.with_name(path.name + '.tmp')
+    write(tmp_file)
+    tmp_file.replace(path)
+
+
+# ============================================================================
+# ROLLUP
+# ============================================================================
+
+def daily_rollup(df, crawl_date, country):
+    """
+    Rollup theo ngày đăng (date_posted, UTC) của jobs một quốc gia
+
+    Mỗi ngày: số jobs, số jobs có lương, số jobs theo từng skill và
+    histogram lương theo currency ({currency: {bin: count}}).
+    Job không có date_posted chỉ được đếm vào `undated`.
+    """
+    dates = pd.to_datetime(df['date_posted'], utc=True, errors='coerce')
+    dated = dates.notna().to_numpy()
+    df = df[dated]
+    # Format từng ngày một lần (không strftime từng dòng)
+    codes, uniques = pd.factorize(dates[dated].dt.floor('D'), sort=True)
+    days = np.asarray(uniques.strftime('%Y-%m-%d'), dtype=object)[codes]
+
+    jobs = pd.Series(1, index=days).groupby(level=0).sum()
+
+    # Skill: một dòng (ngày, skill) cho mỗi job có skill đó
+    skills = df['skills'].fillna('').astype(str).str.split(SKILL_SEPARATOR)
+    skill_pairs = pd.DataFrame({'date': days, 'skill': skills.to_numpy()}).explode('skill')
+    skill_pairs = skill_pairs[skill_pairs['skill'].fillna('') != '']
+    skill_counts = skill_pairs.groupby(['date', 'skill']).size()
+
+    # Lương: đếm theo (ngày, currency, bin)
+    salary = salary_midpoint(df).to_numpy()
+    paid = ~np.isnan(salary)
+    salary_rows = pd.DataFrame({
+        'date': days[paid],
+        'currency': df['salary_currency'].astype(object).fillna('Unknown').to_numpy()[paid],
+        'bin': salary_bin(salary[paid]),
+    })
+    salary_counts = salary_rows.groupby(['date', 'currency', 'bin']).size()
+
+    records = []
+    for day, count in jobs.items():
+        day_skills = skill_counts.xs(day, level='date') if day in skill_counts.index else pd.Series(dtype=int)
+        day_salary = salary_counts.xs(day, level='date') if day in salary_counts.index else pd.Series(dtype=int)
+
+        histograms = {}
+        for (currency, bin_id), bin_count in day_salary.items():
+            histograms.setdefault(currency, {})[str(bin_id)] = int(bin_count)
+
+        records.append({
+            'date': day,
+            'jobs': int(count),
+            'salary_jobs': int(day_salary.sum()),
+            'skills': {skill: int(n) for skill, n in day_skills.items()},
+            'salary_hist': histograms,
+        })
+
+    return {
+        'version': ROLLUP_VERSION,
+        'crawl_date': crawl_date,
+        'country': country,
+        'jobs': int(len(dated)),
+        'undated': int((~dated).sum()),
+        'salary_bins': {'min': SALARY_BIN_MIN, 'max': SALARY_BIN_MAX, 'count': SALARY_BINS},
+        'days': records,
+    }
+
+
+# ============================================================================
+# SNAPSHOT
+# ============================================================================
+
+def write_snapshot(df, crawl_date=None, root=TRENDS_DIR):
+    """
+    Ghi snapshot của lần crawl hiện tại, mỗi quốc gia một partition
+
+    - jobs.csv.gz: jobs của quốc gia (không có job_description) để giữ lịch sử
+    - rollup.json: rollup theo ngày (API chỉ đọc file này)
+
+    Chạy lại trong cùng crawl_date thì ghi đè partition của ngày đó (partition
+    của quốc gia không còn dữ liệu bị xóa); snapshot các ngày khác giữ nguyên.
+
+    Returns:
+        Danh sách thư mục partition đã ghi
+    """
+    crawl_date = crawl_date or datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    columns = [column for column in SNAPSHOT_COLUMNS if column in df.columns]
+    countries = df['country'].astype(object).fillna('Unknown').astype(str)
+
+    written = []
+    for country, rows in df[columns].groupby(countries.to_numpy(), sort=True):
+        directory = partition_dir(crawl_date, country, root)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        _write_atomic(
+            directory / JOBS_NAME,
+            lambda path: rows.to_csv(path, index=False, encoding='utf-8', compression='gzip')
+        )
+        rollup = daily_rollup(rows, crawl_date, country)
+        _write_atomic(
+            directory / ROLLUP_NAME,
+            lambda path: path.write_text(json.dumps(rollup, ensure_ascii=False), encoding='utf-8')
+        )
+        written.append(directory)
+
+    # Quốc gia có trong lần chạy trước cùng ngày nhưng không còn dữ liệu
+    crawl_dir = Path(root) / f'crawl_date={crawl_date}'
+    for directory in crawl_dir.glob('country=*'):
+        if directory not in written:
+            for path in directory.iterdir():
+                path.unlink()
+            directory.rmdir()
+
+    return written
@@ -0,0 +1,88 @@
+"""
+Cấu hình pytest chung - chạy từ thư mục backend: python -m pytest -q
+"""
+
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# api.* import theo package từ backend/, các module etl import phẳng (như khi chạy trong etl/)
+for path in (BACKEND_DIR / 'etl', BACKEND_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# API trong test không theo dõi file dataset
+os.environ.setdefault('DATASET_RELOAD_INTERVAL', '0')
+
+COUNTRIES = ['GB', 'US', 'DE']
+CURRENCIES = {'GB': ('GBP', 1.27), 'US': ('USD', 1.0), 'DE': ('EUR', 1.08)}
+CATEGORIES = ['Data Analyst', 'Data Engineer', 'Software Engineer']
+SENIORITY = ['Junior', 'Mid', 'Senior', 'Unspecified']
+SKILLS = ['Python', 'SQL', 'AWS', 'Excel', 'Docker']
+
+
+def make_jobs_frame(rows=120, seed=7):
+    """DataFrame giống clean_jobs.csv (cột skills dạng 'A|B'), sinh ngẫu nhiên có seed"""
+    rng = np.random.default_rng(seed)
+    countries = rng.choice(COUNTRIES, rows)
+    categories = rng.choice(CATEGORIES, rows)
+    salary_min = np.round(rng.uniform(20_000, 120_000, rows), -3)
+    salary_min[rng.random(rows) < 0.3] = np.nan
+    salary_max = salary_min + 10_000
+    rates = np.array([CURRENCIES[country][1] for country in countries])
+    skills = ['|'.join(sorted(rng.choice(SKILLS, rng.integers(0, 4), replace=False))) for _ in range(rows)]
+
+    return pd.DataFrame({
+        'job_id': [f'{i:016x}' for i in range(rows)],
+        'job_title': [f'{category} {i % 7}' for i, category in enumerate(categories)],
+        'company': [f'Company {i % 11}' for i in range(rows)],
+        'country': countries,
+        'city': [f'City {i % 5}' for i in range(rows)],
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+        'salary_currency': [CURRENCIES[country][0] for country in countries],
+        'salary_period': 'year',
+        'job_description': [f'{category} job {i} python sql' for i, category in enumerate(categories)],
+        'date_posted': pd.Timestamp('2024-06-01', tz='UTC') - pd.to_timedelta(rng.integers(0, 60, rows), 'D'),
+        'category': categories,
+        'source': 'Adzuna',
+        'region': np.where(countries == 'US', 'Americas', 'Europe'),
+        'has_salary': ~np.isnan(salary_min),
+        'salary_min_usd': salary_min * rates,
+        'salary_max_usd': salary_max * rates,
+        'role': categories,
+        'seniority': rng.choice(SENIORITY, rows),
+        'skills': skills,
+    })
+
+
+@pytest.fixture
+def jobs_frame():
+    return make_jobs_frame()
+
+
+@pytest.fixture
+def snapshot(jobs_frame):
+    """DatasetSnapshot dựng từ jobs_frame (như khi API load CSV), version riêng mỗi test"""
+    from api.dataset import DatasetSnapshot
+    from api.skill_matrix import SkillMatrix
+
+    skills, df = SkillMatrix.from_dataframe(jobs_frame.copy())
+    return DatasetSnapshot(df, skills, uuid.uuid4().hex[:12], None)
+
+
+@pytest.fixture
+def client(snapshot, monkeypatch):
+    """TestClient của api.main phục vụ snapshot của test"""
+    from fastapi.testclient import TestClient
+    from api import main
+
+    monkeypatch.setattr(main.dataset, 'current', snapshot)
+    return TestClient(main.app)
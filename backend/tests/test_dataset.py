@@ -0,0 +1,27 @@
+"""
+Test layout trong RAM của DatasetSnapshot (api/dataset.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from api.dataset import CATEGORY_COLUMNS, compact_frame
+
+
+def test_compact_frame_keeps_salaries_float64(jobs_frame):
+    # Lương INR cỡ chục triệu: float32 sẽ làm tròn tới bội số của 2
+    jobs_frame.loc[0, ['salary_min', 'salary_max']] = [12_345_677.0, 16_777_217.0]
+    df = compact_frame(jobs_frame.copy())
+
+    for column in ['salary_min', 'salary_max', 'salary_min_usd', 'salary_max_usd']:
+        assert df[column].dtype == np.float64
+    assert df.loc[0, 'salary_max'] == 16_777_217.0
+    assert df.loc[0, 'salary_min'] == 12_345_677.0
+
+
+def test_compact_frame_categorizes_repeated_columns(jobs_frame):
+    df = compact_frame(jobs_frame.copy())
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            assert isinstance(df[column].dtype, pd.CategoricalDtype)
+    pd.testing.assert_series_equal(df['country'].astype(object), jobs_frame['country'].astype(object))
@@ -0,0 +1,256 @@
+"""
+Test extract_jobs với stub server Adzuna chạy local (aiohttp)
+Kiểm tra retry/backoff, token bucket, dedup và thứ tự ghi giữa các keyword
+"""
+
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import extract_jobs
+from raw_store import find_shard, iter_raw_jobs
+
+
+# ============================================================================
+# STUB SERVER
+# ============================================================================
+
+def make_job(job_id, created='2024-05-01T00:00:00Z'):
+    return {'id': job_id, 'title': f'Job {job_id}', 'created': created}
+
+
+class StubAdzuna:
+    """
+    Stub của endpoint /jobs/{country}/search/{page}
+
+    pages[keyword] = list các trang (list job); failures = list status trả về
+    trước khi trả 200 (dùng chung cho mọi request); delays[keyword] = giây chờ
+    trước khi trả lời (để đảo thứ tự hoàn thành giữa các keyword).
+    """
+
+    def __init__(self, pages, failures=(), delays=None, retry_after=None):
+        self.pages = pages
+        self.failures = list(failures)
+        self.delays = delays or {}
+        self.retry_after = retry_after
+        self.requests = []
+
+    async def handle(self, request):
+        keyword = request.query['what']
+        page = int(request.match_info['page'])
+        self.requests.append((keyword, page, time.monotonic()))
+
+        await asyncio.sleep(self.delays.get(keyword, 0))
+        if self.failures:
+            headers = {'Retry-After': self.retry_after} if self.retry_after else {}
+            return web.Response(status=self.failures.pop(0), text='stub error', headers=headers)
+
+        keyword_pages = self.pages.get(keyword, [])
+        results = keyword_pages[page - 1] if page <= len(keyword_pages) else []
+        count = sum(len(jobs) for jobs in keyword_pages)
+        return web.json_response({'count': count, 'results': results})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get('/jobs/{country}/search/{page}', self.handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return str(self.server.make_url('')).rstrip('/')
+
+    async def __aexit__(self, *exc_info):
+        await self.server.close()
+
+
+def configure(monkeypatch, tmp_path, url, results_per_page=2):
+    monkeypatch.setattr(extract_jobs, 'ADZUNA_API_URL', url)
+    monkeypatch.setattr(extract_jobs, 'ADZUNA_APP_ID', 'test')
+    monkeypatch.setattr(extract_jobs, 'ADZUNA_APP_KEY', 'test')
+    monkeypatch.setattr(extract_jobs, 'RESULTS_PER_PAGE', results_per_page)
+    monkeypatch.setattr(extract_jobs, 'BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(extract_jobs, 'RATE_LIMIT', 1000)
+    monkeypatch.setattr(extract_jobs, 'OUTPUT_DIR', tmp_path / 'raw_jobs')
+    monkeypatch.setattr(extract_jobs, 'CHECKPOINT_FILE', tmp_path / 'checkpoint.json')
+    (tmp_path / 'raw_jobs').mkdir(parents=True, exist_ok=True)
+
+
+def read_shard(tmp_path, country_code='sg'):
+    return list(iter_raw_jobs(find_shard(tmp_path / 'raw_jobs', country_code)))
+
+
+# ============================================================================
+# RETRY / BACKOFF
+# ============================================================================
+
+def test_retry_delay_prefers_retry_after(monkeypatch):
+    monkeypatch.setattr(extract_jobs, 'BACKOFF_BASE', 1.0)
+    assert extract_jobs._retry_delay(3, '2.5') == 2.5
+    # Header không phải số -> exponential backoff + jitter
+    assert 8.0 <= extract_jobs._retry_delay(3, 'soon') <= 9.0
+    assert 1.0 <= extract_jobs._retry_delay(0) <= 2.0
+
+
+def test_fetch_retries_429_and_5xx(monkeypatch, tmp_path):
+    stub = StubAdzuna({'Data Analyst': [[make_job('1')]]}, failures=[429, 503])
+
+    async def run():
+        async with stub as url:
+            configure(monkeypatch, tmp_path, url)
+            limiter = extract_jobs.TokenBucket(1000, 10)
+            async with extract_jobs.aiohttp.ClientSession() as session:
+                return await extract_jobs.fetch_jobs_for_country_keyword(
+                    session, limiter, 'sg', 'Data Analyst'
+                )
+
+    data = asyncio.run(run())
+    assert [job['id'] for job in data['results']] == ['1']
+    assert len(stub.requests) == 3
+
+
+def test_fetch_gives_up_after_max_retries(monkeypatch, tmp_path):
+    stub = StubAdzuna({}, failures=[500] * 10, retry_after='0')
+    monkeypatch.setattr(extract_jobs, 'MAX_RETRIES', 2)
+
+    async def run():
+        async with stub as url:
+            configure(monkeypatch, tmp_path, url)
+            limiter = extract_jobs.TokenBucket(1000, 10)
+            async with extract_jobs.aiohttp.ClientSession() as session:
+                return await extract_jobs.fetch_jobs_for_country_keyword(
+                    session, limiter, 'sg', 'Data Analyst'
+                )
+
+    assert asyncio.run(run()) is None
+    assert len(stub.requests) == 3
+
+
+def test_fetch_does_not_retry_client_errors(monkeypatch, tmp_path):
+    stub = StubAdzuna({}, failures=[401])
+
+    async def run():
+        async with stub as url:
+            configure(monkeypatch, tmp_path, url)
+            limiter = extract_jobs.TokenBucket(1000, 10)
+            async with extract_jobs.aiohttp.ClientSession() as session:
+                return await extract_jobs.fetch_jobs_for_country_keyword(
+                    session, limiter, 'sg', 'Data Analyst'
+                )
+
+    assert asyncio.run(run()) is None
+    assert len(stub.requests) == 1
+
+
+# ============================================================================
+# TOKEN BUCKET
+# ============================================================================
+
+def test_token_bucket_allows_burst_then_limits_rate():
+    async def run():
+        bucket = extract_jobs.TokenBucket(rate=50, capacity=3)
+        started = time.monotonic()
+        stamps = []
+        for _ in range(8):
+            await bucket.acquire()
+            stamps.append(time.monotonic() - started)
+        return stamps
+
+    stamps = asyncio.run(run())
+    # 3 token đầu có sẵn, 5 token sau phải chờ nạp lại với tốc độ 50/giây
+    assert stamps[2] < 0.05
+    assert stamps[-1] >= 5 / 50 * 0.9
+
+
+# ============================================================================
+# DEDUP + THỨ TỰ GHI
+# ============================================================================
+
+KEYWORD_PAGES = {
+    'Data Analyst': [[make_job('a1'), make_job('a2')], [make_job('shared'), make_job('a3')]],
+    'Data Engineer': [[make_job('shared'), make_job('e1')], [make_job('e2'), make_job('a1')]],
+    'Software Engineer': [[make_job('s1'), make_job('s2')]],
+}
+
+EXPECTED_ORDER = [
+    ('a1', 'Data Analyst'), ('a2', 'Data Analyst'), ('shared', 'Data Analyst'), ('a3', 'Data Analyst'),
+    ('e1', 'Data Engineer'), ('e2', 'Data Engineer'),
+    ('s1', 'Software Engineer'), ('s2', 'Software Engineer'),
+]
+
+
+def run_full_crawl(monkeypatch, tmp_path, delays):
+    stub = StubAdzuna(KEYWORD_PAGES, delays=delays)
+
+    async def run():
+        async with stub as url:
+            configure(monkeypatch, tmp_path, url)
+            await extract_jobs.extract_all_countries({'sg': 'Singapore'})
+
+    asyncio.run(run())
+    return [(job['id'], job['_category']) for job in read_shard(tmp_path)]
+
+
+def test_full_crawl_dedups_in_keyword_order(monkeypatch, tmp_path):
+    # Keyword đứng trước về sau cùng -> thứ tự ghi vẫn theo JOB_KEYWORDS
+    delays = {'Data Analyst': 0.1, 'Data Engineer': 0.0, 'Software Engineer': 0.05}
+    assert run_full_crawl(monkeypatch, tmp_path, delays) == EXPECTED_ORDER
+
+
+def test_full_crawl_is_deterministic(monkeypatch, tmp_path):
+    fast_first = run_full_crawl(monkeypatch, tmp_path / 'a', {'Software Engineer': 0.1})
+    slow_first = run_full_crawl(monkeypatch, tmp_path / 'b', {'Data Analyst': 0.1})
+    assert fast_first == slow_first == EXPECTED_ORDER
+
+
+def test_incremental_stops_on_own_checkpoint(monkeypatch, tmp_path):
+    first = run_full_crawl(monkeypatch, tmp_path / 'run1', {})
+
+    # Lần sau: mỗi keyword có 1 job mới ở đầu; job 'shared' mới của Data Engineer
+    # đã có trong shard (do Data Analyst lấy) nhưng không được làm dừng keyword
+    new_pages = {
+        'Data Analyst': [[make_job('a4', '2024-06-01T00:00:00Z'), make_job('a1')]],
+        'Data Engineer': [[make_job('shared', '2024-06-02T00:00:00Z'), make_job('e3', '2024-06-01T00:00:00Z')],
+                          [make_job('e1')]],
+        'Software Engineer': [[make_job('s1'), make_job('s2')]],
+    }
+    stub = StubAdzuna(new_pages)
+
+    async def run():
+        async with stub as url:
+            monkeypatch.setattr(extract_jobs, 'ADZUNA_API_URL', url)
+            await extract_jobs.extract_all_countries({'sg': 'Singapore'}, incremental=True)
+
+    asyncio.run(run())
+    rows = [(job['id'], job['_category']) for job in read_shard(tmp_path / 'run1')]
+    assert rows == first + [('a4', 'Data Analyst'), ('e3', 'Data Engineer')]
+    # Data Engineer đi tiếp sang trang 2 rồi mới gặp job cũ
+    assert ('Data Engineer', 2) in [(keyword, page) for keyword, page, _ in stub.requests]
+
+
+def test_incremental_page_cap_keeps_checkpoint(monkeypatch, tmp_path):
+    monkeypatch.setattr(extract_jobs, 'JOB_KEYWORDS', ['Data Analyst'])
+    monkeypatch.setattr(extract_jobs, 'INCREMENTAL_MAX_PAGES', 2)
+    old = '2024-05-01T00:00:00Z'
+
+    # 3 trang job mới (mới nhất trước), job cũ hơn checkpoint ở trang 4
+    new_jobs = [make_job(f'n{i}', f'2024-06-{30 - i:02d}T00:00:00Z') for i in range(6)]
+    pages = [new_jobs[0:2], new_jobs[2:4], new_jobs[4:6], [make_job('old', old)]]
+
+    async def crawl():
+        async with StubAdzuna({'Data Analyst': pages}) as url:
+            configure(monkeypatch, tmp_path, url)
+            await extract_jobs.extract_all_countries({'sg': 'Singapore'}, incremental=True)
+
+    configure(monkeypatch, tmp_path, '')
+    extract_jobs.save_checkpoints({'sg:Data Analyst': {'last_created': old, 'last_run': ''}})
+
+    # Checkpoint nằm sau giới hạn trang -> không được tiến, nếu không n4, n5 mất hẳn
+    asyncio.run(crawl())
+    assert extract_jobs.load_checkpoints()['sg:Data Analyst']['last_created'] == old
+    assert [job['id'] for job in read_shard(tmp_path)] == ['n0', 'n1', 'n2', 'n3']
+
+    # Tăng giới hạn -> lấy nốt phần còn thiếu rồi mới tiến checkpoint
+    monkeypatch.setattr(extract_jobs, 'INCREMENTAL_MAX_PAGES', 5)
+    asyncio.run(crawl())
+    assert [job['id'] for job in read_shard(tmp_path)] == ['n0', 'n1', 'n2', 'n3', 'n4', 'n5']
+    assert extract_jobs.load_checkpoints()['sg:Data Analyst']['last_created'] == new_jobs[0]['created']
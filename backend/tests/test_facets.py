@@ -0,0 +1,30 @@
+"""
+Test /api/facets: cùng filter với /api/jobs -> cùng tập jobs
+"""
+
+import pytest
+
+FILTERS = [
+    {},
+    {'country': 'gb'},
+    {'has_salary': 'true'},
+    {'has_salary': 'false', 'category': 'Data Engineer'},
+    {'salary_from': 60000},
+    {'salary_to': 70000, 'seniority': 'Senior'},
+    {'posted_from': '2024-05-01', 'posted_to': '2024-05-15'},
+    {'keyword': 'python', 'posted_to': '2024-05-20', 'salary_from': 30000},
+]
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_facet_total_matches_jobs_total(client, filters):
+    jobs = client.get('/api/jobs', params={**filters, 'limit': 1}).json()
+    facets = client.get('/api/facets', params={**filters, 'by': 'country'}).json()
+    assert facets['total'] == jobs['total']
+    assert sum(group['count'] for group in facets['groups']) == jobs['total']
+
+
+def test_facet_salary_range_is_usd(client, jobs_frame):
+    facets = client.get('/api/facets', params={'by': 'country', 'salary_from': 100000}).json()
+    expected = (jobs_frame['salary_min_usd'] >= 100000).sum()
+    assert facets['total'] == expected
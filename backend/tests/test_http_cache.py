@@ -0,0 +1,80 @@
+"""
+Test ETag / 304 và nén response (api/http_cache.py)
+"""
+
+import uuid
+
+from api import main
+from api.dataset import DatasetSnapshot
+from api.http_cache import MIN_COMPRESS_SIZE, etag_matches, make_etag
+
+SMALL = {'limit': 1, 'fields': 'job_id'}
+LARGE = {'limit': 100}
+
+
+def get(client, params, encoding='gzip', etag=None):
+    headers = {'Accept-Encoding': encoding}
+    if etag is not None:
+        headers['If-None-Match'] = etag
+    return client.get('/api/jobs', params=params, headers=headers)
+
+
+def test_etag_ignores_param_order():
+    assert make_etag('v1', '/api/jobs', [('a', '1'), ('b', '2')], None) == \
+        make_etag('v1', '/api/jobs', [('b', '2'), ('a', '1')], None)
+    assert make_etag('v1', '/api/jobs', [], 'gzip') != make_etag('v1', '/api/jobs', [], None)
+    assert make_etag('v1', '/api/jobs', [], None) != make_etag('v2', '/api/jobs', [], None)
+
+
+def test_etag_matches_weak_and_lists():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_large_body_is_compressed_with_encoding_etag(client, snapshot):
+    response = get(client, LARGE)
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['etag'].endswith('-gzip"')
+    assert response.headers['etag'].startswith(f'"{snapshot.version}-')
+
+    revalidated = get(client, LARGE, etag=response.headers['etag'])
+    assert revalidated.status_code == 304
+    assert revalidated.headers['etag'] == response.headers['etag']
+    assert revalidated.content == b''
+
+
+def test_small_body_is_not_compressed_and_etag_has_no_suffix(client):
+    response = get(client, SMALL)
+    assert len(response.content) < MIN_COMPRESS_SIZE
+    assert 'content-encoding' not in response.headers
+    etag = response.headers['etag']
+    assert not etag.endswith('-gzip"')
+
+    # Cùng bytes không nén -> cùng ETag dù client có nhận gzip hay không
+    assert get(client, SMALL, encoding='identity').headers['etag'] == etag
+    assert get(client, SMALL, etag=etag).status_code == 304
+    assert get(client, SMALL, encoding='identity', etag=etag).status_code == 304
+
+
+def test_encoded_etag_does_not_match_identity_request(client):
+    etag = get(client, LARGE).headers['etag']
+    response = get(client, LARGE, encoding='identity', etag=etag)
+    assert response.status_code == 200
+    assert 'content-encoding' not in response.headers
+    assert response.headers['etag'] != etag
+
+
+def test_new_dataset_version_invalidates_etag(client, jobs_frame, monkeypatch):
+    etag = get(client, LARGE).headers['etag']
+
+    from api.skill_matrix import SkillMatrix
+    skills, df = SkillMatrix.from_dataframe(jobs_frame.copy())
+    monkeypatch.setattr(main.dataset, 'current', DatasetSnapshot(df, skills, uuid.uuid4().hex[:12], None))
+
+    response = get(client, LARGE, etag=etag)
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
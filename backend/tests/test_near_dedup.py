@@ -0,0 +1,128 @@
+"""
+Test phát hiện job gần trùng (etl/near_dedup.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from near_dedup import (
+    SHINGLE_SIZE,
+    connected_labels,
+    find_near_duplicates,
+    optimal_bands,
+    signatures,
+    split_clusters
+)
+
+VOCABULARY = [f'word{i}' for i in range(500)]
+
+
+def random_text(rng, words=200):
+    return ' '.join(rng.choice(VOCABULARY, words))
+
+
+def edit(text, rng, changes=1):
+    """Thay `changes` từ ngẫu nhiên trong text"""
+    words = text.split()
+    for position in rng.choice(len(words), changes, replace=False):
+        words[position] = 'edited'
+    return ' '.join(words)
+
+
+def shingles(text):
+    words = text.lower().split()
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def test_near_duplicates_cluster_to_first_occurrence():
+    rng = np.random.default_rng(0)
+    base = [random_text(rng) for _ in range(20)]
+    texts = base + [edit(base[3], rng), base[7].upper(), edit(base[3], rng, changes=2)]
+
+    cluster, similarity = find_near_duplicates(pd.Series(texts), threshold=0.8)
+
+    expected = np.arange(len(texts))
+    expected[[20, 22]] = 3
+    expected[21] = 7  # chữ hoa / thường không khác nhau
+    assert cluster.tolist() == expected.tolist()
+    assert similarity[21] == 1.0
+    assert 0.8 <= similarity[20] < 1.0
+
+
+def test_distinct_texts_are_kept():
+    rng = np.random.default_rng(1)
+    texts = pd.Series([random_text(rng) for _ in range(50)])
+    cluster, similarity = find_near_duplicates(texts)
+    assert cluster.tolist() == list(range(50))
+    assert (similarity == 1.0).all()
+
+
+def test_empty_descriptions_are_never_merged():
+    texts = pd.Series(['', None, '   ', 'same words here', 'same words here'])
+    cluster, similarity = find_near_duplicates(texts)
+    assert cluster.tolist() == [0, 1, 2, 3, 3]
+    assert similarity[:3].tolist() == [1.0, 1.0, 1.0]
+
+
+def test_signature_estimates_jaccard():
+    rng = np.random.default_rng(2)
+    a = random_text(rng, 400)
+    b = edit(a, rng, changes=20)
+    signature, has_text = signatures(pd.Series([a, b]), num_perm=256)
+    assert has_text.all()
+    estimate = (signature[0] == signature[1]).mean()
+    assert abs(estimate - jaccard(a, b)) < 0.1
+
+
+def test_optimal_bands_fit_signature():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = optimal_bands(threshold)
+        assert bands * rows <= 128
+        # Đường cong S quanh ngưỡng: trên ngưỡng gần như luôn là ứng viên, xa dưới ngưỡng hiếm khi
+        candidate = lambda s: 1 - (1 - s ** rows) ** bands
+        assert candidate(threshold + 0.05) > 0.95
+        assert candidate(threshold - 0.3) < 0.1
+
+
+def test_connected_labels_follow_chains():
+    pairs = np.array([[3, 4], [1, 3], [5, 6]])
+    assert connected_labels(7, pairs).tolist() == [0, 1, 2, 1, 1, 5, 5]
+
+
+def replace_words(text, positions, word):
+    words = text.split()
+    for position in positions:
+        words[position] = word
+    return ' '.join(words)
+
+
+def test_chain_does_not_drop_dissimilar_end():
+    # A~B và B~C (Jaccard ~0.86) nhưng A và C chỉ ~0.73: C không được gộp vào A
+    rng = np.random.default_rng(0)
+    a = random_text(rng)
+    b = replace_words(a, [20, 60, 100], 'edited')
+    c = replace_words(b, [140, 170, 195], 'changed')
+    assert jaccard(a, b) > 0.85 and jaccard(b, c) > 0.85 and jaccard(a, c) < 0.75
+
+    cluster, similarity = find_near_duplicates(pd.Series([a, b, c]), threshold=0.8)
+
+    assert cluster.tolist() == [0, 0, 2]
+    assert (similarity >= 0.8).all()
+
+
+def test_split_clusters_regroups_around_new_leader():
+    # Chữ ký 10 hash: B khác A 1 hash, C khác B 2 hash, D khác C 1 hash -> một cụm liên thông
+    signature = np.stack([np.arange(10)] * 4 + [np.arange(200, 210)])
+    signature[1:4, 0] = 100
+    signature[2:4, 1:3] = 101
+    signature[3, 3] = 102
+
+    labels, similarity = split_clusters(signature, np.array([0, 0, 0, 0, 0]), threshold=0.8)
+
+    assert labels.tolist() == [0, 0, 2, 2, 4]
+    assert similarity.tolist() == [1.0, 0.9, 1.0, 0.9, 1.0]
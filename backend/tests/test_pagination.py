@@ -0,0 +1,94 @@
+"""
+Test cursor pagination của /api/jobs (api/pagination.py)
+"""
+
+import uuid
+
+import numpy as np
+import pytest
+
+from api import main
+from api.dataset import DatasetSnapshot
+from api.pagination import (
+    SORT_RELEVANCE,
+    SORT_ROW,
+    CursorError,
+    StaleCursorError,
+    decode_cursor,
+    encode_cursor,
+    resume_offset
+)
+from api.skill_matrix import SkillMatrix
+
+
+def walk(client, params, limit=7):
+    """Đi hết các trang bằng next_cursor, trả về list job_id"""
+    ids = []
+    response = client.get('/api/jobs', params={**params, 'limit': limit, 'fields': 'job_id'}).json()
+    total = response['total']
+    while True:
+        ids.extend(job['job_id'] for job in response['jobs'])
+        if response['next_cursor'] is None:
+            break
+        response = client.get('/api/jobs', params={
+            **params, 'limit': limit, 'fields': 'job_id', 'cursor': response['next_cursor']
+        }).json()
+    return ids, total
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'country': 'gb'},
+    {'sort': '-salary_max', 'has_salary': 'true'},
+    {'sort': 'date_posted'},
+    {'keyword': 'python'},
+])
+def test_cursor_walk_matches_offset_pagination(client, params):
+    ids, total = walk(client, params)
+    everything = client.get('/api/jobs', params={**params, 'limit': 500, 'fields': 'job_id'}).json()
+    assert len(ids) == total == everything['total']
+    assert ids == [job['job_id'] for job in everything['jobs']]
+
+
+def test_cursor_rejects_other_filters(client):
+    cursor = client.get('/api/jobs', params={'limit': 5}).json()['next_cursor']
+    response = client.get('/api/jobs', params={'limit': 5, 'country': 'us', 'cursor': cursor})
+    assert response.status_code == 400
+
+
+def test_cursor_rejects_garbage(client):
+    response = client.get('/api/jobs', params={'cursor': 'not-a-cursor!'})
+    assert response.status_code == 400
+
+
+def test_cursor_is_stale_after_reload(client, jobs_frame, monkeypatch):
+    cursor = client.get('/api/jobs', params={'limit': 5}).json()['next_cursor']
+
+    skills, df = SkillMatrix.from_dataframe(jobs_frame.copy())
+    monkeypatch.setattr(main.dataset, 'current', DatasetSnapshot(df, skills, uuid.uuid4().hex[:12], None))
+
+    response = client.get('/api/jobs', params={'limit': 5, 'cursor': cursor})
+    assert response.status_code == 410
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor('v1', 'q1', SORT_ROW, 20, 41)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 'v1', 'q1', SORT_ROW) == (20, 41)
+    with pytest.raises(StaleCursorError):
+        decode_cursor(cursor, 'v2', 'q1', SORT_ROW)
+    with pytest.raises(CursorError):
+        decode_cursor(cursor, 'v1', 'q1', SORT_RELEVANCE)
+
+
+def test_resume_offset_recovers_position():
+    ids = np.array([3, 8, 9, 15, 22])
+    # Gợi ý offset đúng -> dùng luôn
+    assert resume_offset(ids, 2, 8, SORT_ROW) == 2
+    # Danh sách đã đổi (gợi ý sai): thứ tự row id -> keyset theo row id cuối
+    assert resume_offset(ids, 2, 10, SORT_ROW) == 3
+    # Thứ tự khác (relevance / sort) -> tìm lại row id cuối
+    shuffled = np.array([22, 3, 15, 8, 9])
+    assert resume_offset(shuffled, 1, 15, SORT_RELEVANCE) == 3
+    with pytest.raises(CursorError):
+        resume_offset(shuffled, 1, 99, SORT_RELEVANCE)
@@ -0,0 +1,137 @@
+"""
+Test cache kết quả /api/jobs (api/query_cache.py): eviction theo byte, key của filter, version dataset
+"""
+
+import threading
+import uuid
+
+import numpy as np
+import pytest
+
+from api import main
+from api.dataset import DatasetSnapshot
+from api.pagination import query_key
+from api.query_cache import ENTRY_OVERHEAD, LRUCache, normalize_filters
+from api.skill_matrix import SkillMatrix
+
+from tests.conftest import make_jobs_frame
+
+# Mỗi entry: 100 int64 + overhead
+ENTRY_BYTES = 800 + ENTRY_OVERHEAD
+
+
+def array(value):
+    return np.full(100, value, dtype=np.int64)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = LRUCache('test', max_bytes=3 * ENTRY_BYTES)
+    for key in 'abc':
+        cache.put(key, array(ord(key)))
+    # Dùng lại 'a' -> 'b' thành entry lâu chưa dùng nhất
+    cache.get('a', pytest.fail)
+    cache.put('d', array(0))
+
+    assert set(cache._entries) == {'a', 'c', 'd'}
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] == 3 * ENTRY_BYTES <= stats['max_bytes']
+
+    # Entry lớn gấp đôi -> đẩy ra hai entry cũ nhất
+    cache.put('big', np.zeros(200, dtype=np.int64))
+    assert set(cache._entries) == {'d', 'big'}
+    assert cache.stats()['evictions'] == 3
+
+
+def test_entry_larger_than_cache_is_returned_not_stored():
+    cache = LRUCache('test', max_bytes=ENTRY_BYTES)
+    value = cache.get('huge', lambda: np.zeros(1000, dtype=np.int64))
+
+    assert len(value) == 1000
+    assert len(cache) == 0
+    assert cache.stats()['misses'] == 1
+
+
+def test_get_builds_once_and_freezes_arrays():
+    cache = LRUCache('test', max_bytes=10 * ENTRY_BYTES)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return array(7)
+
+    first = cache.get('key', build)
+    second = cache.get('key', build)
+
+    assert first is second and len(calls) == 1
+    assert not first.flags.writeable
+    assert cache.stats()['hit_rate'] == 0.5
+
+
+@pytest.mark.parametrize('left, right', [
+    ({'country': 'GB', 'keyword': 'Data  Engineer'}, {'keyword': ' data engineer ', 'country': 'gb'}),
+    ({'role': 'Data Engineer', 'category': None, 'region': ''}, {'role': 'data engineer'}),
+    ({'country': 'us', 'ranges': {'salary_min': (None, None), 'date_posted': (None, None)}}, {'country': 'us'}),
+    (
+        {'ranges': {'salary_min': (50_000, None), 'salary_max': (None, None)}, 'has_salary': True},
+        {'has_salary': True, 'ranges': {'salary_min': (50_000, None)}},
+    ),
+])
+def test_equivalent_filters_share_a_key(left, right):
+    assert normalize_filters(**left) == normalize_filters(**right)
+    assert query_key(**normalize_filters(**left)) == query_key(**normalize_filters(**right))
+
+
+@pytest.mark.parametrize('left, right', [
+    ({'country': 'gb'}, {'region': 'gb'}),
+    ({'keyword': 'data engineer'}, {'keyword': 'engineer data'}),
+    ({'has_salary': True}, {'has_salary': False}),
+    ({'ranges': {'salary_min': (50_000, None)}}, {'ranges': {'salary_min': (None, 50_000)}}),
+    ({'sort': 'salary_max'}, {'sort': '-salary_max'}),
+])
+def test_different_filters_have_different_keys(left, right):
+    assert query_key(**normalize_filters(**left)) != query_key(**normalize_filters(**right))
+
+
+def test_versions_do_not_collide(client, monkeypatch):
+    main.result_cache.clear()
+    main.page_cache.clear()
+    params = {'country': 'gb', 'limit': 500, 'fields': 'job_id,country'}
+    before = client.get('/api/jobs', params=params).json()
+    assert before['total'] > 0
+
+    # Dataset mới: cùng filter nhưng khác dữ liệu (không còn job GB)
+    df = make_jobs_frame(rows=60, seed=3)
+    df['country'] = 'US'
+    skills, rest = SkillMatrix.from_dataframe(df)
+    monkeypatch.setattr(main.dataset, 'current', DatasetSnapshot(rest, skills, uuid.uuid4().hex[:12], None))
+
+    after = client.get('/api/jobs', params=params).json()
+    assert after['total'] == 0 and after['jobs'] == []
+    assert client.get('/api/jobs', params={**params, 'country': 'us'}).json()['total'] == 60
+
+
+def test_concurrent_access_keeps_accounting_consistent():
+    cache = LRUCache('test', max_bytes=8 * ENTRY_BYTES)
+    calls_per_thread = 500
+    wrong = []
+
+    def worker(seed):
+        rng = np.random.default_rng(seed)
+        for key in rng.integers(0, 32, calls_per_thread):
+            value = cache.get(int(key), lambda: array(key))
+            if value[0] != key:
+                wrong.append(int(key))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert wrong == []
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == 8 * calls_per_thread
+    assert stats['bytes'] == sum(cache._sizes.values()) == len(cache) * ENTRY_BYTES
+    assert stats['bytes'] <= stats['max_bytes']
+    assert set(cache._sizes) == set(cache._entries)
@@ -0,0 +1,149 @@
+"""
+Test JobQueryEngine (api/query_engine.py): kết quả select() giống hệt mask boolean của pandas,
+sort / range của SortedIndex (thiếu giá trị ở cuối, hai đầu khoảng đều tính)
+"""
+
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.dataset import DatasetSnapshot, compact_frame
+from api.query_engine import CategoricalIndex, JobQueryEngine, SortedIndex
+from api.skill_matrix import SkillMatrix
+
+from tests.conftest import make_jobs_frame
+
+
+@pytest.fixture(scope='module')
+def frame():
+    df = make_jobs_frame(rows=300, seed=11)
+    # Giá trị thiếu và giá trị chỉ khác hoa/thường
+    df.loc[::17, 'region'] = None
+    df.loc[::5, 'country'] = df.loc[::5, 'country'].str.lower()
+    return compact_frame(df)
+
+
+@pytest.fixture(scope='module')
+def engine(frame):
+    return JobQueryEngine(frame)
+
+
+def lowered(series):
+    return series.astype(object).str.lower()
+
+
+def expected_ids(df, country=None, category=None, region=None, role=None, seniority=None,
+                 has_salary=None, ranges=None):
+    """Cùng filter viết bằng mask boolean trên DataFrame (cách làm trước khi có index)"""
+    mask = pd.Series(True, index=df.index)
+    for column, value in (('country', country), ('region', region), ('role', role), ('seniority', seniority)):
+        if value:
+            mask &= (lowered(df[column]) == value.lower()).fillna(False).astype(bool)
+    if category:
+        mask &= lowered(df['category']).str.contains(category.lower(), regex=False, na=False)
+    if has_salary is not None:
+        mask &= df['has_salary'] == has_salary
+    for column, (low, high) in (ranges or {}).items():
+        values = df[f'{column}_usd']
+        mask &= values.between(-np.inf if low is None else low, np.inf if high is None else high)
+    return np.flatnonzero(mask.to_numpy())
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'country': 'GB'},
+    {'country': 'gb', 'has_salary': True},
+    {'category': 'engineer', 'seniority': 'SENIOR'},
+    {'category': 'ENG', 'region': 'europe', 'has_salary': False},
+    {'role': 'data analyst', 'country': 'us', 'ranges': {'salary_min': (30_000, 90_000)}},
+    {'region': 'Americas', 'ranges': {'salary_max': (None, 60_000)}},
+    # Giá trị không tồn tại / tổ hợp rỗng
+    {'country': 'Atlantis'},
+    {'category': 'plumber', 'has_salary': True},
+    {'country': 'GB', 'region': 'Americas'},
+    {'seniority': 'Senior', 'ranges': {'salary_min': (10_000_000, None)}},
+])
+def test_select_matches_pandas_mask(engine, frame, filters):
+    ids = engine.select(**filters)
+    np.testing.assert_array_equal(ids, expected_ids(frame, **filters))
+
+
+def test_select_empty_result_is_empty_array(engine):
+    ids = engine.select(country='Atlantis', keyword='python', sort='-salary_max')
+    assert len(ids) == 0
+
+
+def test_categorical_index_missing_and_case(frame):
+    index = CategoricalIndex(frame['region'])
+
+    missing = np.flatnonzero(frame['region'].isna().to_numpy())
+    present = np.concatenate([index.equals('europe'), index.equals('AMERICAS')])
+    assert len(np.intersect1d(present, missing)) == 0
+    assert len(present) + len(missing) == len(frame)
+
+    # Hai cách viết của cùng một country gộp chung, row id tăng dần
+    gb = CategoricalIndex(frame['country']).equals('gb')
+    assert np.all(np.diff(gb) > 0)
+    np.testing.assert_array_equal(gb, np.flatnonzero((lowered(frame['country']) == 'gb').to_numpy()))
+
+    assert CategoricalIndex(frame['category']).contains('').tolist() == list(range(len(frame)))
+    assert len(index.contains('zzz')) == 0
+
+
+@pytest.mark.parametrize('values', [
+    [3.0, np.nan, 1.0, 3.0, np.nan, 2.0],
+    pd.to_datetime(['2024-03-03', None, '2024-03-01', '2024-03-03', None, '2024-03-02'], utc=True),
+])
+def test_sorted_index_puts_missing_last(values):
+    index = SortedIndex(pd.Series(values))
+
+    # Cùng giá trị giữ thứ tự row id, NaN / NaT luôn ở cuối (cả khi giảm dần)
+    assert index.sort(np.empty(0, dtype=np.int32)).tolist() == []
+    assert index.sort(np.arange(6, dtype=np.int32)).tolist() == [2, 5, 0, 3, 1, 4]
+    assert index.sort(np.arange(6, dtype=np.int32), descending=True).tolist() == [0, 3, 5, 2, 1, 4]
+    assert index.sort(np.array([1, 3, 4, 5], dtype=np.int32)).tolist() == [5, 3, 1, 4]
+    assert index.sort(np.array([1, 3, 4, 5], dtype=np.int32), descending=True).tolist() == [3, 5, 1, 4]
+
+
+def test_sorted_index_bounds_are_inclusive():
+    salaries = SortedIndex(pd.Series([50_000.0, np.nan, 60_000.0, 70_000.0, 60_000.0]))
+    assert salaries.between(60_000, 70_000).tolist() == [2, 3, 4]
+    assert salaries.between(60_000, 60_000).tolist() == [2, 4]
+    assert salaries.between(None, 50_000).tolist() == [0]
+    assert salaries.between(70_000.01, None).tolist() == []
+
+    dates = SortedIndex(pd.Series(pd.to_datetime(
+        ['2024-05-10 00:00:00', '2024-05-10 23:59:59.999999999', '2024-05-11 00:00:00', None], utc=True, format='ISO8601'
+    )))
+    assert dates.between(pd.Timestamp('2024-05-10', tz='UTC'), pd.Timestamp('2024-05-11', tz='UTC')).tolist() \
+        == [0, 1, 2]
+    # Timestamp không timezone được hiểu là UTC
+    assert dates.between(pd.Timestamp('2024-05-11'), None).tolist() == [2]
+
+
+def test_api_range_filters_are_inclusive(monkeypatch):
+    df = make_jobs_frame(rows=200, seed=5)
+    df.loc[0:9, 'date_posted'] = pd.Timestamp('2024-05-10 23:59:59.999999999', tz='UTC')
+    df.loc[10:19, 'date_posted'] = pd.Timestamp('2024-05-11 00:00', tz='UTC')
+    df.loc[20:29, 'date_posted'] = pd.Timestamp('2024-05-10 00:00', tz='UTC')
+    skills, rest = SkillMatrix.from_dataframe(df.copy())
+    monkeypatch.setattr(main.dataset, 'current', DatasetSnapshot(rest, skills, uuid.uuid4().hex[:12], None))
+    client = TestClient(main.app)
+
+    def job_ids(**params):
+        response = client.get('/api/jobs', params={**params, 'limit': 500, 'fields': 'job_id'}).json()
+        return sorted(job['job_id'] for job in response['jobs'])
+
+    low = float(df['salary_min_usd'].dropna().iloc[3])
+    high = float(df['salary_max_usd'].dropna().iloc[7])
+    expected = df[(df['salary_min_usd'] >= low) & (df['salary_max_usd'] <= high)]
+    assert job_ids(salary_from=low, salary_to=high) == sorted(expected['job_id'])
+    assert len(expected) > 0
+
+    day = df['date_posted'].dt.date == pd.Timestamp('2024-05-10').date()
+    assert job_ids(posted_from='2024-05-10', posted_to='2024-05-10') == sorted(df.loc[day, 'job_id'])
+    assert job_ids(posted_from='2024-05-11') == sorted(df.loc[df['date_posted'] >= '2024-05-11', 'job_id'])
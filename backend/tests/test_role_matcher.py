@@ -0,0 +1,61 @@
+"""
+Test RoleMatcher (etl/role_matcher.py): job title -> (role, seniority) theo role_taxonomy.json
+"""
+
+import pandas as pd
+import pytest
+
+from role_matcher import RoleMatcher
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return RoleMatcher.from_file()
+
+
+@pytest.mark.parametrize('title, expected', [
+    # Alias dài nhất thắng
+    ('Senior Machine Learning Engineer', ('Machine Learning Engineer', 'Senior')),
+    ('Jr. Frontend Developer', ('Frontend Developer', 'Junior')),
+    # Cấp bậc trong ngoặc vẫn được tính, phần ngoặc không thuộc role
+    ('Data Analyst (Senior)', ('Data Analyst', 'Senior')),
+    # Bậc số La Mã khi không có từ cấp bậc
+    ('Software Engineer II', ('Software Engineer', 'Mid')),
+    ('DATA ENGINEER', ('Data Engineer', 'Unspecified')),
+])
+def test_known_titles(matcher, title, expected):
+    assert matcher.match_title(title) == expected
+
+
+@pytest.mark.parametrize('title, expected', [
+    # Không khớp alias nào: bỏ cấp bậc, từ nhiễu, phần trong ngoặc
+    ('Senior Data Wrangler (Remote)', ('Data Wrangler', 'Senior')),
+    ('Chief Happiness Officer', ('Happiness Officer', 'Head')),
+    ('Hybrid contract Pastry chef', ('Pastry Chef', 'Unspecified')),
+    # Chỉ có cấp bậc / rỗng -> role mặc định
+    ('Senior', ('Other', 'Senior')),
+    ('', ('Other', 'Unspecified')),
+])
+def test_titles_without_alias(matcher, title, expected):
+    assert matcher.match_title(title) == expected
+
+
+@pytest.mark.parametrize('title, expected', [
+    # Nhiều từ cấp bậc -> lấy cấp cao nhất
+    ('Junior Senior Lead Data Engineer', ('Data Engineer', 'Lead')),
+    ('Intern / Senior Data Scientist', ('Data Scientist', 'Senior')),
+    # Từ cấp bậc được ưu tiên hơn bậc số
+    ('Data Engineer III Junior', ('Data Engineer', 'Junior')),
+])
+def test_several_seniority_words(matcher, title, expected):
+    assert matcher.match_title(title) == expected
+
+
+def test_normalize_column(matcher):
+    titles = pd.Series(['Senior Data Engineer', None, 'Senior Data Engineer', 'Pastry Chef'])
+
+    roles, seniority = matcher.normalize(titles)
+
+    assert roles.tolist() == ['Data Engineer', 'Other', 'Data Engineer', 'Pastry Chef']
+    assert seniority.tolist() == ['Senior', 'Unspecified', 'Senior', 'Unspecified']
+    assert matcher.normalize(pd.Series([], dtype=object))[0].tolist() == []
@@ -0,0 +1,78 @@
+"""
+Test salary cube (api/salary_stats.py): percentile khớp np.percentile trên lương USD
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.salary_stats import CUBE_DIMENSIONS, PERCENTILES, SalaryCube, sorted_percentiles
+
+
+def test_sorted_percentiles_match_numpy():
+    rng = np.random.default_rng(3)
+    sizes = [1, 2, 3, 10, 57]
+    codes = rng.permutation(np.repeat(np.arange(len(sizes)), sizes))
+    values = rng.lognormal(11, 0.5, len(codes))
+
+    result = sorted_percentiles(codes, values, PERCENTILES)
+
+    assert result.shape == (len(sizes), len(PERCENTILES))
+    for code in range(len(sizes)):
+        np.testing.assert_allclose(result[code], np.percentile(values[codes == code], PERCENTILES))
+
+
+def reference(jobs_frame, by):
+    """Percentile tính trực tiếp bằng pandas groupby trên trung bình min/max USD"""
+    salary = jobs_frame[['salary_min_usd', 'salary_max_usd']].mean(axis=1)
+    paid = jobs_frame[salary.notna()].assign(salary=salary.dropna())
+    groups = paid.groupby(by) if by else [((), paid)]
+    rows = {}
+    for key, rows_of_group in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        rows[key] = (len(rows_of_group), np.percentile(rows_of_group['salary'], PERCENTILES))
+    return rows
+
+
+@pytest.mark.parametrize('by', [[], ['country'], ['category', 'seniority'], ['country', 'role']])
+def test_cube_cells_match_groupby(jobs_frame, by):
+    cube = SalaryCube(jobs_frame)
+    result = cube.query(by=by)
+    expected = reference(jobs_frame, by)
+
+    assert result['currency'] == 'USD'
+    assert len(result['data']) == len(expected)
+    for cell in result['data']:
+        count, percentiles = expected[tuple(cell[dimension] for dimension in by)]
+        assert cell['count'] == count
+        np.testing.assert_allclose([cell[f'p{q}'] for q in PERCENTILES], percentiles, atol=0.01)
+
+
+def test_cube_filters_are_case_insensitive(jobs_frame):
+    cube = SalaryCube(jobs_frame)
+    lower = cube.query(by=['seniority'], country='gb')
+    upper = cube.query(by=['seniority'], country='GB')
+    assert lower['data'] == upper['data']
+    paid = jobs_frame[(jobs_frame['country'] == 'GB') & jobs_frame['salary_min_usd'].notna()]
+    assert sum(cell['count'] for cell in lower['data']) == len(paid)
+
+
+def test_cube_rejects_unknown_dimension(jobs_frame):
+    with pytest.raises(ValueError):
+        SalaryCube(jobs_frame).query(by=['company'])
+
+
+def test_cube_without_salaries_is_empty(jobs_frame):
+    jobs_frame[['salary_min_usd', 'salary_max_usd']] = np.nan
+    cube = SalaryCube(jobs_frame)
+    assert len(cube) == 0
+    assert cube.query(by=['country'])['data'] == []
+
+
+def test_salary_stats_endpoint(client, jobs_frame):
+    response = client.get('/api/salary-stats', params={'by': 'country', 'min_jobs': 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert set(CUBE_DIMENSIONS).issuperset(data['by'])
+    assert {cell['country'] for cell in data['data']} == set(jobs_frame['country'])
+    assert client.get('/api/salary-stats', params={'by': 'company'}).status_code == 400
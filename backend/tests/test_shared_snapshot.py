@@ -0,0 +1,169 @@
+"""
+Test bundle snapshot dùng chung (api/shared_snapshot.py): ghi -> memory-map -> giống hệt bản gốc
+"""
+
+import json
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import main
+from api.dataset import DatasetSnapshot
+from api.shared_snapshot import (
+    KEEP_BUNDLES,
+    POINTER_NAME,
+    SharedDatasetStore,
+    current_bundle,
+    publish,
+    read_bundle,
+    write_bundle
+)
+from api.skill_matrix import SkillMatrix
+from api.trends import TrendStore
+
+from tests.conftest import make_jobs_frame
+from tests.test_trends import ROLLUPS
+
+
+@pytest.fixture
+def trend_snapshot(jobs_frame):
+    skills, df = SkillMatrix.from_dataframe(jobs_frame.copy())
+    return DatasetSnapshot(df, skills, uuid.uuid4().hex[:12], None, TrendStore(ROLLUPS))
+
+
+def new_snapshot(jobs_frame):
+    skills, df = SkillMatrix.from_dataframe(jobs_frame.copy())
+    return DatasetSnapshot(df, skills, uuid.uuid4().hex[:12], None)
+
+
+def test_bundle_roundtrip(trend_snapshot, tmp_path):
+    bundle = write_bundle(trend_snapshot, tmp_path / 'snapshot.bin')
+    shared = read_bundle(bundle)
+
+    assert shared.bundle == bundle
+    assert shared.version == trend_snapshot.version
+    pd.testing.assert_frame_equal(shared.df, trend_snapshot.df)
+    assert shared.df['date_posted'].dtype == trend_snapshot.df['date_posted'].dtype
+    np.testing.assert_array_equal(shared.skills.bits, trend_snapshot.skills.bits)
+    assert shared.skills.names == trend_snapshot.skills.names
+    text = shared.texts['job_description']
+    assert [text.get(i) for i in range(len(text))] == \
+        [trend_snapshot.texts['job_description'].get(i) for i in range(len(text))]
+    pd.testing.assert_frame_equal(shared.salary_cube.cells, trend_snapshot.salary_cube.cells)
+    assert shared.trends.query(bucket='day') == trend_snapshot.trends.query(bucket='day')
+
+
+def test_bundle_arrays_are_read_only_views(trend_snapshot, tmp_path):
+    shared = read_bundle(write_bundle(trend_snapshot, tmp_path / 'snapshot.bin'))
+    salaries = shared.df['salary_min_usd'].to_numpy()
+    assert not salaries.flags.writeable
+    assert not shared.skills.bits.flags.writeable
+    with pytest.raises(ValueError):
+        shared.skills.bits[0, 0] = 1
+
+
+def test_strings_stay_out_of_band(tmp_path):
+    """Mỗi dòng một title / company / city / token riêng: chuỗi nằm trong buffer của bundle, không trong pickle"""
+    pytest.importorskip('pyarrow')
+    frame = make_jobs_frame(rows=2000)
+    frame['job_title'] = [f'Title {i} engineer' for i in range(len(frame))]
+    frame['role'] = frame['job_title']
+    frame['company'] = [f'Company {i}' for i in range(len(frame))]
+    frame['city'] = [f'City {i}' for i in range(len(frame))]
+    frame['job_description'] = [f'word{i} python' for i in range(len(frame))]
+    snapshot = new_snapshot(frame)
+
+    bundle = write_bundle(snapshot, tmp_path / 'snapshot.bin')
+    data = bundle.read_bytes()
+    footer_length = int.from_bytes(data[-16:-8], 'little')
+    footer = json.loads(data[-16 - footer_length:-16])
+    in_band = footer['pickle'][1]
+    out_of_band = sum(length for _, length in footer['buffers'])
+    # Chỉ còn cấu trúc object: không tăng theo số giá trị phân biệt
+    assert in_band < 0.02 * out_of_band
+
+    shared = read_bundle(bundle)
+    assert not shared.query_engine.text_index.vocab.data.flags.writeable
+    assert not shared.query_engine.indexes['role'].keys.data.flags.writeable
+    assert shared.query_engine.select(role='title 7 engineer').tolist() == [7]
+    assert shared.query_engine.select(keyword='word1999').tolist() == [1999]
+
+    row = int(np.flatnonzero(frame['has_salary'])[0])
+    cells = shared.salary_cube.query(role=f'TITLE {row} ENGINEER')['data']
+    assert [cell['role'] for cell in cells] == [f'Title {row} engineer']
+
+
+def test_query_engine_survives_roundtrip(trend_snapshot, tmp_path):
+    shared = read_bundle(write_bundle(trend_snapshot, tmp_path / 'snapshot.bin'))
+    queries = [
+        {},
+        {'country': 'gb', 'has_salary': True},
+        {'keyword': 'python sql', 'sort': '-salary_max'},
+        {'ranges': {'salary_min': (50_000, None)}, 'sort': 'date_posted'},
+    ]
+    for query in queries:
+        np.testing.assert_array_equal(
+            shared.query_engine.select(**query), trend_snapshot.query_engine.select(**query)
+        )
+
+
+def test_read_bundle_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-bundle.bin'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        read_bundle(path)
+
+
+def test_publish_moves_pointer_and_prunes(jobs_frame, tmp_path):
+    assert current_bundle(tmp_path) is None
+
+    bundles = [publish(new_snapshot(jobs_frame), tmp_path) for _ in range(KEEP_BUNDLES + 2)]
+
+    assert current_bundle(tmp_path) == bundles[-1]
+    assert (tmp_path / POINTER_NAME).read_text(encoding='utf-8') == bundles[-1].name
+    remaining = sorted(path for path in tmp_path.glob('snapshot-*.bin'))
+    assert remaining == sorted(bundles[-KEEP_BUNDLES:])
+
+
+def test_shared_store_follows_pointer(jobs_frame, tmp_path):
+    store = SharedDatasetStore(tmp_path, interval=0)
+    assert not store.reload_if_changed()
+    assert store.current is None
+
+    first = publish(new_snapshot(jobs_frame), tmp_path)
+    assert store.reload_if_changed()
+    assert store.current.bundle == first
+    assert not store.reload_if_changed()
+
+    second = publish(new_snapshot(jobs_frame), tmp_path)
+    assert store.reload_if_changed()
+    assert store.current.bundle == second
+
+
+def test_api_responses_match_plain_snapshot(client, snapshot, tmp_path, monkeypatch):
+    requests = [
+        ('/api/jobs', {'limit': 50, 'sort': '-salary_max', 'fields': 'job_id,job_title,salary_max,skills'}),
+        ('/api/jobs', {'keyword': 'python', 'country': 'de'}),
+        ('/api/facets', {'by': 'category,skill'}),
+        ('/api/salary-stats', {'by': 'country,seniority'}),
+        ('/api/top-skills', {}),
+    ]
+
+    def responses():
+        # next_cursor chứa version dataset -> khác nhau theo thiết kế
+        return [
+            {key: value for key, value in client.get(path, params=params).json().items() if key != 'next_cursor'}
+            for path, params in requests
+        ]
+
+    plain = responses()
+
+    attached = read_bundle(write_bundle(snapshot, tmp_path / 'snapshot.bin'))
+    # Version khác -> cache kết quả / aggregate theo version không trả lại response của bản gốc
+    attached.version = uuid.uuid4().hex[:12]
+    monkeypatch.setattr(main.dataset, 'current', attached)
+    shared = responses()
+
+    assert shared == plain
@@ -0,0 +1,64 @@
+"""
+Test SkillMatcher (etl/skill_matcher.py) với skills_taxonomy.json: alias ngắn không gây false positive
+"""
+
+import json
+import re
+
+import pandas as pd
+import pytest
+
+from skill_matcher import TAXONOMY_FILE, TOKEN_PATTERN, SkillMatcher
+
+# Alias một từ <= 3 ký tự được phép: token kỹ thuật không trùng từ thường / mã phổ biến
+SHORT_ALIASES = {
+    'sql', 'aws', 'php', 'git', 'gcp', 'css', 'nlp', 'llm', 'tdd', 'sas', 'sap', 'vue', 'ios',
+    'c++', 'c#', 'cpp', 'vba', 'jvm', 'es6', 'k8s', 'etl',
+}
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return SkillMatcher.from_file()
+
+
+def skills_of(matcher, text):
+    label = matcher.labels(matcher.match(pd.Series([text])))[0]
+    return label.split('|') if label else []
+
+
+def test_short_aliases_are_allow_listed():
+    with open(TAXONOMY_FILE, 'r', encoding='utf-8') as f:
+        skills = json.load(f)['skills']
+    short = {
+        alias.lower()
+        for skill in skills
+        for alias in skill['aliases']
+        if len(alias) <= 3 and len(re.findall(TOKEN_PATTERN, alias.lower())) == 1
+    }
+    assert short <= SHORT_ALIASES
+
+
+@pytest.mark.parametrize('text', [
+    'Office based in London EC2, full Ts & Cs apply.',
+    'ELT teacher needed; DBT therapist experience welcome.',
+    'Salary band S3, ML of water per test, DAX index reporting.',
+    'Visit the elk sanctuary. SOA statements sent monthly. IAC membership.',
+])
+def test_ambiguous_short_words_do_not_match(matcher, text):
+    assert skills_of(matcher, text) == []
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Storage on AWS S3 and Amazon EC2', ['AWS']),
+    ('Terraform (infrastructure as code)', ['Terraform']),
+    ('Build ELT pipelines with dbt Core', ['dbt', 'ETL']),
+    ('Power BI with DAX measures', ['Power BI']),
+    ('Deploy ML models to production', ['Machine Learning']),
+    ('Strong TypeScript and vanilla JS', ['JavaScript', 'TypeScript']),
+    ('Logs in the ELK stack', ['Elasticsearch']),
+    ('SQL, C# and k8s', ['SQL', 'C#', 'Kubernetes']),
+])
+def test_context_aliases_still_match(matcher, text, expected):
+    names = matcher.names
+    assert skills_of(matcher, text) == sorted(expected, key=names.index)
@@ -0,0 +1,31 @@
+"""
+Test SkillMatrix.from_dataframe (CSV): thứ tự skill giống file Arrow (theo taxonomy)
+"""
+
+import json
+
+import pandas as pd
+
+from api.skill_matrix import SkillMatrix, taxonomy_names
+
+
+def test_csv_columns_follow_taxonomy_order(tmp_path):
+    taxonomy = tmp_path / 'skills_taxonomy.json'
+    taxonomy.write_text(json.dumps({'skills': [
+        {'name': 'SQL'}, {'name': 'Python'}, {'name': 'AWS'},
+    ]}), encoding='utf-8')
+    df = pd.DataFrame({'job_id': ['1', '2', '3'], 'skills': ['Python|SQL', 'Legacy', None]})
+
+    skills, rest = SkillMatrix.from_dataframe(df, taxonomy)
+
+    # Skill không còn trong taxonomy đứng cuối; skill chưa xuất hiện vẫn có cột
+    assert skills.names == ['SQL', 'Python', 'AWS', 'Legacy']
+    assert skills.labels([0, 1, 2]) == [['SQL', 'Python'], ['Legacy'], []]
+    assert skills.counts().tolist() == [1, 1, 0, 1]
+    assert 'skills' not in rest.columns
+
+
+def test_default_taxonomy_matches_etl():
+    names = taxonomy_names()
+    assert names[:2] == ['Python', 'SQL']
+    assert len(names) == len(set(names))
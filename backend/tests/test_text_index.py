@@ -0,0 +1,92 @@
+"""
+Test InvertedIndex (api/text_index.py): so với filter cũ df['job_title'].str.contains(keyword, case=False)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.text_index import InvertedIndex, tokenize
+
+TITLES = [
+    'Senior Data Engineer',
+    'Data Analyst - SQL / Python',
+    'Database Administrator',
+    'C++ Developer (Remote)',
+    'C# .NET Developer',
+    'Python Developer, Django',
+    'Big-Data Engineer',
+    'Machine Learning Engineer',
+    'Café Manager',
+    None,
+    'DATA SCIENTIST',
+    'Engineering Manager',
+]
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return pd.DataFrame({'job_title': TITLES}, index=range(100, 100 + len(TITLES)))
+
+
+@pytest.fixture(scope='module')
+def index(frame):
+    return InvertedIndex(frame, fields={'job_title': 1.0})
+
+
+def contains(frame, keyword):
+    """Filter cũ (keyword là chuỗi thường, không phải regex) -> vị trí dòng"""
+    matched = frame['job_title'].str.contains(keyword, case=False, regex=False, na=False)
+    return np.flatnonzero(matched.to_numpy())
+
+
+def search(index, keyword, prefix=True):
+    ids, _ = index.search(keyword, prefix=prefix)
+    return ids.tolist()
+
+
+@pytest.mark.parametrize('keyword', [
+    'data', 'DATA', 'Data', 'eng', 'engineer', 'python', 'developer', 'manager', 'c++', 'c#', 'sql',
+])
+def test_single_token_matches_str_contains(index, frame, keyword):
+    # Mọi lần xuất hiện của các keyword này đều ở đầu một từ -> hai cách cho cùng kết quả
+    assert search(index, keyword) == contains(frame, keyword).tolist()
+
+
+@pytest.mark.parametrize('keyword', ['data engineer', 'Python  developer', 'engineer DATA', 'sql, python'])
+def test_multi_token_is_and_of_tokens(index, frame, keyword):
+    expected = None
+    for token in tokenize(keyword):
+        ids = set(contains(frame, token).tolist())
+        expected = ids if expected is None else expected & ids
+    result = search(index, keyword)
+
+    assert result == sorted(expected)
+    # Cụm liền nhau mà filter cũ tìm được vẫn có trong kết quả
+    phrase = ' '.join(keyword.split())
+    assert set(contains(frame, phrase).tolist()) <= set(result)
+
+
+def test_punctuation(index, frame):
+    # '-', '/', ',' , '.' tách token; '+' / '#' là một phần của token
+    assert search(index, 'big-data') == search(index, 'big data') == contains(frame, 'big-data').tolist()
+    assert search(index, '.net') == contains(frame, '.net').tolist()
+    assert search(index, 'c++') != search(index, 'c#')
+    # Query chỉ có ký tự đặc biệt -> không có token (caller bỏ qua filter)
+    assert index.search('!!! ---') == (None, None)
+
+
+def test_prefix_without_match(index, frame):
+    assert search(index, 'zzz') == [] == contains(frame, 'zzz').tolist()
+    assert search(index, 'data zzz') == []
+    # Prefix lớn hơn mọi token trong vocab
+    assert search(index, 'ω') == []
+
+
+def test_exact_mode_and_intended_differences(index, frame):
+    # Tắt prefix: 'data' không khớp 'database'
+    assert search(index, 'data', prefix=False) == [0, 1, 6, 10]
+    assert 2 in search(index, 'data')
+    # Khác filter cũ có chủ đích: không khớp giữa từ, nhưng bỏ dấu khi so khớp
+    assert contains(frame, 'ngineer').tolist() and search(index, 'ngineer') == []
+    assert search(index, 'cafe') == [8] and contains(frame, 'cafe').tolist() == []
@@ -0,0 +1,155 @@
+"""
+Test transform incremental (etl/transform_jobs.py + shard_cache.py):
+kết quả theo shard + cache phải giống hệt transform tuần tự toàn bộ
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import shard_cache
+import transform_jobs
+from raw_store import RawJobWriter, shard_path
+
+COUNTRY_CODES = ['sg', 'gb', 'de']
+KEYWORDS = ['Data Analyst', 'Data Engineer', 'Software Engineer']
+WORDS = 'python sql aws excel spark kafka docker react cloud agile team english'.split()
+
+
+def make_jobs(country_code, start, count, seed):
+    rng = np.random.default_rng(seed)
+    jobs = []
+    for i in range(start, start + count):
+        keyword = KEYWORDS[i % len(KEYWORDS)]
+        job = {
+            'id': f'{country_code}-{i}',
+            'title': f"{rng.choice(['Senior ', 'Junior ', ''])}{keyword}",
+            # Công ty lặp lại -> có job trùng (job_title, company) trong và giữa các shard
+            'company': {'display_name': f'Company {rng.integers(0, 15)}'},
+            'location': {'display_name': f'City {rng.integers(0, 4)}'},
+            'description': '<p>' + ' '.join(rng.choice(WORDS, 40)) + '</p>',
+            'created': f'2024-0{rng.integers(1, 10)}-{rng.integers(10, 29)}T10:00:00Z',
+            '_category': keyword,
+        }
+        if rng.random() < 0.5:
+            job['salary_min'] = float(rng.integers(30, 90) * 1000)
+            job['salary_max'] = job['salary_min'] + 10_000
+        jobs.append(job)
+    return jobs
+
+
+def write_shard(raw_dir, country_code, jobs, append=False):
+    writer = RawJobWriter(shard_path(raw_dir, country_code, 'none'), append=append)
+    writer.write(jobs)
+    writer.commit()
+
+
+@pytest.fixture
+def raw_dir(tmp_path, monkeypatch):
+    raw_dir = tmp_path / 'raw_jobs'
+    raw_dir.mkdir()
+    for seed, country_code in enumerate(COUNTRY_CODES):
+        write_shard(raw_dir, country_code, make_jobs(country_code, 0, 60, seed))
+    monkeypatch.setattr(transform_jobs, 'RAW_DATA_DIR', raw_dir)
+    monkeypatch.setattr(transform_jobs, 'CACHE_DIR', tmp_path / 'transform_cache')
+    return raw_dir
+
+
+@pytest.fixture
+def transformed(monkeypatch):
+    """Ghi lại các shard thực sự được transform (không lấy từ cache)"""
+    names = []
+    transform_shard = transform_jobs.transform_shard
+
+    def tracking(raw_file, chunk_size):
+        names.append(raw_file.name)
+        return transform_shard(raw_file, chunk_size)
+
+    monkeypatch.setattr(transform_jobs, 'transform_shard', tracking)
+    return names
+
+
+def full():
+    raw_files = transform_jobs.list_raw_files()
+    df = transform_jobs.build_dataframe(raw_files)
+    return transform_jobs.analyze_skills(transform_jobs.clean_data(df))
+
+
+def incremental(workers=1):
+    raw_files = transform_jobs.list_raw_files()
+    return transform_jobs.transform_sharded(raw_files, workers, transform_jobs.open_shard_cache())
+
+
+def assert_same(df, expected):
+    assert df.columns.tolist() == expected.columns.tolist()
+    assert df.equals(expected)
+
+
+def test_cold_and_warm_cache_match_full(raw_dir, transformed):
+    expected = full()
+    assert_same(incremental(), expected)
+    assert sorted(transformed) == sorted(path.name for path in raw_dir.iterdir())
+
+    transformed.clear()
+    assert_same(incremental(), expected)
+    assert transformed == []
+
+
+def test_touched_shard_uses_cache(raw_dir, transformed):
+    incremental()
+    shard = shard_path(raw_dir, 'gb', 'none')
+    os.utime(shard, (shard.stat().st_atime + 100, shard.stat().st_mtime + 100))
+
+    transformed.clear()
+    assert_same(incremental(), full())
+    assert transformed == []
+
+
+def test_touched_shard_is_not_rehashed_again(raw_dir, monkeypatch):
+    incremental()
+    shard = shard_path(raw_dir, 'gb', 'none')
+    os.utime(shard, (shard.stat().st_atime + 100, shard.stat().st_mtime + 100))
+
+    hashed = []
+    file_digest = shard_cache.file_digest
+
+    def tracking(path):
+        hashed.append(path.name)
+        return file_digest(path)
+
+    monkeypatch.setattr(shard_cache, 'file_digest', tracking)
+
+    incremental()
+    assert hashed == [shard.name]
+    manifest = json.loads((transform_jobs.CACHE_DIR / shard_cache.MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert manifest['shards'][shard.name]['stat'] == [shard.stat().st_size, shard.stat().st_mtime_ns]
+
+    hashed.clear()
+    incremental()
+    assert hashed == []
+
+
+def test_appended_shard_is_retransformed(raw_dir, transformed):
+    incremental()
+    write_shard(raw_dir, 'de', make_jobs('de', 60, 30, seed=42), append=True)
+
+    transformed.clear()
+    assert_same(incremental(), full())
+    assert transformed == [shard_path(raw_dir, 'de', 'none').name]
+
+
+def test_removed_shard_is_pruned(raw_dir):
+    incremental()
+    shard_path(raw_dir, 'sg', 'none').unlink()
+
+    df = incremental()
+    assert_same(df, full())
+    assert 'SG' not in set(df['country'])
+    cache_files = {path.name for path in transform_jobs.CACHE_DIR.iterdir()}
+    assert not any(name.startswith('sg.') for name in cache_files)
+
+
+def test_parallel_workers_match_full(raw_dir):
+    assert_same(incremental(workers=2), full())
@@ -0,0 +1,59 @@
+"""
+Test TrendStore (api/trends.py): histogram lương lưu thưa theo currency
+"""
+
+import numpy as np
+
+from api.trends import TrendStore
+
+
+def make_rollup(crawl_date, country, days, bins=10):
+    return {
+        'version': 1,
+        'crawl_date': crawl_date,
+        'country': country,
+        'salary_bins': {'min': 1_000, 'max': 1_000_000, 'count': bins},
+        'days': [
+            {'date': date, 'jobs': jobs, 'skills': {'SQL': jobs}, 'salary_hist': hist,
+             'salary_jobs': sum(sum(counts.values()) for counts in hist.values())}
+            for date, jobs, hist in days
+        ],
+    }
+
+
+ROLLUPS = [
+    make_rollup('2024-06-02', 'gb', [
+        ('2024-06-03', 4, {'GBP': {'2': 1, '5': 3}}),
+        ('2024-06-10', 2, {'GBP': {'6': 2}}),
+    ]),
+    make_rollup('2024-06-02', 'us', [
+        ('2024-06-03', 3, {'USD': {'7': 3}}),
+    ]),
+]
+
+
+def test_salary_hist_is_sparse():
+    store = TrendStore(ROLLUPS)
+    # Chỉ lưu các ô khác 0: (dòng daily, bin, số jobs)
+    assert store.salary_hist['GBP'].shape == (3, 3)
+    assert store.salary_hist['USD'].shape == (1, 3)
+    assert store.salary_hist['GBP'][:, 2].sum() == 6
+
+
+def test_query_medians_per_currency():
+    store = TrendStore(ROLLUPS)
+    result = store.query(bucket='month')
+    assert [period['jobs'] for period in result['data']] == [9]
+    medians = result['data'][0]['median_salary']
+    assert set(medians) == {'GBP', 'USD'}
+
+    # Median từ histogram thưa khớp với histogram đầy đủ
+    dense = np.zeros(store.num_bins, dtype=np.int64)
+    dense[[2, 5, 6]] = [1, 3, 2]
+    assert medians['GBP'] == round(store.median(dense))
+
+
+def test_query_country_filter_drops_other_currencies():
+    result = TrendStore(ROLLUPS).query(country='gb', bucket='week')
+    assert [period['jobs'] for period in result['data']] == [4, 2]
+    assert all(set(period['median_salary']) == {'GBP'} for period in result['data'])
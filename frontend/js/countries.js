@@ -196,21 +196,19 @@ async function loadRegionalStats() {
  * Load top companies grouped by country
  */
 async function loadTopCompaniesByCountry() {
-    // Fetch jobs and group by country and company
-    const jobsData = await fetchJobs({ limit: 500 });
+    // Top 3 công ty của mỗi quốc gia (đếm trên toàn bộ dataset ở server)
+    const facets = await fetchFacets('country,company', { top: 3 });
 
-    if (!jobsData || !jobsData.jobs) return;
+    if (!facets || !facets.data) return;
 
     const companiesByCountry = {};
 
-    jobsData.jobs.forEach(job => {
-        const country = job.country.toUpperCase();
+    facets.data.forEach(item => {
+        const country = item.country.toUpperCase();
         if (!companiesByCountry[country]) {
-            companiesByCountry[country] = {};
+            companiesByCountry[country] = [];
         }
-
-        const company = job.company || 'Unknown';
-        companiesByCountry[country][company] = (companiesByCountry[country][company] || 0) + 1;
+        companiesByCountry[country].push([item.company, item.count]);
     });
 
     const topCompaniesEl = document.getElementById('top-companies');
@@ -218,12 +216,8 @@ async function loadTopCompaniesByCountry() {
     let html = '';
     Object.keys(companiesByCountry).forEach(countryCode => {
         const info = COUNTRIES[countryCode];
-        const companies = companiesByCountry[countryCode];
-
-        // Get top 3 companies
-        const topCompanies = Object.entries(companies)
-            .sort((a, b) => b[1] - a[1])
-            .slice(0, 3);
+        // Đã sort giảm dần theo số jobs, tối đa 3 công ty
+        const topCompanies = companiesByCountry[countryCode];
 
         if (topCompanies.length > 0) {
             html += `
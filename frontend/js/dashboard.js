@@ -231,19 +231,13 @@ async function loadCountryChart() {
  * Load và vẽ Jobs by Category chart
  */
 async function loadCategoryChart(filters = null) {
-    // Fetch jobs data and group by category
-    const jobsData = await fetchJobs({ limit: 500 });
+    // Đếm jobs theo category trên toàn bộ dataset (server-side)
+    const facets = await fetchFacets('category');
 
-    if (!jobsData || !jobsData.jobs) return;
+    if (!facets || !facets.data) return;
 
-    const categoryCount = {};
-    jobsData.jobs.forEach(job => {
-        const category = job.category || 'Unknown';
-        categoryCount[category] = (categoryCount[category] || 0) + 1;
-    });
-
-    const labels = Object.keys(categoryCount);
-    const values = Object.values(categoryCount);
+    const labels = facets.data.map(item => item.category);
+    const values = facets.data.map(item => item.count);
 
     const ctx = document.getElementById('chart-category');
 
@@ -381,9 +375,7 @@ async function loadJobsTable(filters = null, page = 1) {
     }
 
     tbody.innerHTML = jobsData.jobs.map(job => {
-        const salary = job.salary_min && job.salary_max
-            ? `$${formatNumber(job.salary_min)} - $${formatNumber(job.salary_max)}`
-            : 'N/A';
+        const salary = formatSalaryRange(job, 'N/A');
 
         const countryInfo = COUNTRIES[job.country.toUpperCase()];
         const countryDisplay = countryInfo
@@ -402,7 +394,7 @@ async function loadJobsTable(filters = null, page = 1) {
                 <td>${countryDisplay}</td>
                 <td class="salary-cell">${salary}</td>
                 <td>
-                    <button class="btn btn-small" onclick='showJobModal(${JSON.stringify(job)})'>
+                    <button class="btn btn-small" onclick="showJobModal('${job.job_id}')">
                         👁️ Xem
                     </button>
                 </td>
@@ -512,15 +504,16 @@ async function loadSummary(filters = null) {
 }
 
 /**
- * Show job modal với chi tiết
+ * Show job modal với chi tiết (mô tả chỉ có ở /api/jobs/{job_id})
  */
-function showJobModal(job) {
+async function showJobModal(jobId) {
     const modal = document.getElementById('job-modal');
     const modalBody = document.getElementById('modal-body');
 
-    const salary = job.salary_min && job.salary_max
-        ? `$${formatNumber(job.salary_min)} - $${formatNumber(job.salary_max)}`
-        : 'Không công khai';
+    const job = await fetchJobDetail(jobId);
+    if (!job) return;
+
+    const salary = formatSalaryRange(job);
 
     const countryInfo = COUNTRIES[job.country.toUpperCase()];
     const countryDisplay = countryInfo
@@ -594,7 +587,7 @@ async function exportTableData() {
  * Convert jobs to CSV
  */
 function convertToCSV(jobs) {
-    const headers = ['Job Title', 'Category', 'Company', 'Country', 'City', 'Salary Min', 'Salary Max'];
+    const headers = ['Job Title', 'Category', 'Company', 'Country', 'City', 'Salary Min', 'Salary Max', 'Currency'];
     const rows = jobs.map(job => [
         job.job_title,
         job.category,
@@ -602,7 +595,8 @@ function convertToCSV(jobs) {
         job.country,
         job.city,
         job.salary_min || '',
-        job.salary_max || ''
+        job.salary_max || '',
+        job.salary_currency || ''
     ]);
 
     return [
@@ -17,6 +17,8 @@ let currentPage = 1;
 const ITEMS_PER_PAGE = 10;
 let totalJobs = 0;
 let currentFilters = {};
+// next_cursor của từng trang (đi tiếp trang sau không phải filter lại ở server)
+let pageCursors = {};
 
 // Debounce timer
 let filterTimer;
@@ -34,16 +36,23 @@ async function loadJobs(page = 1) {
 
   // Build params from filters
   const params = {
-    skip,
     limit: ITEMS_PER_PAGE
   };
 
   if (currentFilters.keyword) params.keyword = currentFilters.keyword;
   if (currentFilters.category) params.category = currentFilters.category;
   if (currentFilters.country) params.country = currentFilters.country;
+  if (currentFilters.has_salary) params.has_salary = true;
 
-  // Fetch from backend
-  const data = await fetchJobs(params);
+  // Trang đã biết cursor (bấm "Sau") -> dùng cursor, còn lại nhảy trang bằng skip
+  const cursor = pageCursors[page];
+  let data = await fetchJobs(cursor ? { ...params, cursor } : { ...params, skip });
+
+  if (!data && cursor) {
+    // Cursor hết hạn (dataset vừa được cập nhật) -> bỏ cursor cũ, tải lại bằng skip
+    pageCursors = {};
+    data = await fetchJobs({ ...params, skip });
+  }
 
   if (!data || !data.jobs) {
     showError('Không thể tải dữ liệu việc làm');
@@ -51,16 +60,11 @@ async function loadJobs(page = 1) {
   }
 
   totalJobs = data.total;
+  if (data.next_cursor) pageCursors[page + 1] = data.next_cursor;
 
-  // Filter has_salary on frontend (backend doesn't support this yet)
-  let jobs = data.jobs;
-  if (currentFilters.has_salary) {
-    jobs = jobs.filter(job => job.salary_min || job.salary_max);
-  }
-
-  renderJobs(jobs);
+  renderJobs(data.jobs);
   renderPagination();
-  updateResultsCount(currentFilters.has_salary ? jobs.length : totalJobs);
+  updateResultsCount(totalJobs);
 }
 
 /**
@@ -84,6 +88,7 @@ function applyFilters() {
     has_salary: document.getElementById('filter-has-salary').checked
   };
 
+  pageCursors = {};
   currentPage = 1;
   loadJobs(1);
 }
@@ -98,6 +103,7 @@ function clearAllFilters() {
   document.getElementById('filter-has-salary').checked = false;
 
   currentFilters = {};
+  pageCursors = {};
   loadJobs(1);
 }
 
@@ -121,11 +127,7 @@ function renderJobs(jobs) {
   }
 
   tbody.innerHTML = jobs.map(job => {
-    const salary = job.salary_min && job.salary_max
-      ? `$${formatNumber(job.salary_min)} - $${formatNumber(job.salary_max)}`
-      : job.salary_min
-        ? `$${formatNumber(job.salary_min)}+`
-        : 'Không công khai';
+    const salary = formatSalaryRange(job);
 
     const countryInfo = COUNTRIES[job.country.toUpperCase()];
     const countryDisplay = countryInfo
@@ -135,9 +137,6 @@ function renderJobs(jobs) {
     // Infer category from job title if not available
     const category = job.category || inferCategoryFromTitle(job.job_title) || 'IT General';
 
-    // Escape quotes for JSON
-    const jobJson = JSON.stringify(job).replace(/"/g, '&quot;');
-
     return `
             <tr class="table-row-hover">
                 <td class="job-title-cell">
@@ -150,7 +149,7 @@ function renderJobs(jobs) {
                 <td>${countryDisplay}</td>
                 <td class="salary-cell">${salary}</td>
                 <td>
-                    <button class="btn btn-small" onclick='showJobDetail(${jobJson})'>
+                    <button class="btn btn-small" onclick="showJobDetail('${job.job_id}')">
                         👁️ Xem
                     </button>
                 </td>
@@ -251,17 +250,16 @@ function updateResultsCount(count) {
 }
 
 /**
- * Show job detail modal
+ * Show job detail modal (mô tả chỉ có ở /api/jobs/{job_id})
  */
-function showJobDetail(job) {
+async function showJobDetail(jobId) {
   const modal = document.getElementById('job-modal');
   const modalBody = document.getElementById('modal-body');
 
-  const salary = job.salary_min && job.salary_max
-    ? `$${formatNumber(job.salary_min)} - $${formatNumber(job.salary_max)}`
-    : job.salary_min
-      ? `$${formatNumber(job.salary_min)}+`
-      : 'Không công khai';
+  const job = await fetchJobDetail(jobId);
+  if (!job) return;
+
+  const salary = formatSalaryRange(job);
 
   const countryInfo = COUNTRIES[job.country.toUpperCase()];
   const countryDisplay = countryInfo
@@ -312,6 +310,7 @@ async function exportJobs() {
   if (currentFilters.keyword) params.keyword = currentFilters.keyword;
   if (currentFilters.category) params.category = currentFilters.category;
   if (currentFilters.country) params.country = currentFilters.country;
+  if (currentFilters.has_salary) params.has_salary = true;
 
   const data = await fetchJobs(params);
 
@@ -322,10 +321,7 @@ async function exportJobs() {
     return;
   }
 
-  let jobs = data.jobs;
-  if (currentFilters.has_salary) {
-    jobs = jobs.filter(job => job.salary_min || job.salary_max);
-  }
+  const jobs = data.jobs;
 
   const csv = convertJobsToCSV(jobs);
   const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' });
@@ -342,7 +338,7 @@ async function exportJobs() {
  * Convert jobs array to CSV
  */
 function convertJobsToCSV(jobs) {
-  const headers = ['Chức danh', 'Danh mục', 'Công ty', 'Quốc gia', 'Thành phố', 'Lương tối thiểu', 'Lương tối đa', 'Ngày đăng'];
+  const headers = ['Chức danh', 'Danh mục', 'Công ty', 'Quốc gia', 'Thành phố', 'Lương tối thiểu', 'Lương tối đa', 'Tiền tệ', 'Ngày đăng'];
 
   const rows = jobs.map(job => [
     job.job_title || '',
@@ -352,6 +348,7 @@ function convertJobsToCSV(jobs) {
     job.city || '',
     job.salary_min || '',
     job.salary_max || '',
+    job.salary_currency || '',
     job.date_posted || ''
   ]);
 
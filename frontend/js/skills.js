@@ -152,35 +152,17 @@ async function loadSkillsChart() {
  * Load skills by job category
  */
 async function loadSkillsByCategory() {
-    const jobsData = await fetchJobs({ limit: 500 });
+    // Top 5 skills của mỗi category, % tính trên số jobs của category đó
+    const facets = await fetchFacets('category,skill', { top: 5 });
 
-    if (!jobsData || !jobsData.jobs) return;
-
-    const skillsByCategory = {
-        'Data Analyst': { python: 0, sql: 0, aws: 0, excel: 0, english: 0 },
-        'Data Engineer': { python: 0, sql: 0, aws: 0, excel: 0, english: 0 },
-        'Software Engineer': { python: 0, sql: 0, aws: 0, excel: 0, english: 0 }
-    };
-
-    const categoryTotals = {
-        'Data Analyst': 0,
-        'Data Engineer': 0,
-        'Software Engineer': 0
-    };
-
-    jobsData.jobs.forEach(job => {
-        const category = job.category || 'Unknown';
-        if (!skillsByCategory[category]) return;
-
-        categoryTotals[category]++;
+    if (!facets || !facets.data) return;
 
-        const description = (job.job_description || '').toLowerCase();
-
-        if (description.includes('python')) skillsByCategory[category].python++;
-        if (description.includes('sql')) skillsByCategory[category].sql++;
-        if (description.includes('aws')) skillsByCategory[category].aws++;
-        if (description.includes('excel')) skillsByCategory[category].excel++;
-        if (description.includes('english')) skillsByCategory[category].english++;
+    const skillsByCategory = {};
+    facets.groups.forEach(group => {
+        skillsByCategory[group.category] = [];
+    });
+    facets.data.forEach(item => {
+        skillsByCategory[item.category].push(item);
     });
 
     const categoryEl = document.getElementById('category-skills');
@@ -188,18 +170,16 @@ async function loadSkillsByCategory() {
     let html = '';
     Object.keys(skillsByCategory).forEach(category => {
         const skills = skillsByCategory[category];
-        const total = categoryTotals[category];
 
-        if (total === 0) return;
+        if (skills.length === 0) return;
 
         html += `
             <div class="category-skill-card">
                 <h4>📂 ${category}</h4>
                 <div class="category-skill-list">
-                    ${Object.entries(skills).map(([skill, count]) => {
-            const percentage = ((count / total) * 100).toFixed(1);
-            const color = SKILL_COLORS[skill] || '#8b5cf6';
-            const icon = SKILL_ICONS[skill] || '🎯';
+                    ${skills.map(({ skill, percentage }) => {
+            const color = SKILL_COLORS[skill.toLowerCase()] || '#8b5cf6';
+            const icon = SKILL_ICONS[skill.toLowerCase()] || '🎯';
 
             return `
                             <div class="category-skill-item">
@@ -208,7 +188,7 @@ async function loadSkillsByCategory() {
                                 <div class="skill-mini-bar">
                                     <div class="skill-mini-fill" style="width: ${percentage}%; background: ${color}"></div>
                                 </div>
-                                <span class="skill-percentage-small">${percentage}%</span>
+                                <span class="skill-percentage-small">${percentage.toFixed(1)}%</span>
                             </div>
                         `;
         }).join('')}
@@ -224,7 +204,7 @@ async function loadSkillsByCategory() {
  * Load common skill combinations
  */
 async function loadSkillCombinations() {
-    const jobsData = await fetchJobs({ limit: 500 });
+    const jobsData = await fetchJobs({ limit: 500, fields: 'job_id,skills' });
 
     if (!jobsData || !jobsData.jobs) return;
 
@@ -232,8 +212,8 @@ async function loadSkillCombinations() {
     const SKILLS = ['python', 'sql', 'aws', 'excel', 'english'];
 
     jobsData.jobs.forEach(job => {
-        const description = (job.job_description || '').toLowerCase();
-        const foundSkills = SKILLS.filter(skill => description.includes(skill));
+        const jobSkills = (job.skills || []).map(skill => skill.toLowerCase());
+        const foundSkills = SKILLS.filter(skill => jobSkills.includes(skill));
 
         if (foundSkills.length >= 2) {
             // Create combinations
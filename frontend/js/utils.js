@@ -44,7 +44,7 @@ async function fetchKPI() {
 
 /**
  * Fetch danh sách jobs
- * @param {Object} params - Query parameters { skip, limit, country, keyword }
+ * @param {Object} params - Query parameters { skip, limit, country, keyword, fields }
  */
 async function fetchJobs(params = {}) {
     const queryString = new URLSearchParams(params).toString();
@@ -52,6 +52,14 @@ async function fetchJobs(params = {}) {
     return await fetchAPI(endpoint);
 }
 
+/**
+ * Fetch chi tiết một job (kèm job_description và skills)
+ * @param {string} jobId - job_id trong danh sách /api/jobs
+ */
+async function fetchJobDetail(jobId) {
+    return await fetchAPI(`/api/jobs/${encodeURIComponent(jobId)}`);
+}
+
 /**
  * Fetch jobs by country
  */
@@ -80,6 +88,16 @@ async function fetchTopSkills() {
     return await fetchAPI('/api/top-skills');
 }
 
+/**
+ * Fetch số jobs theo nhóm (tính trên toàn bộ dataset ở server)
+ * @param {string} by - 1-2 chiều, ví dụ 'category' hoặc 'category,skill'
+ * @param {Object} params - { top, country, category, region, keyword }
+ */
+async function fetchFacets(by, params = {}) {
+    const queryString = new URLSearchParams({ by, ...params }).toString();
+    return await fetchAPI(`/api/facets?${queryString}`);
+}
+
 
 // ============================================================================
 // FORMATTING FUNCTIONS
@@ -140,11 +158,30 @@ function formatCurrency(amount, currency = 'USD') {
             return `€${formatted}`;
         case 'GBP':
             return `£${formatted}`;
+        case 'INR':
+            return `₹${formatted}`;
         default:
             return `${formatted} ${currency}`;
     }
 }
 
+/**
+ * Format khoảng lương của job theo đúng đồng tiền (salary_currency)
+ * @param {Object} job - Job có salary_min, salary_max, salary_currency
+ * @param {string} fallback - Text khi job không có lương
+ * @returns {string}
+ */
+function formatSalaryRange(job, fallback = 'Không công khai') {
+    const currency = job.salary_currency || 'USD';
+    if (job.salary_min && job.salary_max) {
+        return `${formatCurrency(job.salary_min, currency)} - ${formatCurrency(job.salary_max, currency)}`;
+    }
+    if (job.salary_min) {
+        return `${formatCurrency(job.salary_min, currency)}+`;
+    }
+    return fallback;
+}
+
 /**
  * Format percentage
  * @param {number} value
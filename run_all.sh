@@ -88,4 +88,10 @@ echo ""
 echo "🌐 Sau khi API chạy, mở frontend/index.html bằng Live Server"
 echo ""
 
-uvicorn api.main:app --reload
+# API_WORKERS > 1: chế độ production, các worker dùng chung một bản dataset trong RAM
+# (ví dụ: API_WORKERS=4 ./run_all.sh); mặc định 1 worker + tự reload code khi dev
+if [ "${API_WORKERS:-1}" -gt 1 ]; then
+    python3 -m api.serve --workers "$API_WORKERS"
+else
+    uvicorn api.main:app --reload
+fi